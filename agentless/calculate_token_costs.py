@@ -13,7 +13,21 @@ def calculate_token_costs() -> dict[str, dict[str, float]]:
             "input_batch": 0.0015,     # $0.0015 per 1K tokens
             "output_regular": 0.015,   # $0.015 per 1K tokens = $15 per 1M
             "output_batch": 0.0075,    # $0.0075 per 1K tokens
-        }
+        },
+        "o1": {
+            "input_regular": 0.015,    # $15 per 1M tokens
+            "input_cached": 0.0075,    # $7.50 per 1M tokens
+            "input_batch": 0.0075,     # $7.50 per 1M tokens
+            "output_regular": 0.06,    # $60 per 1M tokens (reasoning tokens included)
+            "output_batch": 0.03,      # $30 per 1M tokens
+        },
+        "gpt4o-mini": {
+            "input_regular": 0.00015,  # $0.15 per 1M tokens
+            "input_cached": 0.000075,  # $0.075 per 1M tokens
+            "input_batch": 0.000075,   # $0.075 per 1M tokens
+            "output_regular": 0.0006,  # $0.60 per 1M tokens
+            "output_batch": 0.0003,    # $0.30 per 1M tokens
+        },
     }
     return models
 
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for the issue crawler pipeline.
+
+By default, runs the whole crawl (`crawl_pytorch_issues.main`) against the local
+GitHub and model stand-ins from fake_services.py, over real HTTP, and reports
+issues/sec, concurrency efficiency (speedup per unit of concurrency) and peak memory
+for each `--concurrency` level. Latency, rate limits and failures of both stand-ins
+are configurable, so the crawl can be measured under throttling and errors too.
+Model call latency (p50/p95) and the connections opened to the model stand-in show
+the effect of connection pooling; `--compare-http-pool` measures every level with and
+without the crawler's own pools, and `--connect-latency` gives new connections the
+cost of a remote handshake. The stand-ins share this process (and its GIL) unless
+`--stand-ins-process` runs them in their own, which keeps their CPU time out of the
+measured latencies.
+
+With `--in-process`, drives `_process_issues_concurrently` with in-process stand-ins
+instead: GitHub calls block the calling thread (like PyGithub does) and LLM calls
+sleep asynchronously (like `agent.run` does). This isolates the pipeline itself.
+
+With `--smoke`, crawls the stand-ins once in every search mode (REST, GraphQL,
+`--partition`, `--incremental`) instead, as a quick check that each still works.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from collections import Counter
+from collections.abc import Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from pydantic_ai.usage import Usage
+
+import crawl_pytorch_issues as crawler
+from fake_services import STATS_PATH, FakeGitHubServer, FakeModelServer
+
+# --- Stand-ins ---
+
+
+class FakeComments:
+    """Mimics the parts of PaginatedList[IssueComment] the crawler uses."""
+
+    def __init__(self, bodies: list[str], latency: float, per_page: int):
+        self._bodies = bodies
+        self._latency = latency
+        self._per_page = per_page
+
+    def get_page(self, page: int) -> list[SimpleNamespace]:
+        time.sleep(self._latency)
+        start = page * self._per_page
+        return [
+            SimpleNamespace(body=body, user=None)
+            for body in self._bodies[start : start + self._per_page]
+        ]
+
+
+class FakeIssue:
+    """Mimics the parts of github.Issue.Issue the crawler uses."""
+
+    def __init__(self, number: int, github_latency: float):
+        self.number = number
+        self.html_url = f"https://github.com/fake/repo/issues/{number}"
+        self.title = f"Fake issue {number}"
+        self.body = "Something is broken."
+        self.labels: list[SimpleNamespace] = []
+        self.updated_at = None
+        self.pull_request = None
+        self.requester = SimpleNamespace(per_page=30)
+        self._comment_bodies = ["Have you tried X?", "Fixed by changing Y in foo.py."]
+        self.comments = len(self._comment_bodies)
+        self._github_latency = github_latency
+
+    def get_comments(self) -> FakeComments:
+        return FakeComments(
+            self._comment_bodies, self._github_latency, self.requester.per_page
+        )
+
+
+class FakeGithub:
+    """Blocking search that yields fake issues one page at a time."""
+
+    def __init__(self, num_issues: int, github_latency: float, per_page: int = 30):
+        self._num_issues = num_issues
+        self._github_latency = github_latency
+        self._per_page = per_page
+
+    def search_issues(self, query: str, sort: str, order: str):
+        for number in range(1, self._num_issues + 1):
+            if number % self._per_page == 1:
+                time.sleep(self._github_latency)
+            yield FakeIssue(number, self._github_latency)
+
+
+class FakeAgent:
+    """Async stand-in for pydantic_ai.Agent.run with a fixed latency."""
+
+    def __init__(self, llm_latency: float):
+        self._llm_latency = llm_latency
+
+    async def run(self, prompt: str) -> SimpleNamespace:
+        await asyncio.sleep(self._llm_latency)
+        return SimpleNamespace(
+            data=crawler.Answer(
+                in_what_way_question_is_answered_or_not="Benchmark stand-in.",
+                answer_summary=None,
+            ),
+            usage=lambda: Usage(requests=1),
+        )
+
+
+# --- Benchmark ---
+
+
+async def _run_in_process(
+    num_issues: int, concurrency: int, github_latency: float, llm_latency: float
+) -> int:
+    """Runs the pipeline against the in-process stand-ins; returns the issues processed."""
+    gh = FakeGithub(num_issues, github_latency)
+    agent = FakeAgent(llm_latency)
+    github_executor = ThreadPoolExecutor(
+        max_workers=crawler.max_github_workers, thread_name_prefix="github-io"
+    )
+    count = 0
+    try:
+        async for _ in crawler._process_issues_concurrently(
+            gh, agent, "fake/repo", num_issues, github_executor  # type: ignore[arg-type]
+        ):
+            count += 1
+    finally:
+        github_executor.shutdown(wait=False)
+    return count
+
+
+async def _run_end_to_end(num_issues: int, repo_name: str, **main_kwargs: Any) -> int:
+    """Runs `main()` against the local services; returns the issues written out."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = Path(tmp) / "issues.jsonl"
+        await crawler.main(repo_name, num_issues, output_file, **main_kwargs)
+        with output_file.open(encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+
+def _measure(run: Coroutine[Any, Any, int], trace_memory: bool) -> tuple[int, float, float | None]:
+    """Runs one crawl; returns (issues, seconds, peak traced MiB if `trace_memory`)."""
+    if not trace_memory:
+        start = time.perf_counter()
+        count = asyncio.run(run)
+        return count, time.perf_counter() - start, None
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        count = asyncio.run(run)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return count, elapsed, peak / 2**20
+
+
+class StandInProcess:
+    """
+    A fake_services.py stand-in running in a child process, with the same `base_url`,
+    `stats`, `peak_in_flight` and `stop()` as an in-process one.
+    """
+
+    def __init__(self, service: str, options: dict[str, Any]):
+        command = [sys.executable, str(Path(__file__).with_name("fake_services.py")), service, "--port", "0"]
+        for name, value in options.items():
+            if value is not None:
+                command += [f"--{name.replace('_', '-')}", str(value)]
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        assert self._process.stdout is not None
+        # "Fake <service> service listening on <url>"
+        self.base_url = self._process.stdout.readline().rsplit(" ", 1)[-1].strip()
+
+    def _snapshot(self) -> dict[str, Any]:
+        with urllib.request.urlopen(f"{self.base_url}{STATS_PATH}") as response:
+            return json.load(response)
+
+    @property
+    def stats(self) -> Counter[str]:
+        return Counter(self._snapshot()["stats"])
+
+    @property
+    def peak_in_flight(self) -> int:
+        return self._snapshot()["peak_in_flight"]
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.wait()
+
+
+def _start_services(args: argparse.Namespace) -> tuple[Any, Any]:
+    """Starts both stand-ins and points the crawler's clients at them."""
+    if args.stand_ins_process:
+        github_server: Any = StandInProcess(
+            "github",
+            dict(
+                num_issues=args.num_issues,
+                latency=args.github_latency,
+                jitter=args.jitter,
+                failure_rate=args.github_failure_rate,
+                max_in_flight=args.github_max_in_flight,
+                rate_limit=args.github_rate_limit,
+                rate_window=args.github_rate_window,
+                connect_latency=args.connect_latency,
+            ),
+        )
+        model_server: Any = StandInProcess(
+            "model",
+            dict(
+                latency=args.llm_latency,
+                jitter=args.jitter,
+                failure_rate=args.llm_failure_rate,
+                max_in_flight=args.llm_max_in_flight,
+                connect_latency=args.connect_latency,
+            ),
+        )
+        _point_crawler_at(github_server.base_url, model_server.base_url)
+        return github_server, model_server
+    github_server = FakeGitHubServer(
+        num_issues=args.num_issues,
+        latency=args.github_latency,
+        jitter=args.jitter,
+        failure_rate=args.github_failure_rate,
+        max_in_flight=args.github_max_in_flight,
+        rate_limit=args.github_rate_limit,
+        rate_window=args.github_rate_window,
+        connect_latency=args.connect_latency,
+    ).start()
+    model_server = FakeModelServer(
+        latency=args.llm_latency,
+        jitter=args.jitter,
+        failure_rate=args.llm_failure_rate,
+        max_in_flight=args.llm_max_in_flight,
+        connect_latency=args.connect_latency,
+    ).start()
+    _point_crawler_at(github_server.base_url, model_server.base_url)
+    return github_server, model_server
+
+
+def _point_crawler_at(github_url: str, model_url: str) -> None:
+    os.environ.update(
+        GITHUB_API_URL=github_url,
+        GITHUB_TOKEN="fake-token",
+        OPENAI_BASE_URL=f"{model_url}/v1",
+        OPENAI_API_KEY="fake-key",
+        # Checked before the agent is created, though the model is served locally
+        ANTHROPIC_API_KEY="fake-key",
+    )
+
+
+def _llm_latency_ms() -> tuple[float, float]:
+    """p50 and p95 of the model calls of the last run, in milliseconds."""
+    operation = crawler.metrics.report()["operations"].get(f"llm.{crawler.DEFAULT_MODEL_ID}")
+    if operation is None:
+        return 0.0, 0.0
+    return operation["p50_seconds"] * 1000, operation["p95_seconds"] * 1000
+
+
+# Search modes the smoke run crawls with: each reaches different GitHub endpoints
+# (partitioning reads the repository's created_at, GraphQL uses POST /graphql)
+SMOKE_MODES: dict[str, dict[str, Any]] = {
+    "rest": {},
+    "graphql": {"use_graphql": True},
+    "partition": {"partition": True},
+    "partition+graphql": {"partition": True, "use_graphql": True},
+    "incremental": {"incremental": True},
+}
+
+
+def smoke(args: argparse.Namespace) -> bool:
+    """
+    Crawls `--num-issues` issues from the stand-ins once per search mode, and reports
+    whether every mode wrote all of them out.
+    """
+    services = _start_services(args)
+    ok = True
+    try:
+        for mode, main_kwargs in SMOKE_MODES.items():
+            crawler.metrics = crawler.CrawlMetrics()
+            with tempfile.TemporaryDirectory() as tmp:
+                if main_kwargs.get("incremental"):
+                    main_kwargs = {**main_kwargs, "state_file": Path(tmp) / "state.json"}
+                count = asyncio.run(_run_end_to_end(args.num_issues, "fake/repo", **main_kwargs))
+            passed = count == args.num_issues
+            ok = ok and passed
+            print(f"{mode:>17}  {count:>4}/{args.num_issues} issues  {'ok' if passed else 'FAILED'}")
+    finally:
+        for service in services:
+            service.stop()
+    return ok
+
+
+def main(args: argparse.Namespace) -> None:
+    services = None if args.in_process else _start_services(args)
+    pool_modes = [True, False] if args.compare_http_pool else [args.http_pool]
+    # Speedup and efficiency are relative to the first level of the same pool mode
+    baselines: dict[bool, tuple[int, float]] = {}
+    print(
+        f"{'concurrency':>11}  {'pool':>4}  {'issues':>6}  {'issues/sec':>10}  {'speedup':>7}  "
+        f"{'efficiency':>10}  {'llm p50 ms':>10}  {'llm p95 ms':>10}  {'conns':>5}  {'peak MiB':>8}"
+    )
+    try:
+        for concurrency in args.concurrency:
+            for pool in pool_modes:
+                crawler.max_concurrent_assessments = concurrency
+                # Measure the fixed limit itself rather than where AIMD would take it
+                crawler.adaptive_concurrency = False
+                crawler.shared_http_pool = pool
+                crawler.metrics = crawler.CrawlMetrics()
+                connections_before = services[1].stats["connections"] if services else 0
+                if args.in_process:
+                    run = _run_in_process(
+                        args.num_issues, concurrency, args.github_latency, args.llm_latency
+                    )
+                else:
+                    run = _run_end_to_end(args.num_issues, "fake/repo")
+                count, elapsed, peak_mib = _measure(run, args.trace_memory)
+                # New connections the model stand-in accepted during the run
+                connections = services[1].stats["connections"] - connections_before if services else 0
+                p50_ms, p95_ms = _llm_latency_ms()
+                rate = count / elapsed
+                baseline = baselines.setdefault(pool, (concurrency, rate))
+                speedup = rate / baseline[1]
+                efficiency = speedup / (concurrency / baseline[0])
+                print(
+                    f"{concurrency:>11}  {'on' if pool else 'off':>4}  {count:>6}  {rate:>10.2f}  "
+                    f"{speedup:>6.1f}x  {efficiency:>9.0%}  {p50_ms:>10.0f}  {p95_ms:>10.0f}  "
+                    f"{connections:>5}  {'-' if peak_mib is None else f'{peak_mib:.1f}':>8}"
+                )
+    finally:
+        if services is not None:
+            github_server, model_server = services
+            print(
+                f"GitHub stand-in: {dict(github_server.stats)}, peak {github_server.peak_in_flight} in flight; "
+                f"model stand-in: {dict(model_server.stats)}, peak {model_server.peak_in_flight} in flight"
+            )
+            for service in services:
+                service.stop()
+    # ru_maxrss is in KiB on Linux
+    print(f"Process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure crawler throughput (issues/sec) as --concurrency increases.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("-n", "--num-issues", type=int, default=200)
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=lambda s: [int(c) for c in s.split(",")],
+        default=[1, 2, 4, 8, 16, 32],
+        help="Comma-separated concurrency levels to measure.",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Drive the pipeline with in-process stand-ins instead of main() against local HTTP services.",
+    )
+    parser.add_argument(
+        "--smoke",
+        action="store_true",
+        help="Instead of measuring, crawl the stand-ins once in every search mode and exit non-zero if any fails.",
+    )
+    parser.add_argument(
+        "--stand-ins-process",
+        action="store_true",
+        help="Run the GitHub and model stand-ins in their own processes instead of threads of this one.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Report each run's peak traced (tracemalloc) memory; tracing slows the crawl down considerably.",
+    )
+    parser.add_argument(
+        "--http-pool",
+        action=argparse.BooleanOptionalAction,
+        default=crawler.shared_http_pool,
+        help="Send model calls through the crawler's own connection pools (see crawl_models.ModelHTTPPool).",
+    )
+    parser.add_argument(
+        "--compare-http-pool",
+        action="store_true",
+        help="Measure every concurrency level with and without --http-pool.",
+    )
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.0,
+        help="Seconds each new connection to a stand-in takes (a stand-in for TCP/TLS handshakes).",
+    )
+    parser.add_argument(
+        "--github-workers",
+        type=int,
+        default=crawler.max_github_workers,
+        help="Size of the GitHub thread pool.",
+    )
+    parser.add_argument(
+        "--github-latency",
+        type=float,
+        default=0.05,
+        help="Seconds each simulated GitHub request takes.",
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.5,
+        help="Seconds each simulated LLM call takes.",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Extra random latency per request, up to this many seconds.",
+    )
+    parser.add_argument(
+        "--github-failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of GitHub requests that fail with a 502.",
+    )
+    parser.add_argument(
+        "--llm-failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of LLM calls that fail with a 500.",
+    )
+    parser.add_argument(
+        "--github-max-in-flight",
+        type=int,
+        default=None,
+        help="Concurrent GitHub requests beyond this get a secondary-rate-limit 403.",
+    )
+    parser.add_argument(
+        "--llm-max-in-flight",
+        type=int,
+        default=None,
+        help="Concurrent LLM calls beyond this get a 429.",
+    )
+    parser.add_argument(
+        "--github-rate-limit",
+        type=int,
+        default=5000,
+        help="GitHub requests allowed per rate-limit window.",
+    )
+    parser.add_argument(
+        "--github-rate-window",
+        type=float,
+        default=3600.0,
+        help="Length of the GitHub rate-limit window in seconds.",
+    )
+    args = parser.parse_args()
+
+    # Keep the table readable: no per-request (httpx) or per-issue (crawler) logs
+    logging.getLogger().setLevel(logging.WARNING)
+    crawler.log.setLevel(logging.ERROR)
+    crawler.max_github_workers = args.github_workers
+    if args.smoke:
+        sys.exit(0 if smoke(args) else 1)
+    main(args)
@@ -0,0 +1,121 @@
+"""OpenAI-compatible Batch API client used by crawl_pytorch_issues.py --batch."""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+DEFAULT_BATCH_BASE_URL: str = "https://api.openai.com/v1"
+BATCH_ENDPOINT: str = "/v1/chat/completions"
+# Batch statuses after which polling stops
+TERMINAL_BATCH_STATUSES: set[str] = {"completed", "failed", "expired", "cancelled"}
+
+log = logging.getLogger("rich")
+
+
+def build_batch_request(
+    custom_id: str,
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    schema_name: str,
+    schema: dict[str, Any],
+) -> dict[str, Any]:
+    """One line of a batch input file: a chat completion with structured output."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema},
+            },
+        },
+    }
+
+
+class BatchClient:
+    """Uploads a batch input file, creates the batch, polls it and fetches results."""
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        poll_interval: float = 30.0,
+    ):
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BATCH_BASE_URL
+        self.poll_interval = poll_interval
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key or os.getenv('OPENAI_API_KEY', '')}"},
+            timeout=httpx.Timeout(60.0),
+        )
+
+    async def submit(self, input_file: Path) -> str:
+        """Uploads `input_file` and starts a batch over it, returning the batch id."""
+        with input_file.open("rb") as f:
+            upload = await self._client.post(
+                "/files",
+                data={"purpose": "batch"},
+                files={"file": (input_file.name, f, "application/jsonl")},
+            )
+        upload.raise_for_status()
+        batch = await self._client.post(
+            "/batches",
+            json={
+                "input_file_id": upload.json()["id"],
+                "endpoint": BATCH_ENDPOINT,
+                "completion_window": "24h",
+            },
+        )
+        batch.raise_for_status()
+        return batch.json()["id"]
+
+    async def wait(self, batch_id: str) -> dict[str, Any]:
+        """Polls until the batch reaches a terminal status and returns it."""
+        while True:
+            response = await self._client.get(f"/batches/{batch_id}")
+            response.raise_for_status()
+            batch = response.json()
+            counts = batch.get("request_counts") or {}
+            log.info(
+                f"Batch {batch_id}: {batch['status']} ({counts.get('completed', 0)}/{counts.get('total', '?')} done)"
+            )
+            if batch["status"] in TERMINAL_BATCH_STATUSES:
+                return batch
+            await asyncio.sleep(self.poll_interval)
+
+    async def results(self, batch: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        """Returns the batch's output records keyed by custom_id."""
+        records: dict[str, dict[str, Any]] = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            if not batch.get(file_key):
+                continue
+            response = await self._client.get(f"/files/{batch[file_key]}/content")
+            response.raise_for_status()
+            for line in response.text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["custom_id"]] = record
+        return records
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def response_content(record: dict[str, Any]) -> str | None:
+    """Message content of a successful batch output record, else None."""
+    response = record.get("response") or {}
+    if record.get("error") or response.get("status_code") != 200:
+        return None
+    return response["body"]["choices"][0]["message"]["content"]
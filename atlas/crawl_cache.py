@@ -0,0 +1,328 @@
+"""On-disk caches used by crawl_pytorch_issues.py."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import requests
+import requests.adapters
+
+log = logging.getLogger("rich")
+
+# How long a write waits for another process's transaction (e.g. another shard of a
+# crawl_sharded run) before failing; SQLite's default is 5 seconds
+BUSY_TIMEOUT_SECONDS: float = 30.0
+
+# --- Assessment Cache ---
+
+
+class AssessmentCache:
+    """
+    Content-addressed SQLite cache of LLM assessments.
+
+    Entries are keyed by a hash of everything that determines the model's output, so a
+    change to the model, prompts or output schema is automatically a miss. Entries are
+    evicted once older than `max_age_seconds` or, beyond `max_entries`, least recently
+    used first.
+
+    Every lookup and write commits to disk, so async callers make them through
+    `asyncio.to_thread`; calls on one instance run one at a time. A failed lookup
+    counts as a miss and a failed write is logged and dropped, so a cache problem never
+    loses an assessment.
+    """
+
+    # Run eviction after this many writes rather than on every put
+    EVICT_EVERY: int = 100
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int | None = None,
+        max_age_seconds: float | None = None,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self._puts_since_evict = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        # WAL lets other processes read while one writes, and makes commits cheaper
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS assessments ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS assessments_last_used ON assessments (last_used)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Worker processes reopen the same database rather than share a connection
+        return type(self), (self.path, self.max_entries, self.max_age_seconds)
+
+    @staticmethod
+    def make_key(
+        model_id: str, system_prompt: str, prompt: str, schema: dict[str, Any]
+    ) -> str:
+        """Hashes the inputs that determine an assessment into a cache key."""
+        payload = json.dumps(
+            [model_id, system_prompt, prompt, schema], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached value for `key`, counting the hit or miss."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM assessments WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is None or (
+                    self.max_age_seconds is not None and now - row[1] > self.max_age_seconds
+                ):
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE assessments SET last_used = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                log.warning(f"Assessment cache lookup failed, treating it as a miss: {e}")
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Stores `value` under `key`, evicting old entries periodically."""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO assessments (key, value, created_at, last_used)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._conn.commit()
+                self._puts_since_evict += 1
+                if self._puts_since_evict >= self.EVICT_EVERY:
+                    self._evict()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                self.write_errors += 1
+                log.warning(f"Assessment cache write failed; the result is kept but not cached: {e}")
+
+    def evict(self) -> int:
+        """Applies the age and size limits, returning the number of entries removed."""
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        removed = 0
+        if self.max_age_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM assessments WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,),
+            )
+            removed += cursor.rowcount
+        if self.max_entries is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM assessments WHERE key IN ("
+                " SELECT key FROM assessments ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            removed += cursor.rowcount
+        self._conn.commit()
+        self._puts_since_evict = 0
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM assessments").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# --- HTTP Response Cache ---
+
+
+class HttpResponseCache:
+    """
+    Directory of cached GET responses together with their ETag/Last-Modified
+    validators. Each entry is one file: a JSON header line followed by the raw body.
+    File mtimes track recency, and the least recently used entries are deleted once
+    the directory grows past `max_bytes`. Several processes may share the directory:
+    each re-reads the entry sizes on disk every RESCAN_EVERY writes and before it
+    evicts, so the cap holds for all of them together.
+    """
+
+    RESCAN_EVERY: int = 100
+
+    def __init__(self, directory: Path, max_bytes: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # 304s served from disk / full responses fetched for cacheable GETs
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes: dict[Path, int] = {}
+        self._total_bytes = 0
+        self._puts_since_rescan = 0
+        self._rescan()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Worker processes open the same directory with their own counters and lock
+        return type(self), (self.directory, self.max_bytes)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.entry"
+
+    def get(self, key: str) -> tuple[dict[str, str], bytes] | None:
+        """Returns the cached (headers, body) for `key` and marks it recently used."""
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                headers = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return headers, body
+
+    def put(self, key: str, headers: dict[str, str], body: bytes) -> None:
+        """Stores a response, then evicts least recently used entries over the size cap."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}-{threading.get_ident()}")
+        with tmp_path.open("wb") as f:
+            f.write(json.dumps(headers).encode("utf-8") + b"\n")
+            f.write(body)
+        # Atomic replace so concurrent readers never see a partial entry
+        os.replace(tmp_path, path)
+        with self._lock:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return  # Already evicted by another process
+            self._total_bytes += size - self._sizes.get(path, 0)
+            self._sizes[path] = size
+            self._puts_since_rescan += 1
+            if self._puts_since_rescan >= self.RESCAN_EVERY:
+                self._rescan()
+            if self._total_bytes > self.max_bytes:
+                # Other processes may have added or evicted entries since the last scan
+                self._rescan()
+                self._evict()
+
+    def _rescan(self) -> None:
+        sizes = {}
+        for entry in self.directory.glob("*.entry"):
+            try:
+                sizes[entry] = entry.stat().st_size
+            except FileNotFoundError:
+                pass  # Evicted by another process
+        self._sizes = sizes
+        self._total_bytes = sum(sizes.values())
+        self._puts_since_rescan = 0
+
+    def _evict(self) -> None:
+        by_recency = sorted(self._sizes, key=_mtime)
+        for entry in by_recency:
+            if self._total_bytes <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            self._total_bytes -= self._sizes.pop(entry)
+
+
+def _mtime(entry: Path) -> float:
+    try:
+        return entry.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0  # Already evicted by another process
+
+
+class CachingHTTPAdapter(requests.adapters.HTTPAdapter):
+    """
+    requests adapter that revalidates cached GET responses with If-None-Match /
+    If-Modified-Since and serves 304 Not Modified replies from `cache`.
+    """
+
+    # Headers that describe the stored (already decoded) body rather than the wire format
+    _UNSTORED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+    def __init__(self, cache: HttpResponseCache, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if request.method != "GET" or request.url is None:
+            return super().send(request, **kwargs)
+
+        # Responses can differ per credential, so the credential is part of the key
+        key = f"{request.url}\0{request.headers.get('Authorization', '')}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached_headers, cached_body = cached
+            if "etag" in cached_headers:
+                request.headers["If-None-Match"] = cached_headers["etag"]
+            if "last-modified" in cached_headers:
+                request.headers["If-Modified-Since"] = cached_headers["last-modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            with self.cache._lock:
+                self.cache.hits += 1
+            # Keep fresh headers (rate limit counters etc.) over the cached ones
+            fresh_headers = dict(response.headers)
+            response.headers.clear()
+            response.headers.update(cached_headers)
+            response.headers.update(
+                {
+                    name: value
+                    for name, value in fresh_headers.items()
+                    if name.lower() not in self._UNSTORED_HEADERS
+                }
+            )
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = cached_body
+            return response
+
+        if response.status_code == 200 and (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            with self.cache._lock:
+                self.cache.misses += 1
+            self.cache.put(
+                key,
+                {
+                    name.lower(): value
+                    for name, value in response.headers.items()
+                    if name.lower() not in self._UNSTORED_HEADERS
+                },
+                response.content,
+            )
+        return response
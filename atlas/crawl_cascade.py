@@ -0,0 +1,201 @@
+"""Screening tiers that run before the expensive assessment model in crawl_pytorch_issues.py."""
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import pydantic
+import pydantic_ai
+from pydantic_ai.agent import AgentRunResult
+
+from crawl_cache import AssessmentCache
+from crawl_limits import AsyncAdaptiveLimiter
+from crawl_models import ModelHTTPPool, create_model
+from crawl_spend import SpendTracker
+
+# Tier name for the local rule-based classifier (no model call)
+HEURISTIC_TIER: str = "heuristic"
+SCREENING_SYSTEM_PROMPT: str = (
+    "You are screening GitHub issue comments before a more careful reviewer sees them. "
+    "Decide whether the comments could possibly contain a definitive, code-based answer to the issue. "
+    "Set 'likely_answered' to false only for comments that clearly cannot, such as thanks, closing notes, "
+    "duplicates, bot messages or requests for more information. "
+    "Set 'confident' to false whenever you are unsure; unsure cases are escalated, so err on that side."
+)
+# Comments with fewer words than this and no code cannot be a reference answer
+HEURISTIC_MIN_WORDS: int = 15
+# Short comments matching these are closing chatter rather than answers
+HEURISTIC_DISMISSIVE_PATTERN = re.compile(
+    r"\b(thanks?|thank you|closing|closed|duplicate|stale|cannot reproduce|can't reproduce"
+    r"|no longer reproduc\w*|merged|resolved|@pytorchbot)\b",
+    re.IGNORECASE,
+)
+HEURISTIC_DISMISSIVE_MAX_WORDS: int = 60
+HEURISTIC_SEPARATOR_PATTERN = re.compile(r"^(---|[\w-]+ comment:)$", re.MULTILINE)
+HEURISTIC_CODE_PATTERN = re.compile(r"```|\n {4}\S|`[^`\n]+`|\b[\w/]+\.(py|cpp|h|cu)\b")
+
+log = logging.getLogger("rich")
+
+# Makes a model call as (agent, prompt, model ID, limiter, spend tracker); returns None
+# if the spend budget ran out first (crawl_pytorch_issues._call_model)
+ModelCaller = Callable[
+    [
+        pydantic_ai.Agent[None, Any],
+        str,
+        str,
+        AsyncAdaptiveLimiter | None,
+        SpendTracker | None,
+    ],
+    Awaitable[AgentRunResult[Any] | None],
+]
+
+
+class Screening(pydantic.BaseModel):
+    """A screening tier's verdict on whether an issue needs the expensive model."""
+
+    likely_answered: bool = pydantic.Field(
+        description="False only if the comments clearly cannot contain a definitive, code-based answer."
+    )
+    confident: bool = pydantic.Field(
+        description="Whether you are confident in 'likely_answered'."
+    )
+    reason: str = pydantic.Field(description="One sentence explaining the verdict.")
+
+    @property
+    def escalate(self) -> bool:
+        """Uncertain and positive verdicts go on to the next tier."""
+        return self.likely_answered or not self.confident
+
+
+def heuristic_screen(answer_text: str) -> Screening:
+    """Classifies comment text with local rules; only obvious non-answers are rejected."""
+    # Leave the "Last comment:" / "---" separators out of the word count
+    words = len(HEURISTIC_SEPARATOR_PATTERN.sub("", answer_text).split())
+    if HEURISTIC_CODE_PATTERN.search(answer_text):
+        return Screening(likely_answered=True, confident=False, reason="Comments reference code.")
+    if words < HEURISTIC_MIN_WORDS:
+        return Screening(
+            likely_answered=False, confident=True, reason=f"Comments are only {words} words with no code."
+        )
+    if words <= HEURISTIC_DISMISSIVE_MAX_WORDS and (
+        match := HEURISTIC_DISMISSIVE_PATTERN.search(answer_text)
+    ):
+        return Screening(
+            likely_answered=False,
+            confident=True,
+            reason=f"Short closing remark ('{match[0]}') with no code.",
+        )
+    return Screening(likely_answered=False, confident=False, reason="No clear signal either way.")
+
+
+class TierStats:
+    """Per-tier decision counts and latency."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        # Issues this tier settled (screened out, or assessed by the final tier)
+        self.decided = 0
+        self.escalated = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def record(self, seconds: float, escalated: bool = False, error: bool = False) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        if error:
+            self.errors += 1
+        elif escalated:
+            self.escalated += 1
+        else:
+            self.decided += 1
+
+    def summary(self) -> str:
+        average_ms = 1000 * self.seconds / self.calls if self.calls else 0.0
+        return (
+            f"{self.name}: {self.calls} calls, {self.decided} decided, {self.escalated} escalated, "
+            f"{self.errors} errors, {average_ms:.1f} ms avg"
+        )
+
+
+class ScreeningTier:
+    """
+    One cascade tier: the local heuristic or a cheap model. Model verdicts are cached
+    like assessments. Model calls are made through `call_model` (over `http_pool`'s
+    connections, if given), with the tier's own `limiter` and `spend`, so they get the
+    same retries, throttling and metrics as the final model's; without it, the agent
+    is called once, directly.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limiter: AsyncAdaptiveLimiter | None = None,
+        spend: SpendTracker | None = None,
+        http_pool: ModelHTTPPool | None = None,
+        call_model: ModelCaller | None = None,
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.spend = spend
+        self.call_model = call_model
+        self.stats = TierStats(name)
+        self.agent = (
+            None
+            if name == HEURISTIC_TIER
+            else pydantic_ai.Agent[None, Screening](
+                create_model(name, http_pool),
+                system_prompt=SCREENING_SYSTEM_PROMPT,
+                instrument=False,
+                result_type=Screening,
+            )
+        )
+
+    async def screen(
+        self, prompt: str, answer_text: str, cache: AssessmentCache | None = None
+    ) -> Screening | None:
+        """Returns the tier's verdict, or None if it failed (the issue is escalated)."""
+        started_at = time.perf_counter()
+        try:
+            screening = await self._screen(prompt, answer_text, cache)
+        except Exception as e:
+            log.error(f"Screening tier {self.name} failed: {e}")
+            self.stats.record(time.perf_counter() - started_at, error=True)
+            return None
+        if screening is None:
+            # The spend budget ran out; the final tier will not assess it either
+            return None
+        self.stats.record(time.perf_counter() - started_at, escalated=screening.escalate)
+        return screening
+
+    async def _screen(
+        self, prompt: str, answer_text: str, cache: AssessmentCache | None
+    ) -> Screening | None:
+        if self.agent is None:
+            return heuristic_screen(answer_text)
+
+        cache_key = None
+        if cache is not None:
+            cache_key = AssessmentCache.make_key(
+                self.name, SCREENING_SYSTEM_PROMPT, prompt, Screening.model_json_schema()
+            )
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return Screening.model_validate_json(cached)
+
+        if self.call_model is None:
+            result = await self.agent.run(prompt)
+            if self.spend is not None:
+                self.spend.record_usage(self.name, result.usage())
+        else:
+            result = await self.call_model(
+                self.agent, prompt, self.name, self.limiter, self.spend
+            )
+            if result is None:
+                return None
+        if cache is not None and cache_key is not None:
+            await asyncio.to_thread(cache.put, cache_key, result.data.model_dump_json())
+        return result.data
@@ -0,0 +1,155 @@
+"""Near-duplicate issue detection used by crawl_pytorch_issues.py to share assessments."""
+
+import hashlib
+import re
+from collections import defaultdict
+
+DEFAULT_DEDUP_THRESHOLD: float = 0.8
+# Signature length and LSH banding: 16 bands of 4 rows make pairs at the default
+# threshold collide in some band with probability over 0.999, and pairs at 0.3 with ~0.12
+DEFAULT_SIGNATURE_SIZE: int = 64
+DEFAULT_BANDS: int = 16
+# Words per shingle
+SHINGLE_SIZE: int = 3
+# Memory addresses vary between otherwise identical reports; other numbers (shapes,
+# versions, line numbers) often tell different bugs apart, so they are kept
+ADDRESS_PATTERN = re.compile(r"\b0x[0-9a-f]+\b")
+WORD_PATTERN = re.compile(r"\w+")
+# Text every PyTorch issue shares, which would make unrelated reports look alike: the
+# issue template's headings and comments, "cc @..." lines, and the environment
+# section (collect_env.py output), up to the next heading
+TEMPLATE_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+ENVIRONMENT_SECTION_PATTERN = re.compile(
+    r"^(#+\s*(versions|environment)\b|collecting environment information).*?(?=^#|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+TEMPLATE_LINE_PATTERN = re.compile(
+    r"^(#+\s*\W*\s*(describe the bug|bug|to reproduce|expected behavior|additional context"
+    r"|alternatives|motivation|pitch|the feature, motivation and pitch)\s*$|cc\s+@.*$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_HASH_SPACE: int = 2**64
+
+
+def strip_boilerplate(text: str) -> str:
+    """Removes the issue template and environment dump, leaving the report itself."""
+    text = TEMPLATE_COMMENT_PATTERN.sub("", text)
+    text = ENVIRONMENT_SECTION_PATTERN.sub("", text)
+    return TEMPLATE_LINE_PATTERN.sub("", text)
+
+
+def _shingle_hashes(text: str) -> set[int]:
+    words = WORD_PATTERN.findall(ADDRESS_PATTERN.sub("0", strip_boilerplate(text).lower()))
+    shingles = {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(max(1, len(words) - SHINGLE_SIZE + 1))
+    }
+    return {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles
+        if shingle
+    }
+
+
+def minhash_signature(text: str, size: int = DEFAULT_SIGNATURE_SIZE) -> tuple[int, ...] | None:
+    """
+    One-permutation MinHash: each shingle hash falls into one of `size` bins by value
+    and every bin keeps its minimum, so the signature costs one pass over the shingles
+    rather than one per position. Empty bins borrow from the next non-empty bin (offset
+    by the distance, so borrowed values only match other borrowed values). Returns None
+    for text without words.
+    """
+    hashes = _shingle_hashes(text)
+    if not hashes:
+        return None
+    bin_width = _HASH_SPACE // size
+    mins: list[int | None] = [None] * size
+    for value in hashes:
+        index = min(value // bin_width, size - 1)
+        offset = value - index * bin_width
+        current = mins[index]
+        if current is None or offset < current:
+            mins[index] = offset
+    signature = []
+    for index in range(size):
+        for distance in range(size):
+            borrowed = mins[(index + distance) % size]
+            if borrowed is not None:
+                signature.append(borrowed + distance * bin_width)
+                break
+    return tuple(signature)
+
+
+def estimated_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing index over MinHash signatures.
+
+    Signatures are split into `bands`; texts sharing any band become candidates, and a
+    candidate whose estimated similarity reaches `threshold` is a near-duplicate. The
+    first text of each group is its representative; later ones resolve to it.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_DEDUP_THRESHOLD,
+        signature_size: int = DEFAULT_SIGNATURE_SIZE,
+        bands: int = DEFAULT_BANDS,
+    ):
+        if signature_size % bands:
+            raise ValueError(f"signature size {signature_size} is not divisible into {bands} bands")
+        self.threshold = threshold
+        self.signature_size = signature_size
+        self.bands = bands
+        self.rows = signature_size // bands
+        self.signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[str]] = defaultdict(list)
+        self.checked = 0
+        self.duplicates = 0
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def query(self, signature: tuple[int, ...]) -> str | None:
+        """Returns the most similar indexed key at or above the threshold, if any."""
+        candidates = {key for band_key in self._band_keys(signature) for key in self._buckets.get(band_key, ())}
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = estimated_similarity(signature, self.signatures[key])
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def add(self, key: str, signature: tuple[int, ...]) -> None:
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].append(key)
+
+    def find_or_add(self, key: str, text: str) -> str | None:
+        """
+        Returns the representative `text` is a near-duplicate of, or indexes it as a new
+        representative under `key` and returns None.
+        """
+        self.checked += 1
+        signature = minhash_signature(text, self.signature_size)
+        if signature is None:
+            return None
+        representative = self.query(signature)
+        if representative is not None:
+            self.duplicates += 1
+            return representative
+        self.add(key, signature)
+        return None
+
+    def summary(self) -> str:
+        return (
+            f"{self.duplicates} of {self.checked} issues were near-duplicates "
+            f"(similarity >= {self.threshold:.2f}) of {len(self.signatures)} representatives"
+        )
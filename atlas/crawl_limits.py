@@ -0,0 +1,221 @@
+"""Adaptive concurrency limits used by crawl_pytorch_issues.py."""
+
+import asyncio
+import threading
+import time
+from multiprocessing.context import BaseContext
+from typing import Any
+
+# Status codes LLM providers use for rate limiting / overload
+THROTTLING_STATUS_CODES: set[int] = {429, 503, 529}
+
+# Seconds between attempts to take a shared slot from the event loop
+SHARED_POLL_INTERVAL: float = 0.01
+
+# --- Shared Budget ---
+
+
+class SharedBudget:
+    """
+    Cross-process budget for sharded crawls: at most `limit` calls in flight across all
+    worker processes, and a throttle pause (e.g. a Retry-After) seen by one worker
+    holds back all of them. Created in the parent from a multiprocessing context and
+    handed to the workers when they start.
+    """
+
+    def __init__(self, context: BaseContext, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._slots = context.BoundedSemaphore(limit)
+        # Wall-clock time until which no new calls start (time.time(), shared)
+        self._paused_until: Any = context.Value("d", 0.0)
+
+    def pause_remaining(self) -> float:
+        return self._paused_until.value - time.time()
+
+    def pause(self, seconds: float) -> None:
+        with self._paused_until.get_lock():
+            self._paused_until.value = max(self._paused_until.value, time.time() + seconds)
+
+    def acquire(self) -> None:
+        """Blocks until a slot is free and no pause is in effect."""
+        while (pause := self.pause_remaining()) > 0:
+            time.sleep(pause)
+        self._slots.acquire()
+
+    async def acquire_async(self) -> None:
+        """Like `acquire`, without blocking the event loop."""
+        while True:
+            pause = self.pause_remaining()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            elif self._slots.acquire(block=False):
+                return
+            else:
+                await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+# --- AIMD Limits ---
+
+
+class _AIMDLimit:
+    """
+    Additive-increase/multiplicative-decrease concurrency limit.
+
+    Every successful call grows the limit by `1 / limit`, i.e. by about one per window
+    of `limit` calls. A throttling response multiplies it by `decrease`, but only
+    responses to calls started after the previous decrease count, so one burst of 429s
+    is a single signal. A throttle with a Retry-After also pauses new acquisitions until
+    it has passed. With `min_limit == max_limit` this is a plain fixed-size semaphore.
+    With a `shared` budget, each call also takes one of its cross-process slots, and
+    Retry-After pauses are shared with the other processes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        decrease: float = 0.5,
+        shared: SharedBudget | None = None,
+    ):
+        self.name = name
+        self.shared = shared
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit if max_limit is not None else initial, initial)
+        self.decrease = decrease
+        self.limit = float(initial)
+        self.peak_limit = initial
+        self.in_flight = 0
+        self.successes = 0
+        self.throttles = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+
+    @property
+    def adaptive(self) -> bool:
+        return self.min_limit < self.max_limit
+
+    def _record_success(self) -> None:
+        self.successes += 1
+        if self.adaptive:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.peak_limit = max(self.peak_limit, int(self.limit))
+
+    def _record_throttle(self, retry_after: float | None, started_at: float | None) -> None:
+        self.throttles += 1
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+            if self.shared is not None:
+                self.shared.pause(retry_after)
+        if self.adaptive and (started_at is None or started_at >= self._last_decrease):
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self._last_decrease = now
+
+    def _pause_remaining(self) -> float:
+        return self._paused_until - time.monotonic()
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit) and self._pause_remaining() <= 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: limit {int(self.limit)} (peak {self.peak_limit}, max {self.max_limit}), "
+            f"{self.successes} ok, {self.throttles} throttled"
+        )
+
+
+class AsyncAdaptiveLimiter(_AIMDLimit):
+    """AIMD limit for asyncio tasks; use as `async with limiter:`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AsyncAdaptiveLimiter":
+        async with self._condition:
+            while not self._has_capacity():
+                pause = self._pause_remaining()
+                try:
+                    # Wake on release, or when a Retry-After pause runs out
+                    await asyncio.wait_for(
+                        self._condition.wait(), timeout=pause if pause > 0 else None
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+        if self.shared is not None:
+            try:
+                await self.shared.acquire_async()
+            except BaseException:
+                await self._release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self.shared is not None:
+            self.shared.release()
+        await self._release()
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self._record_success()
+
+    def on_throttle(
+        self, retry_after: float | None = None, started_at: float | None = None
+    ) -> None:
+        """Records a throttling response; `started_at` is the call's time.monotonic()."""
+        self._record_throttle(retry_after, started_at)
+
+
+class ThreadAdaptiveLimiter(_AIMDLimit):
+    """AIMD limit for worker threads; use as `with limiter:`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> "ThreadAdaptiveLimiter":
+        with self._condition:
+            while not self._has_capacity():
+                pause = self._pause_remaining()
+                self._condition.wait(timeout=pause if pause > 0 else None)
+            self.in_flight += 1
+        if self.shared is not None:
+            try:
+                self.shared.acquire()
+            except BaseException:
+                self._release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.shared is not None:
+            self.shared.release()
+        self._release()
+
+    def _release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self._record_success()
+            self._condition.notify_all()
+
+    def on_throttle(
+        self, retry_after: float | None = None, started_at: float | None = None
+    ) -> None:
+        """Records a throttling response; `started_at` is the call's time.monotonic()."""
+        with self._condition:
+            self._record_throttle(retry_after, started_at)
@@ -0,0 +1,173 @@
+"""Per-stage latency, error and queue-depth metrics used by crawl_pytorch_issues.py."""
+
+import json
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+def _quantiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    if len(values) == 1:
+        cuts = {q: values[0] for q in QUANTILES}
+    else:
+        percentiles = statistics.quantiles(values, n=100, method="inclusive")
+        cuts = {q: percentiles[round(q * 100) - 1] for q in QUANTILES}
+    return {f"p{round(q * 100)}": value for q, value in cuts.items()}
+
+
+class CrawlMetrics:
+    """
+    Thread-safe collector for the crawl: latencies (and errors) per timed operation,
+    free-form event counters such as retries, and sampled queue depths. `report()`
+    turns them into percentiles and throughput for the JSON / Prometheus outputs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+        self.queue_depths: dict[str, list[int]] = {}
+
+    def start(self) -> None:
+        """Starts the wall clock that throughput is measured against."""
+        self.started_at = time.monotonic()
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            if error:
+                self.errors[name] += 1
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Times the block as one `name` operation, counting it as an error if it raises."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(name, time.perf_counter() - started_at, error=True)
+            raise
+        self.observe(name, time.perf_counter() - started_at)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def sample_queue(self, name: str, depth: int) -> None:
+        with self._lock:
+            self.queue_depths.setdefault(name, []).append(depth)
+
+    def report(self) -> dict[str, Any]:
+        """Machine-readable summary: latency percentiles, throughput, errors, counters, queues."""
+        with self._lock:
+            wall_seconds = time.monotonic() - self.started_at
+            operations = {}
+            for name, values in sorted(self.latencies.items()):
+                operations[name] = {
+                    "count": len(values),
+                    "errors": self.errors[name],
+                    "total_seconds": sum(values),
+                    "mean_seconds": statistics.fmean(values),
+                    "max_seconds": max(values),
+                    **{f"{label}_seconds": value for label, value in _quantiles(values).items()},
+                    "per_second": len(values) / wall_seconds if wall_seconds else 0.0,
+                }
+            queues = {
+                name: {
+                    "samples": len(depths),
+                    "mean": statistics.fmean(depths),
+                    "max": max(depths),
+                    **_quantiles([float(depth) for depth in depths]),
+                }
+                for name, depths in sorted(self.queue_depths.items())
+            }
+            return {
+                "wall_seconds": wall_seconds,
+                "operations": operations,
+                "counters": dict(sorted(self.counters.items())),
+                "queues": queues,
+            }
+
+    def summary(self) -> list[str]:
+        """One line per timed operation for the run summary."""
+        report = self.report()
+        lines = []
+        for name, op in report["operations"].items():
+            lines.append(
+                f"{name}: {op['count']} ({op['errors']} errors, {op['per_second']:.2f}/s), "
+                f"p50 {op['p50_seconds'] * 1000:.0f} ms, p95 {op['p95_seconds'] * 1000:.0f} ms, "
+                f"p99 {op['p99_seconds'] * 1000:.0f} ms"
+            )
+        for name, queue in report["queues"].items():
+            lines.append(f"queue {name}: mean depth {queue['mean']:.1f}, max {queue['max']}")
+        if report["counters"]:
+            lines.append(", ".join(f"{name} {count}" for name, count in report["counters"].items()))
+        return lines
+
+    def write_json(self, path: Path) -> None:
+        _write_atomically(path, json.dumps(self.report(), indent=2) + "\n")
+
+    def write_prometheus(self, path: Path, prefix: str = "crawl") -> None:
+        """Writes the report in the Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_wall_seconds Wall-clock duration of the crawl.",
+            f"# TYPE {prefix}_wall_seconds gauge",
+            f"{prefix}_wall_seconds {report['wall_seconds']:.6f}",
+            f"# HELP {prefix}_operation_seconds Latency of timed crawl operations.",
+            f"# TYPE {prefix}_operation_seconds summary",
+        ]
+        for name, op in report["operations"].items():
+            label = f'operation="{_escape(name)}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'{prefix}_operation_seconds{{{label},quantile="{q}"}} {op[f"p{round(q * 100)}_seconds"]:.6f}'
+                )
+            lines.append(f"{prefix}_operation_seconds_sum{{{label}}} {op['total_seconds']:.6f}")
+            lines.append(f"{prefix}_operation_seconds_count{{{label}}} {op['count']}")
+        lines += [
+            f"# HELP {prefix}_operation_errors_total Timed operations that failed.",
+            f"# TYPE {prefix}_operation_errors_total counter",
+        ]
+        for name, op in report["operations"].items():
+            lines.append(f'{prefix}_operation_errors_total{{operation="{_escape(name)}"}} {op["errors"]}')
+        lines += [
+            f"# HELP {prefix}_events_total Counted crawl events (retries, throttles, ...).",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for name, count in report["counters"].items():
+            lines.append(f'{prefix}_events_total{{event="{_escape(name)}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_queue_depth Sampled depth of the pipeline queues.",
+            f"# TYPE {prefix}_queue_depth gauge",
+        ]
+        for name, queue in report["queues"].items():
+            for stat in ("mean", "max", "p95"):
+                lines.append(
+                    f'{prefix}_queue_depth{{queue="{_escape(name)}",stat="{stat}"}} {queue[stat]:.3f}'
+                )
+        _write_atomically(path, "\n".join(lines) + "\n")
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomically(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so scrapers never read a half-written file
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
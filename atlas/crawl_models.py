@@ -0,0 +1,226 @@
+"""Model construction for crawl_pytorch_issues.py, with provider prompt caching and pooled connections."""
+
+import importlib.util
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import httpx
+from anthropic import AsyncAnthropic
+from anthropic.types import Message as AnthropicMessage
+from openai import AsyncOpenAI
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import (
+    Model,
+    ModelRequestParameters,
+    cached_async_http_client,
+    check_allow_model_requests,
+    get_user_agent,
+)
+from pydantic_ai.models.anthropic import AnthropicModel
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.anthropic import AnthropicProvider
+from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+# Idle keep-alive connections are closed after this many seconds (httpx defaults to 5,
+# shorter than the gaps between calls when a crawl is waiting on GitHub)
+DEFAULT_KEEPALIVE_EXPIRY: float = 60.0
+# Same as pydantic-ai's (and OpenAI's) defaults: model calls can take minutes
+MODEL_HTTP_TIMEOUT = httpx.Timeout(timeout=600, connect=5)
+# HTTP/2 support in httpx is an optional extra
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
+# Connections per sub-pool of a ModelHTTPPool: httpcore's pool bookkeeping costs
+# O(connections^2) per request, which dominates the crawler's CPU time at ~64
+CONNECTIONS_PER_SHARD: int = 16
+
+
+class CachedPrefixAnthropicModel(AnthropicModel):
+    """
+    AnthropicModel that marks the system prompt with a cache-control breakpoint, so the
+    tool definitions and system prompt (Anthropic caches in that order) are read from
+    the prompt cache after the first request. pydantic-ai does not set cache_control or
+    report cache tokens itself yet.
+
+    Usage is reported like OpenAI's: `request_tokens` includes cached tokens, and
+    `details["cache_read_input_tokens"]` says how many of them were read from the cache
+    (`details["cache_creation_input_tokens"]`: written to it, which costs more).
+    `request` mirrors AnthropicModel.request, whose usage mapping drops both counts.
+    """
+
+    async def _map_message(self, messages: list[ModelMessage]) -> tuple[Any, Any]:
+        system_prompt, anthropic_messages = await super()._map_message(messages)
+        if system_prompt:
+            system_prompt = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+        return system_prompt, anthropic_messages
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        check_allow_model_requests()
+        response: AnthropicMessage = await self._messages_create(
+            messages, False, model_settings or {}, model_request_parameters  # type: ignore[arg-type]
+        )
+        return self._process_response(response), _cache_aware_usage(response)
+
+
+def _cache_aware_usage(response: AnthropicMessage) -> Usage:
+    # Anthropic's input_tokens leaves out tokens read from or written to the cache
+    cache_read = response.usage.cache_read_input_tokens or 0
+    cache_write = response.usage.cache_creation_input_tokens or 0
+    request_tokens = response.usage.input_tokens + cache_read + cache_write
+    return Usage(
+        request_tokens=request_tokens,
+        response_tokens=response.usage.output_tokens,
+        total_tokens=request_tokens + response.usage.output_tokens,
+        details={
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_write,
+        },
+    )
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """Response body stream that reports when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Callable[[], None] | None = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class _ShardedTransport(httpx.AsyncBaseTransport):
+    """
+    Spreads requests over several connection pools, each to the one with the fewest
+    requests in flight (counted until the response body is closed).
+    """
+
+    def __init__(self, shards: list[httpx.AsyncHTTPTransport]):
+        self._shards = shards
+        self._in_flight = [0] * len(shards)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        index = min(range(len(self._shards)), key=self._in_flight.__getitem__)
+        self._in_flight[index] += 1
+
+        def release() -> None:
+            self._in_flight[index] -= 1
+
+        try:
+            response = await self._shards[index].handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = _CountedStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        for shard in self._shards:
+            await shard.aclose()
+
+
+class ModelHTTPPool:
+    """
+    One pooled httpx.AsyncClient per model provider, shared by every agent that calls
+    that provider. Each pool keeps up to `max_connections` connections alive (httpx
+    keeps only 20 by default, so at higher concurrency most calls would pay for a new
+    TCP and TLS handshake), and all pools share one SSL context, so certificates are
+    loaded once. Larger pools are split into sub-pools of CONNECTIONS_PER_SHARD. With
+    `http2`, calls are multiplexed over fewer connections; this needs the optional h2
+    package.
+
+    Clients are bound to the event loop that first uses them, so a pool belongs to one
+    `asyncio.run` and is closed with `aclose()` before it ends. pydantic-ai's default
+    clients are cached for the life of the process instead, so every later event loop
+    inherits their dead keep-alive connections and pays a failed request on each.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        http2: bool = False,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            raise ValueError("HTTP/2 needs the h2 package: pip install 'httpx[http2]'")
+        self.max_connections = max_connections
+        self.shards = -(-max_connections // CONNECTIONS_PER_SHARD)
+        shard_size = -(-max_connections // self.shards)
+        self.limits = httpx.Limits(
+            max_connections=shard_size,
+            max_keepalive_connections=shard_size,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._ssl_context = httpx.create_ssl_context()
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        if provider not in self._clients:
+            shards = [
+                httpx.AsyncHTTPTransport(
+                    verify=self._ssl_context, http2=self.http2, limits=self.limits
+                )
+                for _ in range(self.shards)
+            ]
+            self._clients[provider] = httpx.AsyncClient(
+                transport=shards[0] if len(shards) == 1 else _ShardedTransport(shards),
+                timeout=MODEL_HTTP_TIMEOUT,
+                headers={"User-Agent": get_user_agent()},
+            )
+        return self._clients[provider]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+def create_model(model_id: str, http_pool: ModelHTTPPool | None = None) -> Model | str:
+    """
+    Returns what pydantic_ai.Agent should be given for `model_id`. Anthropic models get
+    explicit cache-control markers; OpenAI caches any repeated prompt prefix of 1,024+
+    tokens automatically. OpenAI and Anthropic models send their requests through
+    `http_pool`'s client for the provider if given (pydantic-ai's shared one if not),
+    with the SDK's own retries turned off: the crawler's RetryPolicy makes every retry,
+    and its limiters see every throttling response. Other model IDs are passed through
+    unchanged.
+    """
+    provider, _, model_name = model_id.partition(":")
+    if provider not in ("anthropic", "openai"):
+        return model_id
+    http_client = (
+        http_pool.client(provider)
+        if http_pool is not None
+        else cached_async_http_client(provider=provider)
+    )
+    if provider == "anthropic":
+        return CachedPrefixAnthropicModel(
+            model_name,
+            provider=AnthropicProvider(
+                anthropic_client=AsyncAnthropic(max_retries=0, http_client=http_client)
+            ),
+        )
+    return OpenAIModel(
+        model_name,
+        provider=OpenAIProvider(
+            openai_client=AsyncOpenAI(max_retries=0, http_client=http_client)
+        ),
+    )
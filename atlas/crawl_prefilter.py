@@ -0,0 +1,145 @@
+"""Rule-based pre-filter that drops hopeless issues before any LLM call in crawl_pytorch_issues.py."""
+
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Mapping
+from typing import Any
+
+# Comment authors whose messages are never human answers
+DEFAULT_BOT_AUTHORS: frozenset[str] = frozenset(
+    {"pytorchbot", "pytorch-bot", "pytorchmergebot", "facebook-github-bot", "github-actions", "stale"}
+)
+# Bot-style messages that can also be posted from human accounts
+BOT_MESSAGE_PATTERN = re.compile(
+    r"^\s*(@pytorch(merge)?bot\s+\w+|merge (started|failed|completed)|"
+    r"this issue has been automatically (closed|marked as stale)|"
+    r"closing (this issue )?(as|due to) (stale|inactivity))",
+    re.IGNORECASE,
+)
+DEFAULT_MIN_ANSWER_CHARS: int = 80
+# Labels of issues whose resolution depends on external state (CI, environments)
+DEFAULT_EXCLUDED_LABELS: frozenset[str] = frozenset(
+    {"module: ci", "module: flaky-tests", "needs reproduction", "stale"}
+)
+CODE_PATTERN = re.compile(r"```|^ {4}\S|`[^`\n]+`", re.MULTILINE)
+
+
+class PrefilterRule(ABC):
+    """
+    A pre-filter rule. `check` gets the issue record (with its last comments fetched)
+    and the rendered answer text, and returns why the issue should be skipped, or None
+    to keep it. Rules must not do any I/O.
+    """
+
+    name: str = "rule"
+
+    @abstractmethod
+    def check(self, record: Mapping[str, Any], answer_text: str) -> str | None: ...
+
+
+class BotAuthorRule(PrefilterRule):
+    """Skips issues whose last comment is from a bot or is a bot-style command/notice."""
+
+    name = "bot-author"
+
+    def __init__(self, bot_authors: frozenset[str] = DEFAULT_BOT_AUTHORS):
+        self.bot_authors = bot_authors
+
+    def check(self, record: Mapping[str, Any], answer_text: str) -> str | None:
+        last = (record["last_comments"] or [None])[-1]
+        if last is None:
+            return None
+        author = last["author"] or ""
+        if author in self.bot_authors or author.endswith("[bot]"):
+            return f"last comment by {author}"
+        if BOT_MESSAGE_PATTERN.match(last["body"] or ""):
+            return "last comment is a bot command or notice"
+        return None
+
+
+class MinLengthRule(PrefilterRule):
+    """Skips issues whose comments are too short to be a reference answer."""
+
+    name = "min-length"
+
+    def __init__(self, min_chars: int = DEFAULT_MIN_ANSWER_CHARS):
+        self.min_chars = min_chars
+
+    def check(self, record: Mapping[str, Any], answer_text: str) -> str | None:
+        length = sum(len((comment["body"] or "").strip()) for comment in record["last_comments"] or [])
+        if length < self.min_chars:
+            return f"comments total {length} characters (< {self.min_chars})"
+        return None
+
+
+class CodeBlockRule(PrefilterRule):
+    """Skips issues whose comments contain no code at all (inline, fenced or indented)."""
+
+    name = "code-block"
+
+    def check(self, record: Mapping[str, Any], answer_text: str) -> str | None:
+        if not any(CODE_PATTERN.search(comment["body"] or "") for comment in record["last_comments"] or []):
+            return "no code in comments"
+        return None
+
+
+class LabelRule(PrefilterRule):
+    """Skips issues carrying any of `excluded_labels`."""
+
+    name = "label"
+
+    def __init__(self, excluded_labels: frozenset[str] = DEFAULT_EXCLUDED_LABELS):
+        self.excluded_labels = excluded_labels
+
+    def check(self, record: Mapping[str, Any], answer_text: str) -> str | None:
+        excluded = sorted(self.excluded_labels.intersection(record["labels"]))
+        if excluded:
+            return f"labelled {', '.join(repr(label) for label in excluded)}"
+        return None
+
+
+# Rules selectable by name with --prefilter; add an entry here to plug in a new rule
+PREFILTER_RULES: dict[str, type[PrefilterRule]] = {
+    rule.name: rule for rule in (BotAuthorRule, MinLengthRule, CodeBlockRule, LabelRule)
+}
+# The recommended rules, selected with the name "default"; no rule runs unless asked for
+DEFAULT_PREFILTER_RULES: list[str] = [BotAuthorRule.name, MinLengthRule.name, LabelRule.name]
+
+
+class Prefilter:
+    """Applies rules in order; the first one that objects decides the skip reason."""
+
+    def __init__(self, rules: list[PrefilterRule]):
+        self.rules = rules
+        self.checked = 0
+        self.skipped: Counter[str] = Counter()
+
+    @classmethod
+    def from_names(cls, names: list[str]) -> "Prefilter":
+        """Builds the named rules, in order; "default" stands for DEFAULT_PREFILTER_RULES."""
+        names = [
+            rule
+            for name in names
+            for rule in (DEFAULT_PREFILTER_RULES if name == "default" else [name])
+        ]
+        unknown = [name for name in names if name not in PREFILTER_RULES]
+        if unknown:
+            raise ValueError(
+                f"Unknown pre-filter rule(s) {', '.join(unknown)}; choose from {', '.join(PREFILTER_RULES)} or default"
+            )
+        return cls([PREFILTER_RULES[name]() for name in names])
+
+    def skip_reason(self, record: Mapping[str, Any], answer_text: str) -> str | None:
+        """Returns '<rule>: <why>' for an issue that should be skipped, else None."""
+        self.checked += 1
+        for rule in self.rules:
+            reason = rule.check(record, answer_text)
+            if reason is not None:
+                self.skipped[rule.name] += 1
+                return f"{rule.name}: {reason}"
+        return None
+
+    def summary(self) -> str:
+        by_rule = ", ".join(f"{name} {count}" for name, count in self.skipped.most_common())
+        return f"{sum(self.skipped.values())} of {self.checked} skipped" + (f" ({by_rule})" if by_rule else "")
@@ -0,0 +1,158 @@
+"""Token-budgeted prompt construction used by crawl_pytorch_issues.py."""
+
+import logging
+import re
+import statistics
+from typing import Any
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a characters-per-token estimate
+    tiktoken = None
+
+# Encoding used by o1 / gpt-4o; other models tokenize similarly enough for budgeting
+TIKTOKEN_ENCODING: str = "o200k_base"
+# Rough characters per token when tiktoken is unavailable
+CHARS_PER_TOKEN: int = 4
+DEFAULT_TITLE_TOKEN_BUDGET: int = 100
+DEFAULT_BODY_TOKEN_BUDGET: int = 2_000
+DEFAULT_ANSWER_TOKEN_BUDGET: int = 3_000
+# Long code fences (stack traces, logs) are cut to this before the section budget applies
+DEFAULT_CODE_FENCE_TOKEN_BUDGET: int = 400
+# Share of a truncated section kept from its start; the rest comes from its end, where
+# logs and stack traces usually carry the actual error
+HEAD_FRACTION: float = 0.4
+CODE_FENCE_PATTERN = re.compile(r"(```[^\n]*\n)(.*?)(```)", re.DOTALL)
+
+log = logging.getLogger("rich")
+
+
+class _Tokenizer:
+    """Local token counting and truncation, exact with tiktoken, estimated without."""
+
+    def __init__(self) -> None:
+        self._encoding: Any = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+            except Exception as e:  # e.g. the encoding file cannot be downloaded
+                log.warning(f"tiktoken unavailable ({e}); estimating tokens from length.")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def head_tail(self, text: str, max_tokens: int) -> tuple[str, str, int]:
+        """Splits `text` into a head and tail totalling `max_tokens`; returns the tokens dropped."""
+        head_tokens = int(max_tokens * HEAD_FRACTION)
+        tail_tokens = max_tokens - head_tokens
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return (
+                self._encoding.decode(tokens[:head_tokens]),
+                self._encoding.decode(tokens[len(tokens) - tail_tokens :]),
+                len(tokens) - max_tokens,
+            )
+        head_chars, tail_chars = head_tokens * CHARS_PER_TOKEN, tail_tokens * CHARS_PER_TOKEN
+        return (
+            text[:head_chars],
+            text[len(text) - tail_chars :],
+            self.count(text) - max_tokens,
+        )
+
+
+def _percentiles(values: list[int]) -> str:
+    if not values:
+        return "n/a"
+    if len(values) == 1:
+        return f"p50 {values[0]}, max {values[0]}"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50 {cuts[49]:.0f}, p90 {cuts[89]:.0f}, p99 {cuts[98]:.0f}, max {max(values)}"
+
+
+class PromptBuilder:
+    """
+    Renders the assessment prompt with each section fitted to a token budget.
+
+    Oversized code fences are cut first, keeping their head and tail, and then the
+    whole section is cut the same way if it is still over budget. Token counts before
+    and after fitting are recorded per section so `summary()` can show where the
+    prompt tokens go.
+    """
+
+    def __init__(
+        self,
+        title_budget: int = DEFAULT_TITLE_TOKEN_BUDGET,
+        body_budget: int = DEFAULT_BODY_TOKEN_BUDGET,
+        answer_budget: int = DEFAULT_ANSWER_TOKEN_BUDGET,
+        code_fence_budget: int = DEFAULT_CODE_FENCE_TOKEN_BUDGET,
+    ):
+        self.budgets = {"title": title_budget, "body": body_budget, "answer": answer_budget}
+        self.code_fence_budget = code_fence_budget
+        self.tokenizer = _Tokenizer()
+        self.raw_tokens: dict[str, list[int]] = {section: [] for section in self.budgets}
+        self.prompt_tokens: list[int] = []
+        self.truncated: dict[str, int] = {section: 0 for section in self.budgets}
+        self.fences_truncated = 0
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Worker processes get the same budgets with fresh statistics
+        return type(self), (
+            self.budgets["title"],
+            self.budgets["body"],
+            self.budgets["answer"],
+            self.code_fence_budget,
+        )
+
+    def _cut(self, text: str, max_tokens: int, what: str) -> str:
+        head, tail, dropped = self.tokenizer.head_tail(text, max_tokens)
+        return f"{head}\n[... {dropped} {what} tokens truncated ...]\n{tail}"
+
+    def _fit_fences(self, text: str) -> str:
+        def fit(match: re.Match[str]) -> str:
+            opening, content, closing = match.groups()
+            if self.tokenizer.count(content) <= self.code_fence_budget:
+                return match[0]
+            self.fences_truncated += 1
+            return f"{opening}{self._cut(content, self.code_fence_budget, 'code')}\n{closing}"
+
+        return CODE_FENCE_PATTERN.sub(fit, text)
+
+    def fit(self, section: str, text: str) -> str:
+        """Fits `text` to the budget of `section` ('title', 'body' or 'answer')."""
+        budget = self.budgets[section]
+        raw_tokens = self.tokenizer.count(text)
+        self.raw_tokens[section].append(raw_tokens)
+        if raw_tokens <= budget:
+            return text
+        self.truncated[section] += 1
+        text = self._fit_fences(text)
+        if self.tokenizer.count(text) > budget:
+            text = self._cut(text, budget, section)
+        return text
+
+    def build(self, template: str, title: str, body: str, answer_text: str) -> str:
+        prompt = template.format(
+            title=self.fit("title", title),
+            body=self.fit("body", body),
+            answer_text=self.fit("answer", answer_text),
+        )
+        self.prompt_tokens.append(self.tokenizer.count(prompt))
+        return prompt
+
+    def summary(self) -> list[str]:
+        """Prompt-size distribution lines for the run summary."""
+        method = "tiktoken" if self.tokenizer.exact else f"~{CHARS_PER_TOKEN} chars/token"
+        lines = [f"Prompt tokens ({method}, {len(self.prompt_tokens)} prompts): {_percentiles(self.prompt_tokens)}"]
+        for section, budget in self.budgets.items():
+            lines.append(
+                f"  {section} before fitting: {_percentiles(self.raw_tokens[section])}; "
+                f"{self.truncated[section]} over the {budget}-token budget"
+            )
+        lines.append(f"  code fences truncated: {self.fences_truncated}")
+        return lines
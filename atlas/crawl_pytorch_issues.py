@@ -2,23 +2,64 @@
 
 import argparse
 import asyncio
+import contextlib
 import logging
+import multiprocessing
 import os
 import sys
-from collections.abc import AsyncIterator, Iterator
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import TypedDict, Optional
+from typing import Any, TypedDict, Optional
 import json
 
 import github
 import pydantic_ai
+from pydantic_ai.agent import AgentRunResult
+import requests
+import requests.adapters
 from github import Github
 from github.Issue import Issue
 from github.IssueComment import IssueComment
 from github.PaginatedList import PaginatedList
+from github.Requester import Requester, RequestsResponse
 from rich.logging import RichHandler
 import pydantic
 
+from crawl_batch import BatchClient, build_batch_request, response_content
+from crawl_cache import AssessmentCache, CachingHTTPAdapter, HttpResponseCache
+from crawl_cascade import HEURISTIC_TIER, ScreeningTier, TierStats
+from crawl_dedup import DEFAULT_DEDUP_THRESHOLD, NearDuplicateIndex
+from crawl_limits import (
+    THROTTLING_STATUS_CODES,
+    AsyncAdaptiveLimiter,
+    SharedBudget,
+    ThreadAdaptiveLimiter,
+)
+from crawl_metrics import CrawlMetrics
+from crawl_models import HTTP2_AVAILABLE, ModelHTTPPool, create_model
+from crawl_prefilter import DEFAULT_PREFILTER_RULES, PREFILTER_RULES, Prefilter
+from crawl_prompts import (
+    DEFAULT_ANSWER_TOKEN_BUDGET,
+    DEFAULT_BODY_TOKEN_BUDGET,
+    DEFAULT_CODE_FENCE_TOKEN_BUDGET,
+    DEFAULT_TITLE_TOKEN_BUDGET,
+    PromptBuilder,
+)
+from crawl_queue import DEFAULT_DISCOVERY_WAIT_SECONDS, DEFAULT_LEASE_SECONDS, WorkQueue
+from crawl_retry import (
+    DEFAULT_CALL_TIMEOUT,
+    DEFAULT_HEDGE_QUANTILE,
+    DEFAULT_MAX_RETRIES,
+    RetryPolicy,
+    retry_after,
+)
+from crawl_spend import SpendTracker
+
 # --- Constants ---
 
 DEFAULT_MODEL_ID: str = "openai:o1"
@@ -27,6 +68,45 @@ DEFAULT_MAX_ISSUES: int = 100
 # Limit concurrent API calls to avoid rate limits/overload
 # This will be updated by args if --concurrency is used
 max_concurrent_assessments: int = 10
+# PyGithub is blocking, so all GitHub calls run on a dedicated thread pool of this size
+# to keep them off the event loop. Updated by args if --github-workers is used.
+max_github_workers: int = 8
+# With adaptive concurrency (the default), --concurrency and --github-workers are the
+# starting points: limits grow while calls succeed and halve on throttling, up to
+# this cap for LLM calls (GitHub is capped by its thread pool).
+# Updated by args if --adaptive/--no-adaptive or --max-concurrency is used.
+adaptive_concurrency: bool = True
+max_adaptive_concurrency: int = 64
+# Model calls go through connection pools owned by the crawl, sized to the LLM
+# concurrency cap (see crawl_models.ModelHTTPPool), optionally over HTTP/2.
+# Updated by args if --http-pool/--no-http-pool or --http2 is used.
+shared_http_pool: bool = True
+model_http2: bool = False
+# Back off once fewer than this fraction of GitHub's rate-limit window is left
+GITHUB_RATE_LIMIT_RESERVE: float = 0.1
+# GitHub search returns at most this many results per query; --partition splits past it
+SEARCH_RESULT_CAP: int = 1000
+# Capacity of each bounded queue between pipeline stages
+DEFAULT_QUEUE_SIZE: int = 100
+# Seconds between checks of an empty --work-queue for newly discovered or expired items
+QUEUE_POLL_INTERVAL: float = 1.0
+# Issues per GraphQL search page in --graphql mode (GitHub allows at most 100)
+DEFAULT_GRAPHQL_PAGE_SIZE: int = 50
+# Fits prompt sections to token budgets (see crawl_prompts.PromptBuilder)
+# Replaced from args if any of the --*-token-budget options are used.
+prompt_builder: PromptBuilder = PromptBuilder()
+# Retries, deadlines and hedging of assessment calls (see crawl_retry.RetryPolicy)
+# Replaced from args if --retries, --call-timeout or --hedge are used.
+retry_policy: RetryPolicy = RetryPolicy()
+# Stage latencies, retry/error counters and queue depths (see crawl_metrics.CrawlMetrics)
+metrics: CrawlMetrics = CrawlMetrics()
+# Set in the worker processes of a --repos crawl (see _init_shard_worker): concurrency
+# budgets shared by all workers, and a lock serializing writes to the state file
+llm_budget: SharedBudget | None = None
+github_budget: SharedBudget | None = None
+state_lock: Any = None
+# Per-issue part of the request. Everything constant lives in SYSTEM_PROMPT, which
+# comes first, so providers can serve that prefix from their prompt cache.
 ASSESSMENT_PROMPT: str = """
 Issue Title: {title}
 Issue Body:
@@ -35,13 +115,61 @@ Issue Body:
 --- Potential Answer Comment(s) ---
 {answer_text}
 --- End of Comment(s) ---
-
+"""
+ASSESSMENT_CRITERIA: str = """
 Consider the following criteria for a "qualifying answer":
 1.  **Reference Standard:** Is the answer clear and complete enough to verify other potential answers to the same issue?
 2.  **Code-Based & Static:** Is the answer derivable *solely* from analyzing source code, without running code or tests or checking external states (like CI results)?
 
 Based *only* on the text provided in "Potential Answer Comment(s)", does it meet BOTH criteria for a qualifying answer to the issue described?
-Respond with only 'true' or 'false'.
+"""
+SYSTEM_PROMPT: str = (
+    "You are assessing GitHub issue comments to determine if they provide a definitive, code-based answer, conforming to the provided JSON schema."
+    "A qualifying answer must satisfy two criteria: "
+    "1. Reference Standard: It must be clear and complete enough to verify the correctness of other potential answers. "
+    "2. Code-Based & Static: It must be derivable *solely* from analyzing the code in the codebase, without requiring code execution, tests, or external state checks (like CI). "
+    "Focus ONLY on the provided comment text. "
+    "Respond using the JSON schema, providing an explanation in 'in_what_way_question_is_answered_or_not'. "
+    "Provide a summary in 'answer_summary' ONLY IF BOTH criteria are met, otherwise leave 'answer_summary' as null.\n"
+    + ASSESSMENT_CRITERIA
+)
+# Persistent assessment cache defaults (see crawl_cache.AssessmentCache)
+DEFAULT_ASSESSMENT_CACHE: Path = Path(".cache/assessments.sqlite")
+DEFAULT_CACHE_MAX_ENTRIES: int = 100_000
+DEFAULT_CACHE_MAX_AGE_DAYS: float = 30.0
+# Conditional-request cache for GitHub REST responses (see crawl_cache.HttpResponseCache)
+DEFAULT_HTTP_CACHE_DIR: Path = Path(".cache/github-http")
+DEFAULT_HTTP_CACHE_MAX_MB: int = 512
+# Batch input written by --batch, and seconds between status checks of the job
+DEFAULT_BATCH_FILE: Path = Path(".cache/batch_input.jsonl")
+DEFAULT_BATCH_POLL_INTERVAL: float = 30.0
+# Per-repo updated_at watermarks for --incremental crawls
+DEFAULT_STATE_FILE: Path = Path(".cache/crawl_state.json")
+ISSUE_COUNT_GRAPHQL_QUERY: str = """
+query($query: String!) {
+  search(query: $query, type: ISSUE, first: 0) { issueCount }
+}
+"""
+# One query per search page returns issues together with their last two comments,
+# replacing the per-issue REST comment requests.
+CLOSED_ISSUES_GRAPHQL_QUERY: str = """
+query($query: String!, $first: Int!, $after: String) {
+  search(query: $query, type: ISSUE, first: $first, after: $after) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Issue {
+        number
+        url
+        title
+        body
+        updatedAt
+        labels(first: 20) { nodes { name } }
+        comments(last: 2) { nodes { body author { login } } }
+      }
+    }
+  }
+}
 """
 
 # --- Setup ---
@@ -67,6 +195,28 @@ class Answer(pydantic.BaseModel):
     )
 
 
+class CommentRecord(TypedDict):
+    """A single issue comment."""
+
+    author: Optional[str]
+    body: str
+
+
+class IssueRecord(TypedDict):
+    """Issue fields needed for assessment, independent of how they were harvested."""
+
+    url: str
+    number: int
+    title: str
+    body: Optional[str]
+    labels: list[str]
+    updated_at: Optional[str]
+    # Last (up to) two comments, oldest first; None until fetched
+    last_comments: Optional[list[CommentRecord]]
+    # PyGithub handle for fetching comments lazily over REST; None for GraphQL harvests
+    issue: Optional[Issue]
+
+
 class AssessedIssue(TypedDict):
     """Structure to hold assessment results."""
 
@@ -75,13 +225,24 @@ class AssessedIssue(TypedDict):
     assessment: Optional[Answer]
     issue_body: Optional[str]
     answer_text: Optional[str]
+    updated_at: Optional[str]
+    # Why the issue was not assessed (no comments, or a pre-filter rule); None if it was
+    skip_reason: Optional[str]
+    # URL of the issue this one near-duplicates (see --dedup)
+    duplicate_of: Optional[str]
+    # Rendered prompt of an assessment deferred to a batch job; not written out
+    prompt: Optional[str]
 
 
 # --- LLM Assessment ---
 
 
-def _create_llm_agent() -> pydantic_ai.Agent[None, Answer]:
-    """Initializes the LLM agent for answer assessment."""
+def _create_llm_agent(
+    model_id: str = DEFAULT_MODEL_ID,
+    system_prompt: str = SYSTEM_PROMPT,
+    http_pool: ModelHTTPPool | None = None,
+) -> pydantic_ai.Agent[None, Answer]:
+    """Initializes the LLM agent for answer assessment, optionally over `http_pool`."""
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         log.error(
@@ -98,16 +259,8 @@ def _create_llm_agent() -> pydantic_ai.Agent[None, Answer]:
         # but let's keep it here for clarity if pydantic_ai supports it directly.
         # If error, move model_id config solely into llm_config.
         # DEFAULT_MODEL_ID, # Removed based on user feedback/pydantic_ai usage
-        DEFAULT_MODEL_ID,
-        system_prompt=(
-            "You are assessing GitHub issue comments to determine if they provide a definitive, code-based answer, conforming to the provided JSON schema."
-            "A qualifying answer must satisfy two criteria: "
-            "1. Reference Standard: It must be clear and complete enough to verify the correctness of other potential answers. "
-            "2. Code-Based & Static: It must be derivable *solely* from analyzing the code in the codebase, without requiring code execution, tests, or external state checks (like CI). "
-            "Focus ONLY on the provided comment text. "
-            "Respond using the JSON schema, providing an explanation in 'in_what_way_question_is_answered_or_not'. "
-            "Provide a summary in 'answer_summary' ONLY IF BOTH criteria are met, otherwise leave 'answer_summary' as null."
-        ),
+        create_model(model_id, http_pool),
+        system_prompt=system_prompt,
         instrument=False,  # Keep output clean
         result_type=Answer,
         # Explicitly set parsing model if needed, assuming it uses llm_config otherwise
@@ -115,55 +268,458 @@ def _create_llm_agent() -> pydantic_ai.Agent[None, Answer]:
     )
 
 
+def _render_prompt(
+    issue_title: str,
+    issue_body: str | None,
+    answer_text: str,
+    template: str = ASSESSMENT_PROMPT,
+) -> str:
+    """Renders `template` with each section fitted to its token budget."""
+    return prompt_builder.build(
+        template, issue_title, issue_body or "No body provided.", answer_text
+    )
+
+
+def _assessment_cache_key(
+    prompt: str, model_id: str = DEFAULT_MODEL_ID, system_prompt: str = SYSTEM_PROMPT
+) -> str:
+    return AssessmentCache.make_key(
+        model_id, system_prompt, prompt, Answer.model_json_schema()
+    )
+
+
+async def _call_model(
+    agent: pydantic_ai.Agent[None, Any],
+    prompt: str,
+    model_id: str,
+    llm_limiter: AsyncAdaptiveLimiter | None = None,
+    spend: SpendTracker | None = None,
+) -> AgentRunResult[Any] | None:
+    """
+    Runs `agent` on `prompt` the way every model call of a crawl is made: under
+    `llm_limiter` (which is told about throttling responses), with `retry_policy`'s
+    retries, deadline and hedging, timed as "llm.<model_id>" in `metrics`, and with the
+    token usage of every attempt that completes (a hedge's loser too) charged to
+    `spend`. Returns None if the spend budget ran out while waiting for a slot; raises
+    the last error once retries are used up.
+    """
+
+    async def attempt() -> AgentRunResult[Any] | None:
+        if llm_limiter is None:
+            with metrics.timer(f"llm.{model_id}"):
+                result = await retry_policy.run_attempt(agent.run(prompt), model_id)
+        else:
+            async with llm_limiter:
+                # The budget may have run out while waiting for a slot
+                if spend is not None and spend.exhausted:
+                    return None
+                started_at = time.monotonic()
+                try:
+                    with metrics.timer(f"llm.{model_id}"):
+                        result = await retry_policy.run_attempt(agent.run(prompt), model_id)
+                except Exception as e:
+                    if getattr(e, "status_code", None) in THROTTLING_STATUS_CODES:
+                        metrics.increment("llm.throttled")
+                        llm_limiter.on_throttle(retry_after(e), started_at)
+                    raise
+                llm_limiter.on_success()
+        if spend is not None:
+            spend.record_usage(model_id, result.usage())
+        return result
+
+    return await retry_policy.call(attempt, model_id)
+
+
 async def _assess_answer(
     agent: pydantic_ai.Agent[None, Answer],
     issue_title: str,
     issue_body: str | None,
     answer_text: str,
+    cache: AssessmentCache | None = None,
+    llm_limiter: AsyncAdaptiveLimiter | None = None,
+    prompt: str | None = None,
+    spend: SpendTracker | None = None,
+    model_id: str = DEFAULT_MODEL_ID,
+    system_prompt: str = SYSTEM_PROMPT,
 ) -> Answer | None:
-    """Uses the LLM agent to assess if the provided text answers an issue."""
+    """
+    Uses the LLM agent to assess if the provided text answers an issue.
+    Previously judged prompts are answered from `cache` without calling the agent;
+    agent calls are made by `_call_model`, under `llm_limiter` and charged to `spend`.
+    None is returned once the call fails for good. `prompt` is
+    the already rendered prompt, if the caller has one. `model_id` and `system_prompt`
+    must match the agent's; they key the cache and price the usage.
+    """
     try:
-        prompt = ASSESSMENT_PROMPT.format(
-            title=issue_title,
-            body=issue_body or "No body provided.",
-            answer_text=answer_text,
-        )
-        result = await agent.run(prompt)
+        if prompt is None:
+            prompt = _render_prompt(issue_title, issue_body, answer_text)
+        cache_key = None
+        if cache is not None:
+            cache_key = _assessment_cache_key(prompt, model_id, system_prompt)
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                log.debug(f"Assessment cache hit for '{issue_title}'.")
+                return Answer.model_validate_json(cached)
+
+        if spend is not None and spend.exhausted:
+            return None
+
+        result = await _call_model(agent, prompt, model_id, llm_limiter, spend)
+        if result is None:
+            return None
         log.debug(f"Assessment for '{issue_title}': {result.data}")
+        if cache is not None and cache_key is not None:
+            await asyncio.to_thread(cache.put, cache_key, result.data.model_dump_json())
         return result.data
     except Exception as e:
         # Include issue title for better error tracking
         log.error(f"Error assessing issue '{issue_title}': {e}")
-        # Consider how to handle assessment errors; returning None might skew results.
-        # Could return None or raise to signal failure. Defaulting to None for now.
+        # Counted as a failed assessment (not as "no answer") in the summary
         return None
 
 
+async def _screen_answer(
+    tiers: list[ScreeningTier],
+    issue_title: str,
+    prompt: str,
+    answer_text: str,
+    cache: AssessmentCache | None = None,
+) -> Answer | None:
+    """
+    Runs the cheap cascade tiers in order. Returns a negative assessment as soon as a
+    tier confidently rules the issue out, or None if it should go to the final model.
+    """
+    for tier in tiers:
+        screening = await tier.screen(prompt, answer_text, cache)
+        if screening is not None and not screening.escalate:
+            log.debug(f"'{issue_title}' screened out by {tier.name}: {screening.reason}")
+            return Answer(
+                in_what_way_question_is_answered_or_not=f"Screened out by {tier.name}: {screening.reason}",
+                answer_summary=None,
+            )
+    return None
+
+
+async def _assess_in_batch(
+    pending: list[tuple[AssessedIssue, str]],
+    batch_file: Path,
+    cache: AssessmentCache | None = None,
+    base_url: str | None = None,
+    poll_interval: float = DEFAULT_BATCH_POLL_INTERVAL,
+    spend: SpendTracker | None = None,
+) -> None:
+    """
+    Assesses `pending` (issue, rendered prompt) pairs through one provider batch job
+    instead of one interactive call each, filling in the issues' `assessment` in place.
+    Prompts are the same as `_assess_answer`'s, so results are shared with it through
+    `cache`; issues the batch fails on are left without an assessment.
+    """
+    provider, _, model_name = DEFAULT_MODEL_ID.partition(":")
+    if provider != "openai":
+        raise ValueError(f"--batch needs an OpenAI-compatible model, not {DEFAULT_MODEL_ID}")
+
+    prompts: dict[str, str] = {}
+    batch_file.parent.mkdir(parents=True, exist_ok=True)
+    with batch_file.open("w", encoding="utf-8") as f:
+        for result, prompt in pending:
+            prompts[result["url"]] = prompt
+            request = build_batch_request(
+                result["url"], model_name, SYSTEM_PROMPT, prompt, "Answer", Answer.model_json_schema()
+            )
+            f.write(json.dumps(request) + "\n")
+    log.info(f"Wrote {len(prompts)} batch requests to {batch_file}.")
+
+    client = BatchClient(base_url, poll_interval=poll_interval)
+    try:
+        with metrics.timer("batch.job"):
+            batch_id = await client.submit(batch_file)
+            log.info(f"Submitted batch {batch_id} to {client.base_url}.")
+            batch = await client.wait(batch_id)
+            records = await client.results(batch)
+    finally:
+        await client.aclose()
+    if batch["status"] != "completed":
+        log.error(f"Batch {batch_id} ended with status '{batch['status']}'.")
+
+    for result, _ in pending:
+        record = records.get(result["url"])
+        content = response_content(record) if record else None
+        if spend is not None and content is not None:
+            spend.record_openai_usage(
+                DEFAULT_MODEL_ID, record["response"]["body"].get("usage", {}), batch=True
+            )
+        if content is None:
+            log.error(f"Batch returned no assessment for {result['url']}: {(record or {}).get('error')}")
+            continue
+        try:
+            result["assessment"] = Answer.model_validate_json(content)
+        except pydantic.ValidationError as e:
+            log.error(f"Unparseable batch assessment for {result['url']}: {e}")
+            continue
+        if cache is not None:
+            await asyncio.to_thread(
+                cache.put,
+                _assessment_cache_key(prompts[result["url"]]),
+                result["assessment"].model_dump_json(),
+            )
+
+
 # --- GitHub Interaction ---
 
 
-def _create_github_client() -> Github:
+class _SharedSessionConnection:
+    """
+    PyGithub connection class that sends every request through one shared
+    requests.Session. PyGithub builds a connection object per request once connection
+    classes are injected; sharing the session keeps connection pooling (and the HTTP
+    cache adapter) across those objects and across the GitHub worker threads.
+    """
+
+    session: requests.Session
+    limiter: ThreadAdaptiveLimiter | None = None
+    protocol: str = "https"
+    default_port: int = 443
+
+    def __init__(
+        self,
+        host: str,
+        port: int | None = None,
+        strict: bool = False,
+        timeout: int | None = None,
+        retry: object = None,
+        pool_size: int | None = None,
+        **kwargs: object,
+    ):
+        self.host = host
+        self.port = port or self.default_port
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+
+    def request(
+        self,
+        verb: str,
+        url: str,
+        input: object,
+        headers: dict[str, str],
+        stream: bool = False,
+    ) -> None:
+        self.verb = verb
+        self.url = url
+        self.input = input
+        self.headers = headers
+        self.stream = stream
+
+    def getresponse(self) -> RequestsResponse:
+        if self.limiter is None:
+            return RequestsResponse(self._timed_send())
+        with self.limiter:
+            started_at = time.monotonic()
+            response = self._timed_send()
+            _observe_github_response(self.limiter, response, started_at)
+        return RequestsResponse(response)
+
+    def _timed_send(self) -> requests.Response:
+        with metrics.timer(_github_operation(self.url)):
+            response = self._send()
+        if response.status_code >= 400:
+            metrics.increment(f"github.status_{response.status_code}")
+        return response
+
+    def _send(self) -> requests.Response:
+        return self.session.request(
+            self.verb,
+            f"{self.protocol}://{self.host}:{self.port}{self.url}",
+            headers=self.headers,
+            data=self.input,
+            timeout=self.timeout,
+            verify=self.verify,  # type: ignore[arg-type]
+            allow_redirects=False,
+            stream=self.stream,
+        )
+
+    def close(self) -> None:
+        # The session outlives individual connections
+        pass
+
+
+class _SharedSessionHTTPConnection(_SharedSessionConnection):
+    protocol = "http"
+    default_port = 80
+
+
+class _CountingGithubRetry(github.GithubRetry):
+    """GithubRetry that counts each retry it makes in the crawl metrics."""
+
+    def increment(self, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        metrics.increment("github.retries")
+        return super().increment(*args, **kwargs)
+
+
+def _github_operation(url: str) -> str:
+    """Metrics name for a GitHub API request path."""
+    path = url.split("?", 1)[0]
+    if path.startswith("/search/"):
+        return "github.search"
+    if path.startswith("/graphql"):
+        return "github.graphql"
+    if path.endswith("/comments"):
+        return "github.comments"
+    return "github.rest"
+
+
+def _observe_github_response(
+    limiter: ThreadAdaptiveLimiter, response: requests.Response, started_at: float
+) -> None:
+    """Feeds GitHub's rate-limit headers into the adaptive limiter."""
+    headers = response.headers
+    remaining = headers.get("X-RateLimit-Remaining")
+    window = headers.get("X-RateLimit-Limit")
+    reset_in = max(0.0, float(headers.get("X-RateLimit-Reset", 0)) - time.time())
+
+    if response.status_code in (403, 429) and (
+        "Retry-After" in headers or remaining == "0"
+    ):
+        # Throttled (primary or secondary limit): pause for as long as GitHub asks
+        limiter.on_throttle(float(headers.get("Retry-After") or reset_in), started_at)
+    elif remaining is not None and window and int(remaining) < int(window) * GITHUB_RATE_LIMIT_RESERVE:
+        # Running low: back off and spread what is left over the rest of the window
+        limiter.on_throttle(reset_in / max(int(remaining), 1), started_at)
+    else:
+        limiter.on_success()
+
+
+def _install_github_transport(
+    http_cache: HttpResponseCache | None, limiter: ThreadAdaptiveLimiter | None = None
+) -> None:
+    """
+    Routes all PyGithub traffic through one pooled session, with optional caching and
+    an adaptive limit on concurrent requests.
+    """
+    adapter_kwargs = dict(
+        max_retries=_CountingGithubRetry(),
+        pool_connections=max_github_workers,
+        pool_maxsize=max_github_workers,
+    )
+    adapter = (
+        CachingHTTPAdapter(http_cache, **adapter_kwargs)
+        if http_cache is not None
+        else requests.adapters.HTTPAdapter(**adapter_kwargs)
+    )
+    session = requests.Session()
+    # Same as PyGithub: a non-None auth disables requests' .netrc fallback
+    session.auth = Requester.noopAuth
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _SharedSessionConnection.session = session
+    _SharedSessionConnection.limiter = limiter
+    Requester.injectConnectionClasses(
+        _SharedSessionHTTPConnection,  # type: ignore[arg-type]
+        _SharedSessionConnection,  # type: ignore[arg-type]
+    )
+
+
+def _create_github_client(
+    http_cache: HttpResponseCache | None = None,
+    limiter: ThreadAdaptiveLimiter | None = None,
+) -> Github:
     """Initializes the GitHub client."""
+    _install_github_transport(http_cache, limiter)
+    if http_cache is not None:
+        log.info(f"Caching GitHub responses in {http_cache.directory}.")
+    # PyGithub spaces requests 0.25s apart by default; an adaptive limiter paces
+    # requests from GitHub's own rate-limit signals instead.
+    pacing: dict[str, Any] = (
+        {"seconds_between_requests": None}
+        if limiter is not None and limiter.adaptive
+        else {}
+    )
+    # GITHUB_API_URL points the crawl at GitHub Enterprise or a local stand-in
+    # (see fake_services.py)
+    base_url = os.getenv("GITHUB_API_URL")
+    if base_url:
+        log.info(f"Using GitHub API at {base_url}.")
+        pacing["base_url"] = base_url.rstrip("/")
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         log.warning(
             "GITHUB_TOKEN environment variable not set. Using anonymous access (may be rate-limited)."
         )
-        return Github()
+        return Github(**pacing)
     else:
         log.info("Using GitHub token for authenticated access.")
-        return Github(token)
+        return Github(token, **pacing)
 
 
-def _get_closed_issues(gh: Github, repo_name: str, limit: int) -> Iterator[Issue]:
-    """Fetches closed issues (not PRs) from the specified repository, yielding them."""
-    # Exclude issues with the 'module: flaky-tests' label
+def _closed_issues_query(
+    repo_name: str,
+    updated_since: str | None = None,
+    closed_window: tuple[str, str] | None = None,
+) -> str:
+    """
+    Search query for closed issues, excluding the 'module: flaky-tests' label.
+    With `updated_since`, only issues updated at or after that timestamp match; with
+    `closed_window`, only issues closed within that inclusive range.
+    """
     query = f'repo:{repo_name} is:issue is:closed -label:"module: flaky-tests"'
+    if updated_since:
+        # Inclusive so issues sharing the watermark's second are not lost
+        query += f" updated:>={updated_since}"
+    if closed_window:
+        query += f" closed:{closed_window[0]}..{closed_window[1]}"
+    return query
+
+
+def _normalize_timestamp(timestamp: str) -> str:
+    """Normalizes REST (+00:00) and GraphQL (Z) timestamps to one UTC ISO 8601 form."""
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _issue_record(issue: Issue) -> IssueRecord:
+    """Wraps a REST search result; its comments are fetched later on demand."""
+    return IssueRecord(
+        url=issue.html_url,
+        number=issue.number,
+        title=issue.title,
+        body=issue.body,
+        labels=[label.name for label in issue.labels],
+        updated_at=(
+            _normalize_timestamp(issue.updated_at.isoformat())
+            if issue.updated_at
+            else None
+        ),
+        last_comments=None,
+        issue=issue,
+    )
+
+
+def _lazy_issue(gh: Github, repo_name: str, number: int) -> Issue:
+    """An issue handle that is only fetched once one of its attributes is read."""
+    repo = gh.get_repo(repo_name, lazy=True)
+    return Issue(gh.requester, url=f"{repo.url}/issues/{number}")
+
+
+def _get_closed_issues(
+    gh: Github,
+    repo_name: str,
+    limit: int,
+    updated_since: str | None = None,
+    oldest_first: bool = False,
+    closed_window: tuple[str, str] | None = None,
+) -> Iterator[IssueRecord]:
+    """
+    Fetches closed issues (not PRs) from the specified repository, yielding them.
+    Incremental crawls walk `oldest_first` so that a limit only cuts off issues the
+    next run will still pick up.
+    """
+    query = _closed_issues_query(repo_name, updated_since, closed_window)
     log.info(f"Searching for issues matching query: '{query}' (limit {limit})...")
 
     try:
         # Use search_issues for label filtering, sort by updated time
-        issues_result = gh.search_issues(query=query, sort="updated", order="desc")
+        issues_result = gh.search_issues(
+            query=query, sort="updated", order="asc" if oldest_first else "desc"
+        )
 
         count = 0
         # PaginatedList needs iteration; respect the limit
@@ -171,9 +727,11 @@ def _get_closed_issues(gh: Github, repo_name: str, limit: int) -> Iterator[Issue
             if count >= limit:
                 log.info(f"Reached limit of {limit} issues.")
                 break
-            # Double-check it's not a PR (search should handle is:issue, but belt-and-suspenders)
-            if not hasattr(issue, "pull_request") or issue.pull_request is None:
-                yield issue
+            # Double-check it's not a PR (search should handle is:issue, but belt-and-suspenders).
+            # Checked on the URL: `issue.pull_request` is absent from issue search results,
+            # and PyGithub would fetch every issue again to look for it.
+            if "/pull/" not in issue.html_url:
+                yield _issue_record(issue)
                 count += 1
             else:
                 # This case should be rare with 'is:issue' in query
@@ -187,228 +745,1397 @@ def _get_closed_issues(gh: Github, repo_name: str, limit: int) -> Iterator[Issue
             )
 
     except github.GithubException as e:
+        # Raised on, so the run is marked incomplete rather than ending with a partial harvest
         log.error(f"GitHub API error fetching issues: {e}")
-        # Propagate the error or return empty? Returning empty for graceful degradation.
-        return iter([])
-    except Exception as e:
-        log.error(f"Unexpected error fetching issues: {e}")
-        return iter([])
+        raise
+
+
+def _get_closed_issues_graphql(
+    gh: Github,
+    repo_name: str,
+    limit: int,
+    page_size: int = DEFAULT_GRAPHQL_PAGE_SIZE,
+    updated_since: str | None = None,
+    oldest_first: bool = False,
+    closed_window: tuple[str, str] | None = None,
+) -> Iterator[IssueRecord]:
+    """
+    Fetches closed issues through GraphQL search, yielding them with their last two
+    comments already attached. Costs one request per page instead of one search
+    request per 30 issues plus comment requests for every issue. Errors (once
+    PyGithub's retries are used up) are raised after the issues already yielded.
+    """
+    order = "asc" if oldest_first else "desc"
+    query = f"{_closed_issues_query(repo_name, updated_since, closed_window)} sort:updated-{order}"
+    log.info(
+        f"Searching (GraphQL, {page_size}/page) for issues matching query: '{query}' (limit {limit})..."
+    )
+
+    try:
+        count = 0
+        cursor: str | None = None
+        while count < limit:
+            _, data = gh.requester.graphql_query(
+                CLOSED_ISSUES_GRAPHQL_QUERY,
+                {
+                    "query": query,
+                    "first": min(page_size, limit - count),
+                    "after": cursor,
+                },
+            )
+            search = data["data"]["search"]
+            for node in search["nodes"]:
+                # Nodes that are not issues come back as empty objects
+                if not node:
+                    continue
+                yield IssueRecord(
+                    url=node["url"],
+                    number=node["number"],
+                    title=node["title"],
+                    body=node["body"],
+                    labels=[label["name"] for label in node["labels"]["nodes"]],
+                    updated_at=_normalize_timestamp(node["updatedAt"]),
+                    last_comments=[
+                        CommentRecord(
+                            author=(comment["author"] or {}).get("login"),
+                            body=comment["body"],
+                        )
+                        for comment in node["comments"]["nodes"]
+                    ],
+                    issue=None,
+                )
+                count += 1
+            if not search["pageInfo"]["hasNextPage"]:
+                break
+            cursor = search["pageInfo"]["endCursor"]
+
+        if count >= limit:
+            log.info(f"Reached limit of {limit} issues.")
+        elif count == 0:
+            log.warning(
+                f"No closed issues (non-PR, non-flaky-test) found matching criteria in {repo_name}."
+            )
+
+    except github.GithubException as e:
+        # Raised on, so the run is marked incomplete rather than ending with a partial harvest
+        log.error(f"GitHub API error fetching issues: {e}")
+        raise
+
+
+def _count_search_results(gh: Github, query: str, use_graphql: bool) -> int:
+    """Returns the true number of issues matching `query`, beyond the search cap."""
+    if use_graphql:
+        _, data = gh.requester.graphql_query(ISSUE_COUNT_GRAPHQL_QUERY, {"query": query})
+        return data["data"]["search"]["issueCount"]
+    # PaginatedList.totalCount is derived from the (capped) page links, so ask directly
+    _, data = gh.requester.requestJsonAndCheck(
+        "GET", "/search/issues", parameters={"q": query, "per_page": 1}
+    )
+    return data["total_count"]
+
+
+def _format_search_timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def _plan_search_windows(
+    gh: Github,
+    repo_name: str,
+    start: datetime,
+    end: datetime,
+    github_executor: ThreadPoolExecutor,
+    use_graphql: bool = False,
+) -> list[tuple[str, str]]:
+    """
+    Splits [start, end] into `closed:` windows that each match at most
+    SEARCH_RESULT_CAP issues, bisecting any window that hits the cap. Both halves of a
+    split are counted concurrently. Returns non-empty windows, newest first.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def split(lo: datetime, hi: datetime) -> list[tuple[str, str]]:
+        window = (_format_search_timestamp(lo), _format_search_timestamp(hi))
+        count = await loop.run_in_executor(
+            github_executor,
+            _count_search_results,
+            gh,
+            _closed_issues_query(repo_name, closed_window=window),
+            use_graphql,
+        )
+        if count <= SEARCH_RESULT_CAP or hi - lo <= timedelta(seconds=1):
+            if count > SEARCH_RESULT_CAP:
+                log.warning(
+                    f"Window {window[0]}..{window[1]} still matches {count} issues; only {SEARCH_RESULT_CAP} are reachable."
+                )
+            return [window] if count else []
+        # Windows are inclusive at one-second resolution, so halves must not overlap
+        mid = lo + (hi - lo) // 2
+        older, newer = await asyncio.gather(
+            split(lo, mid), split(mid + timedelta(seconds=1), hi)
+        )
+        return newer + older
+
+    return await split(start.replace(microsecond=0), end.replace(microsecond=0))
 
 
-def _get_potential_answer_text(issue: Issue) -> str | None:
+async def _iterate_in_executor(
+    iterator: Iterator[IssueRecord], github_executor: ThreadPoolExecutor
+) -> AsyncIterator[IssueRecord]:
+    """Drives a blocking harvester on the GitHub thread pool, one next() at a time."""
+    loop = asyncio.get_running_loop()
+    while True:
+        record = await loop.run_in_executor(github_executor, next, iterator, None)
+        if record is None:
+            return
+        yield record
+
+
+async def _harvest_partitioned(
+    gh: Github,
+    repo_name: str,
+    limit: int,
+    github_executor: ThreadPoolExecutor,
+    use_graphql: bool = False,
+    graphql_page_size: int = DEFAULT_GRAPHQL_PAGE_SIZE,
+) -> AsyncIterator[IssueRecord]:
     """
-    Fetches the last two comments of an issue, concatenates them, and returns the text.
-    Returns None if no comments are found.
+    Harvests the repository's full closed-issue history by fetching the planned
+    `closed:` windows concurrently, getting past the per-query search cap.
     """
+    loop = asyncio.get_running_loop()
+    created_at = await loop.run_in_executor(
+        github_executor, lambda: gh.get_repo(repo_name).created_at
+    )
+    windows = await _plan_search_windows(
+        gh,
+        repo_name,
+        created_at,
+        datetime.now(timezone.utc),
+        github_executor,
+        use_graphql,
+    )
+    log.info(f"Partitioned search into {len(windows)} closed-date windows.")
+
+    # Leave GitHub workers free for comment fetches while windows are harvested
+    window_slots = asyncio.Semaphore(max(1, max_github_workers // 2))
+    records: asyncio.Queue[IssueRecord | None] = asyncio.Queue(maxsize=max_github_workers * 4)
+
+    failed_windows: list[tuple[str, str]] = []
+
+    async def harvest_window(window: tuple[str, str]) -> None:
+        try:
+            async with window_slots:
+                harvester = (
+                    _get_closed_issues_graphql(
+                        gh, repo_name, limit, graphql_page_size, closed_window=window
+                    )
+                    if use_graphql
+                    else _get_closed_issues(gh, repo_name, limit, closed_window=window)
+                )
+                async for record in _iterate_in_executor(harvester, github_executor):
+                    await records.put(record)
+        except Exception as e:
+            log.error(f"Harvesting closed-date window {window[0]}..{window[1]} failed: {e}")
+            failed_windows.append(window)
+        finally:
+            # One sentinel per window marks it as finished
+            await records.put(None)
+
+    harvesters = [asyncio.create_task(harvest_window(window)) for window in windows]
+    finished = 0
+    count = 0
     try:
-        # Fetch comments (API doesn't support sorting by creation desc directly)
-        comments_paginated: PaginatedList[IssueComment] = issue.get_comments()
+        while finished < len(harvesters) and count < limit:
+            record = await records.get()
+            if record is None:
+                finished += 1
+                continue
+            yield record
+            count += 1
+        if count >= limit:
+            log.info(f"Reached limit of {limit} issues.")
+        elif failed_windows:
+            raise RuntimeError(
+                f"{len(failed_windows)} of {len(windows)} closed-date windows could not be harvested"
+            )
+    finally:
+        for harvester_task in harvesters:
+            harvester_task.cancel()
 
-        if comments_paginated.totalCount == 0:  # type: ignore[attr-defined]
-            log.debug(f"No comments found for issue {issue.number}.")
-            return None
 
-        # Convert to list to easily get the last elements. This loads all comments.
-        # For issues with extreme comment counts, this could be memory-intensive.
-        # Alternative: iterate through pages backwards if PyGithub supported it easily,
-        # or use .get_page(last_page_index) but calculating last_page_index is needed.
-        all_comments: list[IssueComment] = list(comments_paginated)
+def _get_last_comments(issue: Issue, n: int = 2) -> list[IssueComment]:
+    """
+    Fetches only the last `n` comments of an issue, oldest first.
+
+    Uses the comment count already present on the issue to jump straight to the final
+    page (and the one before it if the final page is short), so this costs at most two
+    requests no matter how long the thread is.
+    """
+    if issue.comments == 0:
+        return []
+
+    per_page = issue.requester.per_page
+    comments_paginated: PaginatedList[IssueComment] = issue.get_comments()
+    page = (issue.comments - 1) // per_page
+    last_comments: list[IssueComment] = []
+    # Walk backwards from the last page; the count can be slightly stale, so an empty
+    # or short page just means we step back one more.
+    while page >= 0 and len(last_comments) < n:
+        last_comments = comments_paginated.get_page(page) + last_comments
+        page -= 1
+    return last_comments[-n:]
+
+
+def _get_potential_answer_text(record: IssueRecord) -> str | None:
+    """
+    Fetches the last two comments of an issue (unless the harvester already attached
+    them), concatenates them, and returns the text.
+    Returns None if no comments are found; GitHub errors are raised, since they say
+    nothing about whether the issue has comments.
+    """
+    number = record["number"]
+    if record["last_comments"] is None and record["issue"] is not None:
+        record["last_comments"] = [
+            CommentRecord(
+                author=comment.user.login if comment.user else None,
+                body=comment.body,
+            )
+            for comment in _get_last_comments(record["issue"])
+        ]
+    last_comments = record["last_comments"]
+
+    if not last_comments:
+        log.debug(f"No comments found for issue {number}.")
+        return None
+
+    if len(last_comments) == 1:
+        log.debug(f"Found 1 comment for issue {number}.")
+        return f"Last comment:\n{last_comments[0]['body']}"
+    elif len(last_comments) == 2:
+        log.debug(f"Found 2 comments for issue {number}.")
+        # last_comments[0] is second-to-last, last_comments[1] is the last
+        return (
+            f"Last comment:\n{last_comments[1]['body']}\n\n"
+            f"---\nSecond-to-last comment:\n{last_comments[0]['body']}"
+        )
+    # Should not be reachable: _get_last_comments returns at most two comments
+    return None
+
+
+# --- Output ---
+
 
-        if not all_comments:
-            # Should not happen if totalCount > 0, but defensively check.
+def _assessed_issue_json(result: AssessedIssue) -> dict[str, Any]:
+    """Converts an AssessedIssue into a JSON-serializable dict (one JSON Lines record)."""
+    # Convert Pydantic model to dict for JSON serialization
+    assessment_dict = result["assessment"].model_dump() if result["assessment"] else None
+    return {
+        "url": result["url"],
+        "title": result["title"],
+        "issue_body": result["issue_body"],
+        "answer_text": result["answer_text"],
+        "assessment": assessment_dict,
+        "updated_at": result["updated_at"],
+        "skip_reason": result["skip_reason"],
+        "duplicate_of": result["duplicate_of"],
+    }
+
+
+def _assessment_failed(result: AssessedIssue) -> bool:
+    """Whether the issue's comment fetch or assessment failed (as opposed to being skipped)."""
+    return result["assessment"] is None and result["skip_reason"] is None
+
+
+def _load_assessed_urls(output_file: Path) -> set[str]:
+    """
+    Returns the URLs already recorded in a JSON Lines output file, except those whose
+    comment fetch or assessment failed, so a --resume run retries them. A retried
+    issue's new record is appended after the old one: readers of the file keep the
+    last record per URL. A trailing partial line left behind by a crash is truncated so
+    new records can be appended cleanly.
+    """
+    if not output_file.exists():
+        return set()
+
+    with output_file.open("rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            complete_length = content.rfind(b"\n") + 1
             log.warning(
-                f"Comment totalCount > 0 but list conversion yielded empty for issue {issue.number}"
+                f"Dropping incomplete final record in {output_file} ({len(content) - complete_length} bytes)."
             )
-            return None
+            f.truncate(complete_length)
+            content = content[:complete_length]
 
-        # Get the last 1 or 2 comments from the full list
-        last_comments = all_comments[-2:]
-
-        if len(last_comments) == 1:
-            log.debug(f"Found 1 comment for issue {issue.number}.")
-            # Type checker might complain about accessing .body if IssueComment type hints are incomplete
-            return f"Last comment:\n{last_comments[0].body}"
-        elif len(last_comments) == 2:
-            log.debug(f"Found 2 comments for issue {issue.number}.")
-            # last_comments[0] is second-to-last, last_comments[1] is the last
-            return (
-                f"Last comment:\n{last_comments[1].body}\n\n"
-                f"---\nSecond-to-last comment:\n{last_comments[0].body}"
+    # Whether each URL's last record is a failure
+    failed: dict[str, bool] = {}
+    for line_number, line in enumerate(content.decode("utf-8").splitlines(), start=1):
+        try:
+            saved = json.loads(line)
+            failed[saved["url"]] = (
+                saved.get("assessment") is None and saved.get("skip_reason") is None
             )
-        # Should not be reachable if all_comments was not empty
-        return None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            log.warning(f"Skipping unreadable line {line_number} of {output_file}: {e}")
+    retried = sum(failed.values())
+    if retried:
+        log.info(f"{retried} failed issues in {output_file} will be retried.")
+    return {url for url, url_failed in failed.items() if not url_failed}
 
-    except github.GithubException as e:
-        log.error(f"GitHub API error fetching comments for issue {issue.number}: {e}")
+
+def _load_replay_records(
+    replay_file: Path, limit: int
+) -> Iterator[tuple[IssueRecord, str | None, str | None]]:
+    """
+    Streams up to `limit` records of a previous run's JSON Lines output as issue
+    records with their saved answer text and skip reason, for re-assessment without
+    any GitHub traffic. Saved output carries no labels or comment authors. Of several
+    records for one URL (a resumed run's retries), only the last is replayed.
+    """
+    last_lines: dict[str, int] = {}
+    with replay_file.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            try:
+                last_lines[json.loads(line)["url"]] = line_number
+            except (ValueError, KeyError, TypeError):
+                pass  # Reported below
+
+    count = 0
+    with replay_file.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if count >= limit:
+                log.info(f"Reached limit of {limit} replayed records.")
+                return
+            try:
+                saved = json.loads(line)
+                if last_lines.get(saved["url"]) != line_number:
+                    continue
+                record = IssueRecord(
+                    url=saved["url"],
+                    number=int(saved["url"].rstrip("/").rsplit("/", 1)[-1]),
+                    title=saved["title"],
+                    body=saved["issue_body"],
+                    labels=[],
+                    updated_at=saved.get("updated_at"),
+                    last_comments=None,
+                    issue=None,
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                log.warning(f"Skipping unreadable line {line_number} of {replay_file}: {e}")
+                continue
+            yield record, saved.get("answer_text"), saved.get("skip_reason")
+            count += 1
+
+
+# --- Crawl State ---
+
+
+def _load_watermark(state_file: Path, repo_name: str) -> str | None:
+    """Returns the latest `updated_at` processed for `repo_name` by earlier runs."""
+    if not state_file.exists():
         return None
-    except Exception as e:
-        # Catching broad Exception is generally discouraged, but useful here for robustness.
-        log.error(f"Unexpected error fetching comments for issue {issue.number}: {e}")
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except ValueError as e:
+        log.warning(f"Ignoring unreadable crawl state {state_file}: {e}")
         return None
+    return state.get("watermarks", {}).get(repo_name)
+
+
+def _save_watermark(state_file: Path, repo_name: str, watermark: str) -> None:
+    """
+    Records `watermark` for `repo_name`, keeping other repos' entries. Sharded crawls
+    serialize this read-modify-write with `state_lock`.
+    """
+    with state_lock or contextlib.nullcontext():
+        state: dict[str, Any] = {}
+        if state_file.exists():
+            try:
+                state = json.loads(state_file.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+        state.setdefault("watermarks", {})[repo_name] = watermark
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a crash never leaves a half-written state file
+        tmp_file = state_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp_file, state_file)
 
 
 # --- Main Orchestration ---
 
 
-async def _process_single_issue(
-    issue: Issue, agent: pydantic_ai.Agent[None, Answer], semaphore: asyncio.Semaphore
-) -> AssessedIssue | None:
-    """Processes a single issue: gets comments, assesses answer, returns result."""
-    async with semaphore:
-        log.info(f"Processing issue: {issue.html_url}")
-        answer_text = _get_potential_answer_text(issue)  # Keeping sync for now
+def _llm_concurrency_cap() -> int:
+    """Most concurrent calls an LLM limiter allows."""
+    return max_adaptive_concurrency if adaptive_concurrency else max_concurrent_assessments
 
-        if not answer_text:
-            log.warning(
-                f"No potential answer comments found for {issue.html_url}, skipping assessment."
-            )
-            # Return AssessedIssue with inputs but no assessment
-            return AssessedIssue(
-                url=issue.html_url,
-                title=issue.title,
-                assessment=None,
-                issue_body=issue.body,
-                answer_text=None,
-            )
 
-        # Run assessment asynchronously
-        assessment_result = await _assess_answer(
-            agent, issue.title, issue.body, answer_text
+def _create_model_http_pool(model_tiers: int = 1) -> ModelHTTPPool | None:
+    """
+    Connection pools for `model_tiers` models with their own concurrency limits, so
+    every call that gets a limiter slot can also get a kept-alive connection.
+    """
+    if not shared_http_pool:
+        return None
+    return ModelHTTPPool(_llm_concurrency_cap() * model_tiers, http2=model_http2)
+
+
+def _create_llm_limiter(name: str = "LLM") -> AsyncAdaptiveLimiter:
+    """LLM concurrency limit starting at --concurrency (fixed unless adaptive)."""
+    return AsyncAdaptiveLimiter(
+        name,
+        initial=max_concurrent_assessments,
+        min_limit=1 if adaptive_concurrency else max_concurrent_assessments,
+        max_limit=max_adaptive_concurrency if adaptive_concurrency else max_concurrent_assessments,
+        shared=llm_budget,
+    )
+
+
+def _create_github_limiter() -> ThreadAdaptiveLimiter:
+    """Concurrent GitHub request limit, bounded by the GitHub thread pool."""
+    return ThreadAdaptiveLimiter(
+        "GitHub",
+        initial=max(1, max_github_workers // 2) if adaptive_concurrency else max_github_workers,
+        min_limit=1 if adaptive_concurrency else max_github_workers,
+        max_limit=max_github_workers,
+        shared=github_budget,
+    )
+
+
+def _assessed_issue(
+    record: IssueRecord,
+    answer_text: str | None,
+    assessment: Answer | None,
+    skip_reason: str | None = None,
+    duplicate_of: str | None = None,
+    prompt: str | None = None,
+) -> AssessedIssue:
+    return AssessedIssue(
+        url=record["url"],
+        title=record["title"],
+        assessment=assessment,  # Store Answer object or None
+        issue_body=record["body"],  # Store issue body
+        answer_text=answer_text,  # Store concatenated comment text
+        updated_at=record["updated_at"],
+        skip_reason=skip_reason,
+        duplicate_of=duplicate_of,
+        prompt=prompt,
+    )
+
+
+def _issue_source(
+    gh: Github,
+    repo_name: str,
+    max_issues: int,
+    github_executor: ThreadPoolExecutor,
+    use_graphql: bool,
+    graphql_page_size: int,
+    updated_since: str | None,
+    oldest_first: bool,
+    partition: bool,
+) -> AsyncIterator[IssueRecord]:
+    """Picks the harvester; blocking ones are driven on the GitHub thread pool."""
+    if partition:
+        return _harvest_partitioned(
+            gh, repo_name, max_issues, github_executor, use_graphql, graphql_page_size
         )
-        if assessment_result and assessment_result.answer_summary is not None:
-            breakpoint()
-
-        return AssessedIssue(
-            url=issue.html_url,
-            title=issue.title,
-            assessment=assessment_result,  # Store Answer object or None
-            issue_body=issue.body,  # Store issue body
-            answer_text=answer_text,  # Store concatenated comment text
+    if use_graphql:
+        return _iterate_in_executor(
+            _get_closed_issues_graphql(
+                gh, repo_name, max_issues, graphql_page_size, updated_since, oldest_first
+            ),
+            github_executor,
         )
+    return _iterate_in_executor(
+        _get_closed_issues(gh, repo_name, max_issues, updated_since, oldest_first),
+        github_executor,
+    )
+
+
+# Ends a stage's input queue; each worker puts it back so its siblings see it too
+_END_OF_STAGE: Any = object()
+
+
+async def _run_stage(
+    name: str,
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    workers: int,
+    handle: Callable[[Any], Awaitable[Any]],
+) -> None:
+    """
+    Runs `workers` tasks that take items from `inbox`, pass them through `handle` and
+    put non-None results on `outbox`. Ends `outbox` once `inbox` has ended. Each item's
+    handling time and the inbox depth are recorded in `metrics`.
+    """
+
+    metric_name = name.replace(" ", "_")
+
+    async def worker() -> None:
+        while True:
+            metrics.sample_queue(metric_name, inbox.qsize())
+            item = await inbox.get()
+            if item is _END_OF_STAGE:
+                await inbox.put(_END_OF_STAGE)
+                return
+            try:
+                with metrics.timer(f"stage.{metric_name}"):
+                    result = await handle(item)
+            except Exception as e:
+                log.error(f"Error in {name} stage: {e}")
+                continue
+            if result is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await outbox.put(_END_OF_STAGE)
 
 
 async def _process_issues_concurrently(
-    gh: Github, agent: pydantic_ai.Agent[None, Answer], repo_name: str, max_issues: int
+    gh: Github | None,
+    agent: pydantic_ai.Agent[None, Answer] | None,
+    repo_name: str,
+    max_issues: int,
+    github_executor: ThreadPoolExecutor,
+    use_graphql: bool = False,
+    graphql_page_size: int = DEFAULT_GRAPHQL_PAGE_SIZE,
+    cache: AssessmentCache | None = None,
+    skip_urls: set[str] | None = None,
+    updated_since: str | None = None,
+    oldest_first: bool = False,
+    partition: bool = False,
+    llm_limiter: AsyncAdaptiveLimiter | None = None,
+    fetch_workers: int | None = None,
+    assess_workers: int | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    defer_assessment: bool = False,
+    screening_tiers: list[ScreeningTier] | None = None,
+    final_tier_stats: TierStats | None = None,
+    prefilter: Prefilter | None = None,
+    spend: SpendTracker | None = None,
+    replay_file: Path | None = None,
+    dedup: NearDuplicateIndex | None = None,
+    work_queue: WorkQueue | None = None,
+    discover_issues: bool = True,
+    on_discovery_error: Callable[[Exception], None] | None = None,
 ) -> AsyncIterator[AssessedIssue]:
-    """Fetches issues and processes them concurrently using a streaming pipeline."""
-    semaphore = asyncio.Semaphore(max_concurrent_assessments)
-    tasks: set[asyncio.Task[AssessedIssue | None]] = set()
+    """
+    Fetches issues and processes them concurrently as a staged pipeline:
+
+        discovery -> comment fetch -> assessment -> caller (output writer)
+
+    Stages run independently with their own worker counts and hand work over through
+    bounded queues, so a slow stage applies backpressure upstream instead of blocking
+    the event loop. Issues without comments skip the assessment stage. Issues whose URL
+    is in `skip_urls` (already assessed) are not processed again. With
+    `defer_assessment`, the assessment stage is left out and issues are yielded with
+    their answer text but no assessment, for the caller to assess (e.g. in a batch).
+    With `screening_tiers`, issues that a cheap tier rules out never reach the final
+    model, whose calls are timed into `final_tier_stats`. Issues that a `prefilter`
+    rule rejects are passed straight to the output with the rule's skip reason. Once
+    `spend` is exhausted, discovery stops and queued issues are dropped unassessed.
+    With `replay_file`, records of a previous run's output replace discovery and
+    comment fetching: they go straight to the assessment stage, without GitHub calls,
+    and records skipped back then are passed through with their skip reason.
+    With `dedup`, an issue whose title, body and answer text near-duplicate an issue
+    seen earlier in the run waits for that representative's assessment and reuses it
+    if it found no answer; if it did, the duplicate is assessed on its own comments.
+    Either way its record names the representative in `duplicate_of`.
+    With `work_queue`, discovery enqueues issues into the shared queue instead, and the
+    comment-fetch stage is fed with issues leased from it, which may have been
+    discovered by another instance; issues are only leased as the pipeline has room
+    for them, and queue calls run on threads, off the event loop. Each result is committed back to the queue before
+    it is yielded; results another worker already committed are dropped. Without
+    `discover_issues`, this instance only works the queue until the discovering
+    instance has finished and nothing is left. If discovery fails part-way, the issues
+    found so far are still processed, and `on_discovery_error` is told about it.
+    """
+    if llm_limiter is None:
+        llm_limiter = _create_llm_limiter()
+    # Comment fetches block a GitHub pool thread each, and the limiter decides how many
+    # assessments actually run, so by default neither stage is the bottleneck itself.
+    fetch_workers = fetch_workers or max_github_workers
+    assess_workers = assess_workers or llm_limiter.max_limit
+    loop = asyncio.get_running_loop()
+
+    fetch_queue: asyncio.Queue[IssueRecord] = asyncio.Queue(maxsize=queue_size)
+    assess_queue: asyncio.Queue[tuple[IssueRecord, str]] = asyncio.Queue(maxsize=queue_size)
+    results: asyncio.Queue[AssessedIssue] = asyncio.Queue(maxsize=queue_size)
     issues_processed_count = 0
     issues_yielded_count = 0
-
-    # Start fetching issues (synchronously for now, yields one by one)
-    issue_iterator = _get_closed_issues(gh, repo_name, max_issues)
-
-    while True:
-        # Add new tasks if concurrency limit allows and issues are available
-        while len(tasks) < max_concurrent_assessments:
-            try:
-                issue = next(issue_iterator)
-                if issue:
-                    task = asyncio.create_task(
-                        _process_single_issue(issue, agent, semaphore)
-                    )
-                    tasks.add(task)
+    # PyGithub handles of issues this instance enqueued, reattached when it leases them
+    issue_handles: dict[str, Issue | None] = {}
+
+    async def discover() -> None:
+        nonlocal issues_processed_count
+        assert gh is not None
+        issue_source = _issue_source(
+            gh,
+            repo_name,
+            max_issues,
+            github_executor,
+            use_graphql,
+            graphql_page_size,
+            updated_since,
+            oldest_first,
+            partition,
+        )
+        try:
+            async for record in issue_source:
+                if spend is not None and spend.exhausted:
+                    log.info("Spend budget reached; no more issues will be fetched.")
+                    break
+                if skip_urls and record["url"] in skip_urls:
+                    log.debug(f"Skipping already assessed issue: {record['url']}")
+                    continue
+                metrics.increment("issues.discovered")
+                if work_queue is None:
+                    await fetch_queue.put(record)
                     issues_processed_count += 1
-                else:  # Should not happen with current _get_closed_issues logic unless empty iterator returned
+                elif await asyncio.to_thread(
+                    work_queue.enqueue, repo_name, {**record, "issue": None}
+                ):
+                    issue_handles[record["url"]] = record["issue"]
+                else:
+                    log.debug(f"Skipping issue already in the work queue: {record['url']}")
+            else:
+                log.info("All available issues have been fetched.")
+        except Exception as e:
+            log.error(f"Error getting next issue: {e}")
+            metrics.increment("issues.discovery_failed")
+            if on_discovery_error is not None:
+                on_discovery_error(e)
+        finally:
+            if work_queue is None:
+                await fetch_queue.put(_END_OF_STAGE)
+            else:
+                # Also after a budget stop, an error or Ctrl-C, so queue workers stop
+                # once what was enqueued is done instead of waiting for more
+                await asyncio.to_thread(work_queue.finish_discovery)
+
+    # Leases are only taken while fewer than `fetch_workers` leased issues wait for or
+    # go through comment fetching, or wait for an assessment worker; the rest stay in
+    # the shared queue for other instances
+    free_fetch_slots = fetch_workers
+    fetch_slot_freed = asyncio.Event()
+
+    def release_fetch_slot() -> None:
+        nonlocal free_fetch_slots
+        free_fetch_slots += 1
+        fetch_slot_freed.set()
+
+    async def lease_from_queue(discovery: asyncio.Task | None) -> None:
+        nonlocal issues_processed_count, free_fetch_slots
+        assert work_queue is not None
+        try:
+            while not (spend is not None and spend.exhausted):
+                if free_fetch_slots == 0:
+                    fetch_slot_freed.clear()
+                    await fetch_slot_freed.wait()
+                    continue
+                leased = await asyncio.to_thread(work_queue.lease, free_fetch_slots)
+                free_fetch_slots -= len(leased)
+                for leased_repo, record in leased:
+                    issue = issue_handles.pop(record["url"], None)
+                    if issue is None and record["last_comments"] is None and gh is not None:
+                        # Discovered elsewhere: fetched when the comment stage needs it
+                        issue = _lazy_issue(gh, leased_repo, record["number"])
+                    await fetch_queue.put(IssueRecord(**{**record, "issue": issue}))
+                    metrics.increment("queue.leased")
+                    issues_processed_count += 1
+                if leased:
+                    continue
+                discovery_done = (
+                    discovery.done()
+                    if discovery is not None
+                    else await asyncio.to_thread(work_queue.discovery_finished)
+                )
+                if discovery_done and not await asyncio.to_thread(work_queue.has_outstanding):
                     break
-            except StopIteration:
-                # No more issues from the iterator
-                log.info("All available issues have been fetched and tasks created.")
-                break  # Exit inner while loop
-            except Exception as e:
-                log.error(f"Error getting next issue: {e}")
-                # Decide whether to continue or stop
-                break  # Stop adding new tasks on error
+                # Wait for discovery, or for another worker's expired lease
+                await asyncio.sleep(QUEUE_POLL_INTERVAL)
+            log.info("The work queue has no more issues for this worker.")
+        except Exception as e:
+            log.error(f"Error leasing from the work queue: {e}")
+        finally:
+            await fetch_queue.put(_END_OF_STAGE)
+
+    async def renew_leases(discovery: asyncio.Task | None) -> None:
+        assert work_queue is not None
+        while True:
+            await asyncio.sleep(work_queue.lease_seconds / 3)
+            await asyncio.to_thread(work_queue.renew)
+            if discovery is not None and not discovery.done():
+                await asyncio.to_thread(work_queue.heartbeat_discovery)
+
+    async def replay() -> None:
+        nonlocal issues_processed_count
+        assert replay_file is not None
+        try:
+            for record, answer_text, skip_reason in _load_replay_records(replay_file, max_issues):
+                if spend is not None and spend.exhausted:
+                    log.info("Spend budget reached; no more records will be replayed.")
+                    break
+                if skip_urls and record["url"] in skip_urls:
+                    continue
+                if answer_text is None or skip_reason is not None:
+                    # No answer text and no skip reason: its comments failed to fetch
+                    await results.put(_assessed_issue(record, answer_text, None, skip_reason))
+                else:
+                    await assess_queue.put((record, answer_text))
+                metrics.increment("issues.replayed")
+                issues_processed_count += 1
+            log.info(f"All records of {replay_file} have been replayed.")
+        except Exception as e:
+            log.error(f"Error replaying {replay_file}: {e}")
+        finally:
+            # Nothing to fetch: ending the fetch stage ends the assessment stage after
+            # the replayed records already queued for it
+            await fetch_queue.put(_END_OF_STAGE)
+
+    async def fetch_comments(record: IssueRecord) -> tuple[IssueRecord, str] | None:
+        log.info(f"Processing issue: {record['url']}")
+        try:
+            if record["last_comments"] is None:
+                # Comment fetching is blocking PyGithub I/O: run it on the GitHub thread pool
+                # so the event loop keeps driving in-flight assessments.
+                answer_text = await loop.run_in_executor(
+                    github_executor, _get_potential_answer_text, record
+                )
+            else:
+                # Comments were harvested along with the issue; no I/O needed
+                answer_text = _get_potential_answer_text(record)
+        except Exception as e:
+            log.error(f"Error fetching comments for {record['url']}: {e}")
+            metrics.increment("github.comment_fetch_failed")
+            # A failure (no assessment, no skip reason), so it is retried and holds the watermark
+            await results.put(_assessed_issue(record, None, None))
+            return None
 
-        if not tasks:
-            # No more issues to fetch and no running tasks left
-            break  # Exit outer while loop
+        if not answer_text:
+            log.warning(
+                f"No potential answer comments found for {record['url']}, skipping assessment."
+            )
+            # Straight to the output with inputs but no assessment
+            await results.put(_assessed_issue(record, None, None, "no comments"))
+            return None
+        if prefilter is not None and (
+            skip_reason := prefilter.skip_reason(record, answer_text)
+        ):
+            log.info(f"Pre-filter skipped {record['url']}: {skip_reason}")
+            await results.put(_assessed_issue(record, answer_text, None, skip_reason))
+            return None
+        return record, answer_text
 
-        # Wait for any task to complete
-        done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    async def fetch_leased(record: IssueRecord) -> tuple[IssueRecord, str] | None:
+        item = None
+        try:
+            item = await fetch_comments(record)
+            return item
+        finally:
+            # Issues going on to assessment keep their slot until a worker takes them
+            if item is None:
+                release_fetch_slot()
+
+    async def assess_leased(item: tuple[IssueRecord, str]) -> AssessedIssue | None:
+        release_fetch_slot()
+        return await assess(item)
+
+    # Assessments of near-duplicate representatives, awaited by their duplicates
+    representatives: dict[str, asyncio.Future[Answer | None]] = {}
+
+    async def assess(item: tuple[IssueRecord, str]) -> AssessedIssue | None:
+        record, answer_text = item
+        if dedup is None:
+            return await assess_issue(record, answer_text)
+        representative = dedup.find_or_add(
+            record["url"], f"{record['title']}\n{record['body'] or ''}\n{answer_text}"
+        )
+        if representative is not None:
+            # The representative entered this stage first, so it is being assessed
+            assessment = await representatives[representative]
+            if assessment is not None and assessment.answer_summary is None:
+                log.info(f"{record['url']} near-duplicates {representative}; reusing its negative verdict.")
+                metrics.increment("issues.deduplicated")
+                return _assessed_issue(
+                    record,
+                    answer_text,
+                    Answer(
+                        in_what_way_question_is_answered_or_not=(
+                            f"Near-duplicate of {representative}, which has no qualifying answer: "
+                            f"{assessment.in_what_way_question_is_answered_or_not}"
+                        ),
+                        answer_summary=None,
+                    ),
+                    duplicate_of=representative,
+                )
+            # An answer summary describes the representative's comments, not these, and
+            # a failed (or batch-deferred) assessment has nothing to reuse: assess this one
+            result = await assess_issue(record, answer_text)
+            if result is not None:
+                result["duplicate_of"] = representative
+            return result
+        future = representatives[record["url"]] = loop.create_future()
+        result = None
+        try:
+            result = await assess_issue(record, answer_text)
+        finally:
+            future.set_result(result["assessment"] if result is not None else None)
+        return result
+
+    async def assess_issue(record: IssueRecord, answer_text: str) -> AssessedIssue | None:
+        if spend is not None and spend.exhausted:
+            # Left out of the output so a --resume run picks it up again
+            return None
+        prompt = _render_prompt(record["title"], record["body"], answer_text)
+        if screening_tiers:
+            screened_out = await _screen_answer(
+                screening_tiers, record["title"], prompt, answer_text, cache
+            )
+            if screened_out is not None:
+                return _assessed_issue(record, answer_text, screened_out)
+        if defer_assessment:
+            # The batch request reuses this prompt rather than rendering it again
+            return _assessed_issue(record, answer_text, None, prompt=prompt)
+        assert agent is not None
+        started_at = time.perf_counter()
+        assessment_result = await _assess_answer(
+            agent,
+            record["title"],
+            record["body"],
+            answer_text,
+            cache,
+            llm_limiter,
+            prompt,
+            spend,
+        )
+        if assessment_result is None and spend is not None and spend.exhausted:
+            return None
+        if final_tier_stats is not None:
+            final_tier_stats.record(
+                time.perf_counter() - started_at, error=assessment_result is None
+            )
+        return _assessed_issue(record, answer_text, assessment_result)
 
-        for task in done:
-            try:
-                result = await task
-                if result:  # Filter out None results (e.g., issues skipped)
-                    yield result
-                    issues_yielded_count += 1
-            except Exception as e:
-                # Log error from the task processing itself
-                log.error(f"Error processing an issue task: {e}")
-                # Continue processing other tasks
+    if work_queue is None:
+        stages = [asyncio.create_task(discover() if replay_file is None else replay())]
+    else:
+        discovery = None
+        if discover_issues:
+            await asyncio.to_thread(work_queue.start_discovery)
+            discovery = asyncio.create_task(discover())
+        stages = [
+            *([discovery] if discovery is not None else []),
+            asyncio.create_task(lease_from_queue(discovery)),
+            asyncio.create_task(renew_leases(discovery)),
+        ]
+    stages += [
+        asyncio.create_task(
+            _run_stage(
+                "comment fetch",
+                fetch_queue,
+                assess_queue,
+                fetch_workers,
+                fetch_comments if work_queue is None else fetch_leased,
+            )
+        ),
+        asyncio.create_task(
+            _run_stage(
+                "assessment",
+                assess_queue,
+                results,
+                assess_workers,
+                assess if work_queue is None else assess_leased,
+            )
+        ),
+    ]
+    try:
+        while (result := await results.get()) is not _END_OF_STAGE:
+            metrics.sample_queue("output", results.qsize())
+            if work_queue is not None:
+                if _assessment_failed(result):
+                    # Back to the queue for another attempt rather than committed as done
+                    await asyncio.to_thread(work_queue.retry, result["url"])
+                elif not await asyncio.to_thread(
+                    work_queue.complete, result["url"], json.dumps(_assessed_issue_json(result))
+                ):
+                    log.info(f"{result['url']} was already completed by another worker; dropping it.")
+                    continue
+            yield result
+            issues_yielded_count += 1
+    finally:
+        for stage in stages:
+            stage.cancel()
+        if work_queue is not None:
+            # Hand unfinished leases straight back rather than waiting for them to expire
+            await asyncio.to_thread(work_queue.release)
 
     log.info(
         f"Finished processing. Total issues considered: {issues_processed_count}, Assessed issues yielded: {issues_yielded_count}"
     )
 
 
-async def main(repo_name: str, max_issues: int, output_file: Path | None) -> None:
-    """Main function to orchestrate the issue crawling and assessment."""
-    gh = _create_github_client()
-    agent = _create_llm_agent()
+async def main(
+    repo_name: str,
+    max_issues: int,
+    output_file: Path | None,
+    use_graphql: bool = False,
+    graphql_page_size: int = DEFAULT_GRAPHQL_PAGE_SIZE,
+    cache: AssessmentCache | None = None,
+    http_cache: HttpResponseCache | None = None,
+    resume: bool = False,
+    incremental: bool = False,
+    state_file: Path = DEFAULT_STATE_FILE,
+    partition: bool = False,
+    fetch_workers: int | None = None,
+    assess_workers: int | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    batch: bool = False,
+    batch_file: Path = DEFAULT_BATCH_FILE,
+    batch_base_url: str | None = None,
+    batch_poll_interval: float = DEFAULT_BATCH_POLL_INTERVAL,
+    cascade: list[str] | None = None,
+    prefilter: Prefilter | None = None,
+    max_spend: float | None = None,
+    metrics_json: Path | None = None,
+    metrics_prometheus: Path | None = None,
+    replay_file: Path | None = None,
+    dedup: NearDuplicateIndex | None = None,
+    sink: Callable[[str], None] | None = None,
+    skip_urls: set[str] | None = None,
+    work_queue: WorkQueue | None = None,
+    discover_issues: bool = True,
+) -> None:
+    """
+    Main function to orchestrate the issue crawling and assessment. With `batch`,
+    issues are crawled first and the uncached ones assessed in one provider batch job.
+    With `replay_file`, a previous run's output is re-assessed instead of crawling.
+    `sink`, if given, receives each JSON Lines record in place of `output_file`, and
+    issues in `skip_urls` are skipped as if already in the output. With `work_queue`,
+    issues are shared with the other instances working the same queue, and only the
+    ones this instance completed are written to `output_file`.
+    """
+    metrics.start()
+    github_limiter = _create_github_limiter()
+    llm_limiter = _create_llm_limiter()
+    # Replays never talk to GitHub
+    gh = None if replay_file else _create_github_client(http_cache, github_limiter)
+    # Shared by the final model and the model tiers of the cascade; closed at the end
+    # of the run since its connections belong to this event loop
+    http_pool = _create_model_http_pool(
+        1 + sum(1 for tier in cascade or [] if tier != HEURISTIC_TIER)
+    )
+    # Batch jobs go straight to the provider's batch endpoints, not through an agent
+    agent = None if batch else _create_llm_agent(http_pool=http_pool)
+    spend = SpendTracker(max_spend)
+    # Cheap tiers screen issues first; each model tier has its own concurrency limit
+    screening_tiers = [
+        ScreeningTier(
+            tier,
+            None if tier == HEURISTIC_TIER else _create_llm_limiter(tier),
+            spend,
+            http_pool,
+            _call_model,
+        )
+        for tier in cascade or []
+    ]
+    final_tier_stats = TierStats(DEFAULT_MODEL_ID) if screening_tiers else None
+
+    skip_urls = set(skip_urls or ())
+    if resume and output_file:
+        skip_urls |= _load_assessed_urls(output_file)
+        log.info(
+            f"Resuming: {len(skip_urls)} issues already assessed in {output_file} will be skipped."
+        )
+
+    updated_since = None
+    if incremental:
+        updated_since = _load_watermark(state_file, repo_name)
+        if updated_since:
+            log.info(f"Incremental crawl: only issues updated since {updated_since}.")
+        else:
+            log.info(f"Incremental crawl: no watermark for {repo_name} yet, starting from the oldest issues.")
+    latest_updated_at = updated_since
+    # The watermark must not pass issues whose assessment failed, so they are retried
+    oldest_failed_updated_at: str | None = None
+    # Set if the harvest stopped on an error, so the run is incomplete
+    discovery_error: Exception | None = None
+    if max_issues > SEARCH_RESULT_CAP and not partition:
+        log.warning(
+            f"GitHub search stops at {SEARCH_RESULT_CAP} results; use --partition to reach --max-issues {max_issues}."
+        )
 
-    # Store all results, categorization happens during reporting/output
-    all_results: list[AssessedIssue] = []
+    # Only counts are kept in memory; each result is written out as soon as it completes
     issues_counted = 0
+    answered_count = 0
+    skipped_count = 0
+    failed_count = 0
 
     log.info("Starting concurrent issue processing...")
-    async for result in _process_issues_concurrently(gh, agent, repo_name, max_issues):
+    github_executor = ThreadPoolExecutor(
+        max_workers=max_github_workers, thread_name_prefix="github-io"
+    )
+    # Write as JSON Lines (one JSON object per line), appending when resuming
+    output = (
+        output_file.open("a" if resume else "w", encoding="utf-8")
+        if output_file and not sink
+        else None
+    )
+
+    def on_discovery_error(error: Exception) -> None:
+        nonlocal discovery_error
+        discovery_error = error
+
+    def record_result(result: AssessedIssue) -> None:
+        nonlocal issues_counted, answered_count, skipped_count, failed_count
+        nonlocal latest_updated_at, oldest_failed_updated_at
         issues_counted += 1
-        all_results.append(result)
+        if result["updated_at"] and (
+            latest_updated_at is None or result["updated_at"] > latest_updated_at
+        ):
+            latest_updated_at = result["updated_at"]
         # Log based on the assessment result
         if result["assessment"] and result["assessment"].answer_summary is not None:
+            answered_count += 1
             log.info(
                 f"[bold green]Answer Found ({issues_counted}):[/bold green] {result['url']} - {result['assessment'].in_what_way_question_is_answered_or_not[:100]}..."
             )
+        elif _assessment_failed(result):
+            failed_count += 1
+            if result["updated_at"] and (
+                oldest_failed_updated_at is None
+                or result["updated_at"] < oldest_failed_updated_at
+            ):
+                oldest_failed_updated_at = result["updated_at"]
+            log.info(
+                f"[bold red]Assessment Failed ({issues_counted}):[/bold red] {result['url']}"
+            )
         else:
-            explanation = "Assessment failed or missing."
             if result["assessment"]:
                 explanation = result[
                     "assessment"
                 ].in_what_way_question_is_answered_or_not
+            else:
+                skipped_count += 1
+                explanation = f"Skipped ({result['skip_reason']})."
             log.info(
                 f"[bold yellow]No Answer Found ({issues_counted}):[/bold yellow] {result['url']} - {explanation[:100]}..."
             )
 
+        if output or sink:
+            try:
+                line = json.dumps(_assessed_issue_json(result))
+            except TypeError as e:
+                log.error(f"Failed to serialize result for {result['url']}: {e}")
+                return
+            if sink:
+                sink(line)
+                return
+            # Flush per record so a crash loses at most the record being written
+            output.write(line + "\n")
+            output.flush()
+
+    # Issues waiting for the batch job; everything else is written as it completes
+    batch_pending: list[tuple[AssessedIssue, str]] = []
+    try:
+        async for result in _process_issues_concurrently(
+            gh,
+            agent,
+            repo_name,
+            max_issues,
+            github_executor,
+            use_graphql=use_graphql,
+            graphql_page_size=graphql_page_size,
+            cache=cache,
+            skip_urls=skip_urls,
+            updated_since=updated_since,
+            oldest_first=incremental,
+            partition=partition,
+            llm_limiter=llm_limiter,
+            fetch_workers=fetch_workers,
+            assess_workers=assess_workers,
+            queue_size=queue_size,
+            defer_assessment=batch,
+            screening_tiers=screening_tiers,
+            final_tier_stats=final_tier_stats,
+            prefilter=prefilter,
+            spend=spend,
+            replay_file=replay_file,
+            dedup=dedup,
+            work_queue=work_queue,
+            discover_issues=discover_issues,
+            on_discovery_error=on_discovery_error,
+        ):
+            # Deferred assessments carry their prompt; fetch failures have none
+            if batch and (prompt := result["prompt"]) is not None:
+                cached = (
+                    await asyncio.to_thread(cache.get, _assessment_cache_key(prompt))
+                    if cache is not None
+                    else None
+                )
+                if cached is None:
+                    batch_pending.append((result, prompt))
+                    continue
+                result["assessment"] = Answer.model_validate_json(cached)
+            record_result(result)
+
+        if batch_pending:
+            await _assess_in_batch(
+                batch_pending,
+                batch_file,
+                cache,
+                batch_base_url,
+                batch_poll_interval,
+                spend,
+            )
+            for result, _ in batch_pending:
+                record_result(result)
+        # Losing hedge attempts are billed too: let them finish and charge their usage
+        await retry_policy.wait_abandoned()
+    finally:
+        github_executor.shutdown(wait=False, cancel_futures=True)
+        if http_pool is not None:
+            await http_pool.aclose()
+        if output:
+            output.close()
+
+    # Only advance the watermark after a complete run; an interrupted run is redone
+    # (and so is one stopped by the spend budget or a failed harvest)
+    if spend.exhausted:
+        log.warning("Crawl stopped early at the spend budget; rerun with --resume to continue.")
+    elif discovery_error is not None:
+        log.warning(
+            f"Issue discovery failed part-way ({discovery_error}); only the issues found before it were "
+            "processed. Rerun with --resume to continue."
+        )
+    elif incremental:
+        watermark = latest_updated_at
+        if watermark and oldest_failed_updated_at:
+            # The next run's search is inclusive, so it picks the failed issues up again
+            watermark = min(watermark, oldest_failed_updated_at)
+            log.info(
+                f"Holding the watermark at {watermark} so the {failed_count} issues whose assessment failed are retried."
+            )
+        if watermark and watermark != updated_since:
+            _save_watermark(state_file, repo_name, watermark)
+            log.info(f"Saved watermark {watermark} for {repo_name} to {state_file}.")
+
     log.info("-" * 30)
-    # Recalculate counts based on final results
-    answered_count = sum(
-        1
-        for r in all_results
-        if r["assessment"] and r["assessment"].answer_summary is not None
-    )
-    unanswered_count = len(all_results) - answered_count
+    unanswered_count = issues_counted - answered_count - failed_count
     log.info(f"Assessment Summary (Processed {issues_counted} issues):")
     log.info(f"  Issues with Qualifying Answers: {answered_count}")
     log.info(f"  Issues without Qualifying Answers: {unanswered_count}")
-
+    log.info(f"    of which skipped without assessment: {skipped_count}")
+    log.info(f"  Issues whose assessment failed: {failed_count}")
+    if discovery_error is not None:
+        log.info(f"  Issue discovery failed part-way: {discovery_error}")
+    log.info(f"  Model calls: {retry_policy.summary()}")
+    if skip_urls:
+        log.info(f"  Issues skipped as already assessed: {len(skip_urls)}")
+    log.info(f"  Concurrency {llm_limiter.summary()}")
+    log.info(f"  Concurrency {github_limiter.summary()}")
+    for tier in screening_tiers:
+        log.info(f"  Cascade tier {tier.stats.summary()}")
+        if tier.limiter is not None:
+            log.info(f"  Concurrency {tier.limiter.summary()}")
+    if final_tier_stats is not None:
+        log.info(f"  Cascade tier {final_tier_stats.summary()}")
+    if prefilter is not None:
+        log.info(f"  Pre-filter: {prefilter.summary()}")
+    if dedup is not None:
+        log.info(f"  Near-duplicates: {dedup.summary()}")
+    if work_queue is not None:
+        log.info(f"  Work queue: {work_queue.summary()}")
+    for line in prompt_builder.summary():
+        log.info(f"  {line}")
+    for line in spend.summary():
+        log.info(f"  {line}")
+    metrics.increment("issues.written", issues_counted)
+    metrics.increment("issues.assessment_failed", failed_count)
+    metrics.increment("llm.retries", retry_policy.retries)
+    metrics.increment("llm.timeouts", retry_policy.timeouts)
+    metrics.increment("llm.hedged", retry_policy.hedged)
+    metrics.increment("llm.failed", retry_policy.failed)
+    cached_tokens, input_tokens = spend.cached_share()
+    metrics.increment("llm.input_tokens.cached", cached_tokens)
+    metrics.increment("llm.input_tokens.uncached", input_tokens - cached_tokens)
+    for line in metrics.summary():
+        log.info(f"  {line}")
+    if metrics_json:
+        metrics.write_json(metrics_json)
+        log.info(f"Metrics report written to {metrics_json}.")
+    if metrics_prometheus:
+        metrics.write_prometheus(metrics_prometheus)
+        log.info(f"Prometheus metrics written to {metrics_prometheus}.")
+    if cache is not None:
+        log.info(
+            f"  Assessment cache: {cache.hits} hits, {cache.misses} misses, {cache.write_errors} failed writes ({len(cache)} entries in {cache.path})"
+        )
+    if http_cache is not None:
+        log.info(
+            f"  GitHub HTTP cache: {http_cache.hits} not-modified, {http_cache.misses} fetched"
+        )
     if output_file:
-        log.info(f"Writing detailed results to {output_file} as JSON Lines...")
+        log.info(f"Detailed results written to {output_file} as JSON Lines.")
+
+
+# --- Sharding ---
+
+# Set by _init_shard_worker: where a worker process sends its JSON Lines records
+_shard_results: Any = None
+
+
+def _shard_metrics_path(path: Path | None, repo_name: str) -> Path | None:
+    """`metrics.json` -> `metrics.owner__repo.json`: each shard writes its own report."""
+    if path is None:
+        return None
+    return path.with_name(f"{path.stem}.{repo_name.replace('/', '__')}{path.suffix}")
+
+
+def _init_shard_worker(
+    settings: dict[str, Any],
+    budgets: tuple[SharedBudget, SharedBudget],
+    results: Any,
+    lock: Any,
+) -> None:
+    """Runs in each worker process: applies the parent's settings and shared budgets."""
+    global max_concurrent_assessments, max_github_workers, adaptive_concurrency
+    global max_adaptive_concurrency, shared_http_pool, model_http2, prompt_builder, retry_policy
+    global llm_budget, github_budget
+    global state_lock, _shard_results
+    max_concurrent_assessments = settings["max_concurrent_assessments"]
+    max_github_workers = settings["max_github_workers"]
+    adaptive_concurrency = settings["adaptive_concurrency"]
+    max_adaptive_concurrency = settings["max_adaptive_concurrency"]
+    shared_http_pool = settings["shared_http_pool"]
+    model_http2 = settings["model_http2"]
+    prompt_builder = settings["prompt_builder"]
+    retry_policy = settings["retry_policy"]
+    log.setLevel(settings["log_level"])
+    llm_budget, github_budget = budgets
+    state_lock = lock
+    _shard_results = results
+
+
+def _crawl_shard(repo_name: str, max_issues: int, main_kwargs: dict[str, Any]) -> str:
+    """Crawls one repo in a worker process, sending each record to the parent."""
+    global metrics
+    # A worker may crawl several repos in turn; each gets its own metrics report
+    metrics = CrawlMetrics()
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f"[{repo_name}] %(message)s"))
+    asyncio.run(
+        main(
+            repo_name,
+            max_issues,
+            None,
+            sink=lambda line: _shard_results.put((repo_name, line)),
+            **main_kwargs,
+        )
+    )
+    return repo_name
+
+
+def crawl_sharded(
+    repos: list[str],
+    max_issues: int,
+    output_file: Path | None,
+    processes: int,
+    resume: bool = False,
+    max_spend: float | None = None,
+    metrics_json: Path | None = None,
+    metrics_prometheus: Path | None = None,
+    **main_kwargs: Any,
+) -> None:
+    """
+    Crawls each of `repos` (up to `max_issues` each) in a pool of `processes` worker
+    processes, each running its own `main()` pipeline. Workers send their records back
+    to be merged into `output_file`, share one LLM and one GitHub concurrency budget
+    (the limits this process was configured with, so --concurrency stays a global cap),
+    and split `max_spend` equally. Other `main()` options apply to every repo.
+    """
+    # Spawn rather than fork: workers start clean instead of inheriting this process's
+    # threads, sockets and SQLite connections
+    context = multiprocessing.get_context("spawn")
+    budgets = (
+        SharedBudget(context, "LLM", _llm_concurrency_cap()),
+        SharedBudget(context, "GitHub", max_github_workers),
+    )
+    results = context.Queue()
+    settings = {
+        "max_concurrent_assessments": max_concurrent_assessments,
+        "max_github_workers": max_github_workers,
+        "adaptive_concurrency": adaptive_concurrency,
+        "max_adaptive_concurrency": max_adaptive_concurrency,
+        "shared_http_pool": shared_http_pool,
+        "model_http2": model_http2,
+        "prompt_builder": prompt_builder,
+        "retry_policy": retry_policy,
+        "log_level": log.level,
+    }
+    assessed_urls = _load_assessed_urls(output_file) if resume and output_file else set()
+    written: Counter[str] = Counter()
+
+    def write_results() -> None:
+        output = (
+            output_file.open("a" if resume else "w", encoding="utf-8")
+            if output_file
+            else None
+        )
         try:
-            # Write as JSON Lines (one JSON object per line)
-            with output_file.open("w", encoding="utf-8") as f:
-                for result in all_results:
-                    # Convert Pydantic model to dict for JSON serialization
-                    assessment_dict = (
-                        result["assessment"].dict() if result["assessment"] else None
-                    )
-                    # Create dict compatible with JSON Lines
-                    output_data = {
-                        "url": result["url"],
-                        "title": result["title"],
-                        "issue_body": result["issue_body"],
-                        "answer_text": result["answer_text"],
-                        "assessment": assessment_dict,
-                    }
-                    json.dump(output_data, f)
-                    f.write("\n")  # Add newline for JSON Lines format
-            log.info("Results written successfully.")
-        except IOError as e:
-            log.error(f"Failed to write results to {output_file}: {e}")
-        except TypeError as e:
-            log.error(f"Failed to serialize results to JSON: {e}")  # Catch JSON errors
+            while (item := results.get()) is not None:
+                repo_name, line = item
+                written[repo_name] += 1
+                if output:
+                    output.write(line + "\n")
+                    output.flush()
+        finally:
+            if output:
+                output.close()
+
+    log.info(f"Crawling {len(repos)} repos in {processes} worker processes.")
+    writer = threading.Thread(target=write_results, name="shard-writer")
+    writer.start()
+    failed: list[str] = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_shard_worker,
+            initargs=(settings, budgets, results, state_lock or context.Lock()),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _crawl_shard,
+                    repo_name,
+                    max_issues,
+                    dict(
+                        main_kwargs,
+                        skip_urls={url for url in assessed_urls if f"/{repo_name}/" in url},
+                        max_spend=max_spend / len(repos) if max_spend is not None else None,
+                        metrics_json=_shard_metrics_path(metrics_json, repo_name),
+                        metrics_prometheus=_shard_metrics_path(metrics_prometheus, repo_name),
+                    ),
+                ): repo_name
+                for repo_name in repos
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append(futures[future])
+                    log.error(f"Crawl of {futures[future]} failed: {e}")
+    finally:
+        results.put(None)
+        writer.join()
+
+    log.info("-" * 30)
+    log.info(f"Sharded crawl summary ({sum(written.values())} issues):")
+    for repo_name in repos:
+        status = " (failed)" if repo_name in failed else ""
+        log.info(f"  {repo_name}: {written[repo_name]} issues{status}")
+    if output_file:
+        log.info(f"Merged results written to {output_file} as JSON Lines.")
 
 
 if __name__ == "__main__":
@@ -423,6 +2150,24 @@ if __name__ == "__main__":
         default=DEFAULT_REPO,
         help="GitHub repository name (e.g., 'owner/repo').",
     )
+    parser.add_argument(
+        "--repos",
+        type=lambda s: [repo.strip() for repo in s.split(",") if repo.strip()],
+        default=[],
+        help="Comma-separated repositories to crawl instead of --repo, sharded across worker processes (--max-issues applies to each).",
+    )
+    parser.add_argument(
+        "--repos-file",
+        type=Path,
+        default=None,
+        help="File listing repositories to crawl (one per line, '#' starts a comment), added to --repos.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Worker processes for --repos (default: one per repo, up to the CPU count).",
+    )
     parser.add_argument(
         "-n",
         "--max-issues",
@@ -438,6 +2183,181 @@ if __name__ == "__main__":
         default=max_concurrent_assessments,
         help="Maximum number of concurrent assessments.",
     )
+    parser.add_argument(
+        "--adaptive",
+        action=argparse.BooleanOptionalAction,
+        default=adaptive_concurrency,
+        help="Grow concurrency while calls succeed and back off on throttling (AIMD); --no-adaptive keeps the limits fixed.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=max_adaptive_concurrency,
+        help="Upper bound for adaptive LLM concurrency.",
+    )
+    parser.add_argument(
+        "--http-pool",
+        action=argparse.BooleanOptionalAction,
+        default=shared_http_pool,
+        help="Send model calls through per-provider connection pools sized to the LLM concurrency cap; --no-http-pool uses pydantic-ai's default clients.",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 for model calls (needs the h2 package).",
+    )
+    parser.add_argument(
+        "--github-workers",
+        type=int,
+        default=max_github_workers,
+        help="Size of the thread pool used for blocking GitHub API calls.",
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=None,
+        help="Workers in the comment-fetch stage (default: --github-workers).",
+    )
+    parser.add_argument(
+        "--assess-workers",
+        type=int,
+        default=None,
+        help="Workers in the assessment stage (default: the LLM concurrency cap).",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Capacity of each bounded queue between pipeline stages.",
+    )
+    parser.add_argument(
+        "--title-token-budget",
+        type=int,
+        default=DEFAULT_TITLE_TOKEN_BUDGET,
+        help="Token budget for the issue title in each prompt.",
+    )
+    parser.add_argument(
+        "--body-token-budget",
+        type=int,
+        default=DEFAULT_BODY_TOKEN_BUDGET,
+        help="Token budget for the issue body; longer bodies keep their head and tail.",
+    )
+    parser.add_argument(
+        "--answer-token-budget",
+        type=int,
+        default=DEFAULT_ANSWER_TOKEN_BUDGET,
+        help="Token budget for the potential answer comments.",
+    )
+    parser.add_argument(
+        "--code-fence-token-budget",
+        type=int,
+        default=DEFAULT_CODE_FENCE_TOKEN_BUDGET,
+        help="Longer code fences (logs, stack traces) in an over-budget section are cut to this first.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help="Retries of a model call after a transient failure (throttling, overload, 5xx, timeout, connection error), with jittered exponential backoff.",
+    )
+    parser.add_argument(
+        "--call-timeout",
+        type=float,
+        default=DEFAULT_CALL_TIMEOUT,
+        help="Seconds a single model call may take before it is abandoned (and retried).",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Start a duplicate model call when one runs past the --hedge-quantile latency of recent calls, and use whichever finishes first. Both calls are billed, and both count towards --max-spend.",
+    )
+    parser.add_argument(
+        "--hedge-quantile",
+        type=float,
+        default=DEFAULT_HEDGE_QUANTILE,
+        help="Latency quantile of recent calls after which --hedge starts the duplicate.",
+    )
+    parser.add_argument(
+        "--prefilter",
+        type=lambda s: [rule.strip() for rule in s.split(",") if rule.strip()],
+        default=[],
+        help=f"Comma-separated local rules that skip hopeless issues before any LLM call, from: {', '.join(PREFILTER_RULES)}; 'default' selects {', '.join(DEFAULT_PREFILTER_RULES)}. Off unless given.",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Detect near-duplicate issues (MinHash over title, body and answer text, without the issue template and environment dump) and reuse the first one's negative verdict instead of assessing each; answered ones are still assessed individually.",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=DEFAULT_DEDUP_THRESHOLD,
+        help="Estimated Jaccard similarity at which --dedup treats two issues as near-duplicates.",
+    )
+    parser.add_argument(
+        "--cascade",
+        type=lambda s: [tier.strip() for tier in s.split(",") if tier.strip()],
+        default=[],
+        help=f"Comma-separated screening tiers run in order before {DEFAULT_MODEL_ID}: '{HEURISTIC_TIER}' (local rules) or a cheap model ID such as 'openai:gpt-4o-mini'. Only uncertain or positive issues are escalated.",
+    )
+    parser.add_argument(
+        "--max-spend",
+        type=float,
+        default=None,
+        help="Dollar budget: once reached, no new assessments are started (a --batch job is costed when it completes).",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Crawl first, then assess all uncached issues in one provider batch job (half price, results within 24h).",
+    )
+    parser.add_argument(
+        "--batch-file",
+        type=Path,
+        default=DEFAULT_BATCH_FILE,
+        help="Where --batch writes the batch input (JSON Lines of rendered prompts).",
+    )
+    parser.add_argument(
+        "--batch-base-url",
+        type=str,
+        default=None,
+        help="OpenAI-compatible API base URL for --batch (default: $OPENAI_BASE_URL or OpenAI).",
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=DEFAULT_BATCH_POLL_INTERVAL,
+        help="Seconds between batch status checks.",
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        help="Re-assess the records of a previous run's JSON Lines output (e.g. with a new prompt or model) instead of crawling GitHub. Pre-filter rules are not applied again.",
+    )
+    parser.add_argument(
+        "--work-queue",
+        type=Path,
+        default=None,
+        help="SQLite work queue shared with other crawler instances: discovered issues are enqueued there, and each instance assesses the issues it leases.",
+    )
+    parser.add_argument(
+        "--queue-worker",
+        action="store_true",
+        help="Only assess issues from --work-queue, leaving discovery to another instance.",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help="How long a --work-queue item stays leased to an unresponsive worker before another worker takes it over.",
+    )
+    parser.add_argument(
+        "--wait-for-discovery",
+        type=float,
+        default=DEFAULT_DISCOVERY_WAIT_SECONDS,
+        help="How many seconds a --queue-worker waits for another instance to start discovery on a --work-queue before it stops.",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -445,6 +2365,90 @@ if __name__ == "__main__":
         default=None,
         help="Optional file path to save the results.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to an existing --output file, skipping issues it already contains except failed ones, which are retried. A URL's last record in the file is its current one.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only crawl issues updated since the watermark saved by the previous incremental run.",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        default=DEFAULT_STATE_FILE,
+        help="JSON file holding per-repo watermarks for --incremental.",
+    )
+    parser.add_argument(
+        "--partition",
+        action="store_true",
+        help=f"Split the search into closed-date windows of at most {SEARCH_RESULT_CAP} results and fetch them concurrently (for --max-issues above {SEARCH_RESULT_CAP}).",
+    )
+    parser.add_argument(
+        "--graphql",
+        action="store_true",
+        help="Harvest issues and their last two comments with one GraphQL query per page instead of per-issue REST calls.",
+    )
+    parser.add_argument(
+        "--graphql-page-size",
+        type=int,
+        default=DEFAULT_GRAPHQL_PAGE_SIZE,
+        help="Issues per GraphQL search page (at most 100).",
+    )
+    parser.add_argument(
+        "--assessment-cache",
+        type=Path,
+        default=DEFAULT_ASSESSMENT_CACHE,
+        help="SQLite file caching LLM assessments across runs.",
+    )
+    parser.add_argument(
+        "--no-assessment-cache",
+        action="store_true",
+        help="Always call the LLM, bypassing the assessment cache.",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=DEFAULT_CACHE_MAX_ENTRIES,
+        help="Evict least recently used assessments beyond this many entries.",
+    )
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        default=DEFAULT_CACHE_MAX_AGE_DAYS,
+        help="Evict assessments older than this many days.",
+    )
+    parser.add_argument(
+        "--http-cache",
+        type=Path,
+        default=DEFAULT_HTTP_CACHE_DIR,
+        help="Directory caching GitHub responses for conditional (ETag) revalidation.",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Disable the GitHub HTTP response cache.",
+    )
+    parser.add_argument(
+        "--http-cache-max-mb",
+        type=int,
+        default=DEFAULT_HTTP_CACHE_MAX_MB,
+        help="Evict least recently used GitHub responses beyond this size.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Write per-stage latency percentiles, error/retry counters, queue depths and throughput to this JSON file.",
+    )
+    parser.add_argument(
+        "--metrics-prometheus",
+        type=Path,
+        default=None,
+        help="Also write the metrics in Prometheus text format (e.g. for a textfile collector).",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -453,6 +2457,32 @@ if __name__ == "__main__":
     )
 
     args = parser.parse_args()
+    if args.resume and not args.output:
+        parser.error("--resume requires --output")
+    if args.partition and args.incremental:
+        # Windows complete out of order, so there is no safe watermark to advance
+        parser.error("--partition cannot be combined with --incremental")
+    if args.replay and args.incremental:
+        parser.error("--replay cannot be combined with --incremental")
+    if args.replay and args.output and args.output.resolve() == args.replay.resolve():
+        parser.error("--output must differ from the --replay file")
+    repos = list(args.repos)
+    if args.repos_file:
+        for line in args.repos_file.read_text(encoding="utf-8").splitlines():
+            repo = line.split("#", 1)[0].strip()
+            if repo:
+                repos.append(repo)
+    # Keep the first occurrence of each repo, in order
+    repos = list(dict.fromkeys(repos))
+    if repos and args.replay:
+        parser.error("--replay cannot be combined with --repos or --repos-file")
+    if args.queue_worker and not args.work_queue:
+        parser.error("--queue-worker requires --work-queue")
+    if args.work_queue:
+        # Queue items are single-repo crawl results, committed as soon as they complete
+        for flag, value in [("--replay", args.replay), ("--batch", args.batch), ("--repos", repos)]:
+            if value:
+                parser.error(f"--work-queue cannot be combined with {flag}")
 
     # Update logging level if verbose flag is set
     if args.verbose:
@@ -464,15 +2494,123 @@ if __name__ == "__main__":
     max_concurrent_assessments = (
         args.concurrency
     )  # This needs to be accessible by the processing function
+    max_github_workers = args.github_workers
+    adaptive_concurrency = args.adaptive
+    max_adaptive_concurrency = args.max_concurrency
+    shared_http_pool = args.http_pool
+    model_http2 = args.http2
+    if model_http2 and not HTTP2_AVAILABLE:
+        parser.error("--http2 needs the h2 package: pip install 'httpx[http2]'")
+    retry_policy = RetryPolicy(
+        max_retries=args.retries,
+        call_timeout=args.call_timeout,
+        hedge=args.hedge,
+        hedge_quantile=args.hedge_quantile,
+    )
+    prompt_builder = PromptBuilder(
+        title_budget=args.title_token_budget,
+        body_budget=args.body_token_budget,
+        answer_budget=args.answer_token_budget,
+        code_fence_budget=args.code_fence_token_budget,
+    )
+
+    cache = (
+        None
+        if args.no_assessment_cache
+        else AssessmentCache(
+            args.assessment_cache,
+            max_entries=args.cache_max_entries,
+            max_age_seconds=args.cache_max_age_days * 24 * 60 * 60,
+        )
+    )
 
     try:
-        # Pass concurrency limit explicitly if needed, or rely on the global modification
-        # For simplicity here, modifying the global constant before calling main.
-        asyncio.run(
-            main(
-                repo_name=args.repo, max_issues=args.max_issues, output_file=args.output
-            )
+        # Replayed records keep the skip reasons of the run that produced them
+        prefilter = (
+            Prefilter.from_names(args.prefilter)
+            if args.prefilter and not args.replay
+            else None
         )
+    except ValueError as e:
+        parser.error(str(e))
+
+    http_cache = (
+        None
+        if args.no_http_cache
+        else HttpResponseCache(args.http_cache, max_bytes=args.http_cache_max_mb * 1024 * 1024)
+    )
+
+    try:
+        if repos:
+            crawl_sharded(
+                repos,
+                args.max_issues,
+                args.output,
+                processes=args.processes or min(len(repos), os.cpu_count() or 1),
+                resume=args.resume,
+                max_spend=args.max_spend,
+                metrics_json=args.metrics_json,
+                metrics_prometheus=args.metrics_prometheus,
+                use_graphql=args.graphql,
+                graphql_page_size=args.graphql_page_size,
+                cache=cache,
+                http_cache=http_cache,
+                incremental=args.incremental,
+                state_file=args.state_file,
+                partition=args.partition,
+                fetch_workers=args.fetch_workers,
+                assess_workers=args.assess_workers,
+                queue_size=args.queue_size,
+                batch=args.batch,
+                batch_file=args.batch_file,
+                batch_base_url=args.batch_base_url,
+                batch_poll_interval=args.batch_poll_interval,
+                cascade=args.cascade,
+                prefilter=prefilter,
+                dedup=NearDuplicateIndex(args.dedup_threshold) if args.dedup else None,
+            )
+        else:
+            # Pass concurrency limit explicitly if needed, or rely on the global modification
+            # For simplicity here, modifying the global constant before calling main.
+            asyncio.run(
+                main(
+                    repo_name=args.repo,
+                    max_issues=args.max_issues,
+                    output_file=args.output,
+                    use_graphql=args.graphql,
+                    graphql_page_size=args.graphql_page_size,
+                    cache=cache,
+                    http_cache=http_cache,
+                    resume=args.resume,
+                    incremental=args.incremental,
+                    state_file=args.state_file,
+                    partition=args.partition,
+                    fetch_workers=args.fetch_workers,
+                    assess_workers=args.assess_workers,
+                    queue_size=args.queue_size,
+                    batch=args.batch,
+                    batch_file=args.batch_file,
+                    batch_base_url=args.batch_base_url,
+                    batch_poll_interval=args.batch_poll_interval,
+                    cascade=args.cascade,
+                    prefilter=prefilter,
+                    max_spend=args.max_spend,
+                    metrics_json=args.metrics_json,
+                    metrics_prometheus=args.metrics_prometheus,
+                    replay_file=args.replay,
+                    dedup=NearDuplicateIndex(args.dedup_threshold) if args.dedup else None,
+                    work_queue=(
+                        WorkQueue(
+                            args.work_queue,
+                            lease_seconds=args.lease_seconds,
+                            discovery_wait_seconds=args.wait_for_discovery,
+                        )
+                        if args.work_queue
+                        else None
+                    ),
+                    discover_issues=not args.queue_worker,
+                )
+            )
     except KeyboardInterrupt:
         log.info("\nOperation cancelled by user.")
         sys.exit(0)
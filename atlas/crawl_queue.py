@@ -0,0 +1,268 @@
+"""Shared work queue that lets several crawl_pytorch_issues.py instances split a crawl."""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+DEFAULT_LEASE_SECONDS: float = 600.0
+DEFAULT_MAX_ATTEMPTS: int = 3
+# How long workers wait for a discovering instance to start on a queue that has none
+DEFAULT_DISCOVERY_WAIT_SECONDS: float = 300.0
+# How long a write waits for another instance's transaction before failing
+BUSY_TIMEOUT_SECONDS: float = 30.0
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of discovered issues, shared by crawler instances through a
+    common database file (on one machine, or a shared filesystem whose locking SQLite
+    supports).
+
+    Discovery enqueues issue records by URL; an issue already in the queue (pending,
+    in flight or done) is not enqueued again. Workers lease items for `lease_seconds`
+    and commit each finished AssessedIssue record back as its JSON Lines form. A lease
+    that expires, because its worker crashed or hung, makes the item available to the
+    next `lease` call, as does one whose worker reports a failure with `retry`; after
+    `max_attempts` leases an item is marked failed instead.
+
+    The discovering instance heartbeats while it searches; once it has finished, or its
+    last heartbeat is older than `lease_seconds` (it died), `discovery_finished` is
+    true and workers stop when nothing is left. If no instance has started discovery
+    within `discovery_wait_seconds` of opening the queue, it is treated as finished
+    too, so workers started against a queue nobody fills do not wait forever. Methods may be called from any thread
+    (e.g. through `asyncio.to_thread`); calls on one instance run one at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        discovery_wait_seconds: float = DEFAULT_DISCOVERY_WAIT_SECONDS,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.discovery_wait_seconds = discovery_wait_seconds
+        self._opened_at = time.time()
+        # Identifies this instance's leases; unique even for workers on other machines
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.enqueued = 0
+        self.leased = 0
+        self.recovered = 0
+        self.completed = 0
+        self.duplicates = 0
+        self._lock = threading.RLock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False
+        )
+        # WAL lets readers proceed while another instance holds the write lock
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " url TEXT PRIMARY KEY,"
+            " repo TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " state TEXT NOT NULL,"  # pending, leased, done or failed
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT,"
+            " enqueued_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS items_state ON items (state, enqueued_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Worker processes open the database themselves, under their own owner ID
+        return type(self), (
+            self.path, self.lease_seconds, self.max_attempts, self.discovery_wait_seconds
+        )
+
+    def enqueue(self, repo_name: str, record: dict[str, Any]) -> bool:
+        """
+        Adds a JSON-serializable issue record (keyed by its "url"); returns False if the
+        issue was already queued.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO items (url, repo, record, state, enqueued_at)"
+                " VALUES (?, ?, ?, 'pending', ?)",
+                (record["url"], repo_name, json.dumps(record), time.time()),
+            )
+            added = cursor.rowcount > 0
+            self.enqueued += added
+            return added
+
+    def lease(self, limit: int) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Leases up to `limit` pending items, or items whose lease has expired, oldest
+        first. Returns (repo name, issue record) pairs.
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE items SET state = 'failed', lease_owner = NULL"
+                    " WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                rows = self._conn.execute(
+                    "SELECT url, repo, record, state FROM items"
+                    " WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?)"
+                    " ORDER BY enqueued_at LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE items SET state = 'leased', lease_owner = ?, lease_expires = ?,"
+                    " attempts = attempts + 1 WHERE url = ?",
+                    [(self.owner, now + self.lease_seconds, url) for url, _, _, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.leased += len(rows)
+            self.recovered += sum(1 for *_, state in rows if state == "leased")
+        return [(repo_name, json.loads(record)) for _, repo_name, record, _ in rows]
+
+    def renew(self) -> int:
+        """Extends all of this instance's leases; returns how many it holds."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, self.owner),
+            )
+            return cursor.rowcount
+
+    def complete(self, url: str, result: str) -> bool:
+        """
+        Commits the finished record for `url`. Returns False if another worker (which
+        took over an expired lease) completed it first, so it must not be output twice.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = 'done', result = ?, lease_owner = NULL"
+                " WHERE url = ? AND state != 'done'",
+                (result, url),
+            )
+            if cursor.rowcount:
+                self.completed += 1
+                return True
+            self.duplicates += 1
+            return False
+
+    def retry(self, url: str) -> None:
+        """
+        Returns a leased item whose processing failed to the queue for another attempt,
+        or marks it failed once it has been leased `max_attempts` times.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                " lease_owner = NULL, lease_expires = NULL"
+                " WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+                (self.max_attempts, url, self.owner),
+            )
+
+    def release(self) -> int:
+        """
+        Returns this instance's unfinished leases to the queue, without counting them as
+        attempts (e.g. on shutdown or once the spend budget is reached).
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = 'pending', lease_owner = NULL, lease_expires = NULL,"
+                " attempts = attempts - 1 WHERE state = 'leased' AND lease_owner = ?",
+                (self.owner,),
+            )
+            return cursor.rowcount
+
+    def has_outstanding(self) -> bool:
+        """Whether any item is pending or in flight at another worker (whose lease may yet expire)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM items WHERE state = 'pending'"
+                " OR (state = 'leased' AND lease_owner != ?) LIMIT 1",
+                (self.owner,),
+            ).fetchone()
+        return row is not None
+
+    def _set_meta(self, **values: str) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items()
+            )
+
+    def start_discovery(self) -> None:
+        self._set_meta(discovery_finished="0", discovery_heartbeat=str(time.time()))
+
+    def heartbeat_discovery(self) -> None:
+        """Tells workers that discovery is still running; call well within `lease_seconds`."""
+        self._set_meta(discovery_heartbeat=str(time.time()))
+
+    def finish_discovery(self) -> None:
+        """Marks discovery as over, whether it got through its whole search or not."""
+        self._set_meta(discovery_finished="1")
+
+    def discovery_finished(self) -> bool:
+        """
+        Whether the last discovering instance has stopped: it finished, or its last
+        heartbeat is older than `lease_seconds`; or none has started within
+        `discovery_wait_seconds`.
+        """
+        with self._lock:
+            meta = dict(
+                self._conn.execute(
+                    "SELECT key, value FROM meta"
+                    " WHERE key IN ('discovery_finished', 'discovery_heartbeat')"
+                ).fetchall()
+            )
+        if "discovery_finished" not in meta:
+            return time.time() - self._opened_at > self.discovery_wait_seconds
+        if meta["discovery_finished"] == "1":
+            return True
+        return float(meta.get("discovery_heartbeat", 0)) < time.time() - self.lease_seconds
+
+    def results(self) -> Iterator[str]:
+        """The committed JSON Lines records of all completed items, in queue order."""
+        # Streamed through a connection of its own, so other calls need not wait for it
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            for (result,) in conn.execute(
+                "SELECT result FROM items WHERE state = 'done' ORDER BY enqueued_at"
+            ):
+                yield result
+        finally:
+            conn.close()
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(
+                self._conn.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall()
+            )
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{count} {state}" for state, count in sorted(self.counts().items()))
+        return (
+            f"{self.enqueued} enqueued, {self.leased} leased ({self.recovered} recovered from "
+            f"expired leases), {self.completed} completed, {self.duplicates} already completed "
+            f"elsewhere; queue {self.path}: {counts or 'empty'}"
+        )
+
+    def close(self) -> None:
+        self._conn.close()
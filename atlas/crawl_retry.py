@@ -0,0 +1,225 @@
+"""Retries with jittered backoff, per-call deadlines and hedged requests for model calls."""
+
+import asyncio
+import email.utils
+import random
+import statistics
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RETRIES: int = 3
+DEFAULT_CALL_TIMEOUT: float = 300.0
+DEFAULT_HEDGE_QUANTILE: float = 0.95
+# Backoff before retry n (from 0) is drawn uniformly from [0, min(cap, base * 2**n)]
+BACKOFF_BASE_SECONDS: float = 1.0
+BACKOFF_CAP_SECONDS: float = 30.0
+# Hedging waits for this many successful calls to estimate the latency quantile from,
+# and only keeps the latest ones
+HEDGE_MIN_SAMPLES: int = 20
+LATENCY_WINDOW: int = 500
+# Hedge at most this fraction of calls, so a slow provider is not sent twice the load
+MAX_HEDGE_RATIO: float = 0.1
+# Overloaded, throttled or failing upstream; worth another try
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether `error` is transient: a deadline, a retryable HTTP status, or a transport
+    error anywhere in its cause chain (provider SDKs wrap the httpx error).
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(cause, (httpx.TransportError, ConnectionError)):
+            return True
+        cause = cause.__cause__ or cause.__context__
+    return False
+
+
+def retry_after(error: BaseException) -> float | None:
+    """
+    Seconds the server asked to wait before retrying (`retry-after-ms` or `Retry-After`,
+    in seconds or as an HTTP date), from the response anywhere in `error`'s cause chain;
+    None if it did not say.
+    """
+    cause: BaseException | None = error
+    while cause is not None:
+        response = getattr(cause, "response", None)
+        if isinstance(response, httpx.Response):
+            headers = response.headers
+            try:
+                if "retry-after-ms" in headers:
+                    return float(headers["retry-after-ms"]) / 1000
+                if "retry-after" in headers:
+                    return float(headers["retry-after"])
+            except ValueError:
+                try:
+                    moment = email.utils.parsedate_to_datetime(headers["retry-after"])
+                except (TypeError, ValueError):
+                    return None
+                return max(0.0, moment.timestamp() - time.time())
+            return None
+        cause = cause.__cause__ or cause.__context__
+    return None
+
+
+def _discard_outcome(task: "asyncio.Future[object]") -> None:
+    # Retrieved, so an abandoned attempt's error is not reported as never retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+class RetryPolicy:
+    """
+    Runs a call up to `max_retries + 1` times. Each attempt must finish within
+    `call_timeout` seconds; transient failures (see `is_retryable`) are retried after
+    a jittered exponential backoff (or after the response's Retry-After, if longer),
+    anything else fails at once.
+
+    With `hedge`, an attempt still running after the `hedge_quantile` latency of recent
+    successful calls (tracked per key, e.g. per model) gets a duplicate started, and
+    whichever finishes first is used. The provider bills the other one whether or not
+    it is cancelled, so it is left to finish in the background (await
+    `wait_abandoned()` before closing its HTTP client), and attempts that record their
+    own usage account for it; hedging is off by default for that cost.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        call_timeout: float | None = DEFAULT_CALL_TIMEOUT,
+        hedge: bool = False,
+        hedge_quantile: float = DEFAULT_HEDGE_QUANTILE,
+    ):
+        self.max_retries = max_retries
+        self.call_timeout = call_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self._latencies: dict[str, deque[float]] = {}
+        self.calls = 0
+        # Calls that needed at least one retry, and the retries made in total
+        self.retried = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.hedged = 0
+        # Calls waiting out their hedge delay, each holding a slot under MAX_HEDGE_RATIO
+        self._reserved_hedges = 0
+        self.hedge_wins = 0
+        self.failed = 0
+        # Losing hedge attempts still running
+        self._abandoned: set[asyncio.Future[object]] = set()
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (from 0): "full jitter" backoff."""
+        return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**retry))
+
+    def hedge_delay(self, key: str) -> float | None:
+        """When to hedge a call for `key`, or None if it should not be hedged."""
+        latencies = self._latencies.get(key)
+        if (
+            not self.hedge
+            or latencies is None
+            or len(latencies) < HEDGE_MIN_SAMPLES
+            or self.hedged + self._reserved_hedges >= MAX_HEDGE_RATIO * self.calls
+        ):
+            return None
+        return statistics.quantiles(latencies, n=100)[int(self.hedge_quantile * 100) - 1]
+
+    async def run_attempt(self, call: Awaitable[T], key: str = "") -> T:
+        """
+        Awaits one attempt under the call deadline and records its latency. Callers
+        wrap just the request with this (e.g. inside a concurrency limiter), so time
+        spent queueing for a slot neither counts against the deadline nor skews the
+        hedging quantile.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            result = await asyncio.wait_for(call, self.call_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        self._latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(
+            loop.time() - started_at
+        )
+        return result
+
+    async def call(self, attempt: Callable[[], Awaitable[T]], key: str = "") -> T:
+        """Runs `attempt()` with retries (and hedging); re-raises the last failure."""
+        self.calls += 1
+        retry = 0
+        while True:
+            try:
+                return await self._hedged(attempt, key)
+            except Exception as e:
+                if retry >= self.max_retries or not is_retryable(e):
+                    self.failed += 1
+                    raise
+                delay = max(self.backoff(retry), retry_after(e) or 0.0)
+            if retry == 0:
+                self.retried += 1
+            self.retries += 1
+            retry += 1
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[T]], key: str) -> T:
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await attempt()
+        # Reserved up front, so calls waiting at the same time cannot all pass the cap;
+        # given back if the first attempt finishes before the delay
+        self._reserved_hedges += 1
+        first = asyncio.ensure_future(attempt())
+        tasks = [first]
+        succeeded = False
+        try:
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+            finally:
+                self._reserved_hedges -= 1
+            if done:
+                return first.result()
+            self.hedged += 1
+            tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        succeeded = True
+                        return task.result()
+            # Both failed; the retry loop decides on the first error
+            return first.result()
+        finally:
+            for task in tasks:
+                if succeeded and not task.done():
+                    # The losing attempt: finishes on its own (see the class docstring)
+                    self._abandoned.add(task)
+                    task.add_done_callback(self._abandoned.discard)
+                    task.add_done_callback(_discard_outcome)
+                else:
+                    task.cancel()
+
+    async def wait_abandoned(self) -> None:
+        """Waits for the losing hedge attempts still running (each is under the call deadline)."""
+        while self._abandoned:
+            await asyncio.wait(set(self._abandoned))
+
+    def summary(self) -> str:
+        hedging = f", {self.hedged} hedged ({self.hedge_wins} won by the hedge)" if self.hedge else ""
+        return (
+            f"{self.calls} calls, {self.retried} retried ({self.retries} retries, "
+            f"{self.timeouts} deadline timeouts){hedging}, {self.failed} failed"
+        )
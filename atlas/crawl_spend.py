@@ -0,0 +1,186 @@
+"""Token usage and dollar spend tracking used by crawl_pytorch_issues.py."""
+
+import importlib.util
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+# Prices per 1K tokens come from the team's table in agentless/calculate_token_costs.py,
+# under its own model names
+PRICE_TABLE_PATH: Path = (
+    Path(__file__).resolve().parent.parent / "agentless" / "calculate_token_costs.py"
+)
+PRICE_TABLE_NAMES: dict[str, str] = {
+    "openai:o1": "o1",
+    "openai:gpt-4o": "gpt4-2024",
+    "openai:gpt-4o-mini": "gpt4o-mini",
+    "anthropic:claude-3-5-sonnet-latest": "claude35",
+}
+
+
+def _load_model_pricing() -> dict[str, dict[str, float]]:
+    spec = importlib.util.spec_from_file_location("calculate_token_costs", PRICE_TABLE_PATH)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load the price table from {PRICE_TABLE_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    table = module.calculate_token_costs()
+    return {model_id: table[name] for model_id, name in PRICE_TABLE_NAMES.items()}
+
+
+MODEL_PRICING: dict[str, dict[str, float]] = _load_model_pricing()
+# Anthropic bills tokens written to the prompt cache at 1.25x the regular input price
+CACHE_WRITE_PRICE_FACTOR: float = 1.25
+
+# Log running totals after this many recorded calls
+DEFAULT_SPEND_REPORT_EVERY: int = 25
+
+log = logging.getLogger("rich")
+
+
+def _cache_write_tokens(details: dict[str, int] | None) -> int:
+    """Prompt tokens written to Anthropic's cache (cache_creation_input_tokens)."""
+    return (details or {}).get("cache_creation_input_tokens", 0)
+
+
+def _cached_tokens(details: dict[str, int] | None) -> int:
+    """Cached prompt tokens as reported by OpenAI (cached_tokens) or Anthropic (cache_read_input_tokens)."""
+    details = details or {}
+    return details.get("cached_tokens", 0) or details.get("cache_read_input_tokens", 0)
+
+
+class SpendTracker:
+    """
+    Accumulates token counts and dollar cost per model from MODEL_PRICING.
+
+    Once the total reaches `max_spend`, `exhausted` turns true so callers stop starting
+    new calls; calls already in flight are still recorded.
+    """
+
+    def __init__(
+        self,
+        max_spend: float | None = None,
+        report_every: int = DEFAULT_SPEND_REPORT_EVERY,
+    ):
+        self.max_spend = max_spend
+        self.report_every = report_every
+        self.tokens: dict[str, Counter[str]] = {}
+        self.costs: Counter[str] = Counter()
+        self.calls = 0
+        self._unpriced: set[str] = set()
+
+    @property
+    def total_cost(self) -> float:
+        return sum(self.costs.values())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_spend is not None and self.total_cost >= self.max_spend
+
+    def record_usage(self, model_id: str, usage: Any, batch: bool = False) -> float:
+        """Records a pydantic_ai Usage (from `result.usage()`); returns its cost."""
+        return self.record(
+            model_id,
+            input_tokens=usage.request_tokens or 0,
+            output_tokens=usage.response_tokens or 0,
+            cached_tokens=_cached_tokens(usage.details),
+            cache_write_tokens=_cache_write_tokens(usage.details),
+            batch=batch,
+        )
+
+    def record_openai_usage(self, model_id: str, usage: dict[str, Any], batch: bool = False) -> float:
+        """Records an OpenAI API `usage` object (e.g. from a batch output record)."""
+        return self.record(
+            model_id,
+            input_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+            cached_tokens=_cached_tokens(usage.get("prompt_tokens_details")),
+            batch=batch,
+        )
+
+    def record(
+        self,
+        model_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        batch: bool = False,
+    ) -> float:
+        """
+        Adds one call's tokens and returns its cost (0 for models without pricing).
+        `input_tokens` includes the `cached_tokens` read from and the `cache_write_tokens`
+        written to the provider's prompt cache.
+        """
+        was_exhausted = self.exhausted
+        tokens = self.tokens.setdefault(model_id, Counter())
+        tokens.update(
+            calls=1,
+            input=input_tokens,
+            cached=cached_tokens,
+            cache_write=cache_write_tokens,
+            output=output_tokens,
+        )
+        self.calls += 1
+
+        prices = MODEL_PRICING.get(model_id)
+        cost = 0.0
+        if prices is None:
+            if model_id not in self._unpriced:
+                self._unpriced.add(model_id)
+                log.warning(f"No pricing for {model_id}; its tokens are counted but not costed.")
+        elif batch:
+            cost = (
+                input_tokens * prices["input_batch"] + output_tokens * prices["output_batch"]
+            ) / 1000
+        else:
+            uncached = input_tokens - cached_tokens - cache_write_tokens
+            cost = (
+                uncached * prices["input_regular"]
+                + cached_tokens * prices["input_cached"]
+                + cache_write_tokens * prices["input_regular"] * CACHE_WRITE_PRICE_FACTOR
+                + output_tokens * prices["output_regular"]
+            ) / 1000
+        self.costs[model_id] += cost
+
+        if self.report_every and self.calls % self.report_every == 0:
+            log.info(f"Spend so far: {self.running_total()}")
+        if self.exhausted and not was_exhausted:
+            log.warning(
+                f"Spend budget of ${self.max_spend:.2f} reached (${self.total_cost:.2f}); no new assessments will be started."
+            )
+        return cost
+
+    def running_total(self) -> str:
+        input_tokens = sum(tokens["input"] for tokens in self.tokens.values())
+        output_tokens = sum(tokens["output"] for tokens in self.tokens.values())
+        budget = f" of ${self.max_spend:.2f}" if self.max_spend is not None else ""
+        return f"${self.total_cost:.4f}{budget} over {self.calls} calls ({input_tokens} in / {output_tokens} out tokens)"
+
+    def cached_share(self) -> tuple[int, int]:
+        """Input tokens served from the provider's prompt cache, and all input tokens."""
+        return (
+            sum(tokens["cached"] for tokens in self.tokens.values()),
+            sum(tokens["input"] for tokens in self.tokens.values()),
+        )
+
+    def summary(self) -> list[str]:
+        """Per-model token and cost lines for the run summary."""
+        lines = [f"Spend: {self.running_total()}"]
+        cached, total = self.cached_share()
+        if total:
+            lines.append(
+                f"Prompt cache: {cached} cached / {total - cached} uncached input tokens "
+                f"({cached / total:.0%} cached)"
+            )
+        for model_id, tokens in sorted(self.tokens.items()):
+            cache_writes = (
+                f", {tokens['cache_write']} of them written to the cache" if tokens["cache_write"] else ""
+            )
+            lines.append(
+                f"  {model_id}: {tokens['calls']} calls, {tokens['input']} input "
+                f"({tokens['cached']} cached, {tokens['input'] - tokens['cached']} uncached{cache_writes}), "
+                f"{tokens['output']} output tokens, ${self.costs[model_id]:.4f}"
+            )
+        return lines
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""A/B evaluation of assessment prompt and model variants over a fixed issue set.
+
+Takes issues from a crawl's JSON Lines output (as `--replay` does) and assesses every
+variant x issue pair concurrently. Variants share the assessment cache, and variants
+using the same model share that model's concurrency limit. Reports, per variant, the
+verdicts' agreement with the reference variant (by default the first), latency, calls
+and cost, plus the pairwise agreement matrix of all variants. Verdicts answered from
+the cache are counted separately and left out of latency and cost, which describe the
+model calls only:
+
+    python experiment_crawl.py issues.jsonl --models openai:o1,openai:gpt-4o-mini
+    python experiment_crawl.py issues.jsonl --variants variants.json -o report.json
+
+A variants file is a JSON list of objects with a `name`, a `model` and optionally a
+`prompt` / `system_prompt` (or `prompt_file` / `system_prompt_file`, relative to the
+variants file); prompts default to the crawler's ASSESSMENT_PROMPT and SYSTEM_PROMPT.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Optional
+
+import pydantic
+
+import crawl_pytorch_issues as crawler
+from crawl_cache import AssessmentCache
+from crawl_limits import AsyncAdaptiveLimiter
+from crawl_spend import SpendTracker
+
+# --- Variants ---
+
+
+class Variant(pydantic.BaseModel):
+    """One prompt/model combination under evaluation."""
+
+    name: str
+    model: str
+    prompt: str = crawler.ASSESSMENT_PROMPT
+    system_prompt: str = crawler.SYSTEM_PROMPT
+    prompt_file: Optional[Path] = None
+    system_prompt_file: Optional[Path] = None
+
+    def resolve_files(self, base_dir: Path) -> "Variant":
+        """Reads `prompt_file` / `system_prompt_file` (relative to `base_dir`) into the prompts."""
+        updates = {}
+        if self.prompt_file is not None:
+            updates["prompt"] = (base_dir / self.prompt_file).read_text(encoding="utf-8")
+        if self.system_prompt_file is not None:
+            updates["system_prompt"] = (base_dir / self.system_prompt_file).read_text(encoding="utf-8")
+        return self.model_copy(update=updates)
+
+
+def _load_variants(variants_file: Path) -> list[Variant]:
+    variants = pydantic.TypeAdapter(list[Variant]).validate_json(variants_file.read_bytes())
+    return [variant.resolve_files(variants_file.parent) for variant in variants]
+
+
+class VariantRun:
+    """
+    A variant's agent, verdicts, cache hits and the latencies of its model calls, with
+    its own spend tracker.
+    """
+
+    def __init__(self, variant: Variant, limiter: AsyncAdaptiveLimiter):
+        self.variant = variant
+        self.limiter = limiter
+        self.agent = crawler._create_llm_agent(variant.model, variant.system_prompt)
+        self.spend = SpendTracker(report_every=0)
+        # Issue URL -> True/False (answered or not), None if the assessment failed
+        self.verdicts: dict[str, Optional[bool]] = {}
+        self.latencies: list[float] = []
+        self.cache_hits = 0
+
+    async def assess(
+        self, record: crawler.IssueRecord, answer_text: str, cache: AssessmentCache | None
+    ) -> None:
+        prompt = crawler._render_prompt(
+            record["title"], record["body"], answer_text, self.variant.prompt
+        )
+        if cache is not None:
+            cached = await asyncio.to_thread(
+                cache.get,
+                crawler._assessment_cache_key(prompt, self.variant.model, self.variant.system_prompt),
+            )
+            if cached is not None:
+                self.cache_hits += 1
+                answer = crawler.Answer.model_validate_json(cached)
+                self.verdicts[record["url"]] = answer.answer_summary is not None
+                return
+        started_at = time.perf_counter()
+        answer = await crawler._assess_answer(
+            self.agent,
+            record["title"],
+            record["body"],
+            answer_text,
+            cache,
+            self.limiter,
+            prompt,
+            self.spend,
+            model_id=self.variant.model,
+            system_prompt=self.variant.system_prompt,
+        )
+        self.latencies.append(time.perf_counter() - started_at)
+        self.verdicts[record["url"]] = None if answer is None else answer.answer_summary is not None
+
+
+# --- Evaluation ---
+
+
+def _agreement(a: VariantRun, b: VariantRun) -> tuple[float | None, int]:
+    """Share of issues both variants judged on which they agree, and how many that is."""
+    both = [
+        url
+        for url, verdict in a.verdicts.items()
+        if verdict is not None and b.verdicts.get(url) is not None
+    ]
+    if not both:
+        return None, 0
+    return sum(a.verdicts[url] == b.verdicts[url] for url in both) / len(both), len(both)
+
+
+def _confusion(run: VariantRun, reference: VariantRun) -> dict[str, int]:
+    """Counts of the variant's verdicts against the reference's (positive = answered)."""
+    counts = {"tp": 0, "fp": 0, "fn": 0, "tn": 0, "failed": 0}
+    for url, expected in reference.verdicts.items():
+        actual = run.verdicts.get(url)
+        if actual is None or expected is None:
+            counts["failed"] += 1
+        elif actual and expected:
+            counts["tp"] += 1
+        elif actual:
+            counts["fp"] += 1
+        elif expected:
+            counts["fn"] += 1
+        else:
+            counts["tn"] += 1
+    return counts
+
+
+def _percentile(values: list[float], q: int) -> float | None:
+    if len(values) < 2:
+        return values[0] if values else None
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _report(runs: list[VariantRun], reference: VariantRun, wall_seconds: float) -> dict:
+    variants = {}
+    for run in runs:
+        agreement, judged = _agreement(run, reference)
+        confusion = _confusion(run, reference)
+        predicted = confusion["tp"] + confusion["fp"]
+        expected = confusion["tp"] + confusion["fn"]
+        variants[run.variant.name] = {
+            "model": run.variant.model,
+            "issues": len(run.verdicts),
+            "answered": sum(1 for verdict in run.verdicts.values() if verdict),
+            "failed": sum(1 for verdict in run.verdicts.values() if verdict is None),
+            "agreement_with_reference": agreement,
+            "judged_with_reference": judged,
+            "precision_vs_reference": confusion["tp"] / predicted if predicted else None,
+            "recall_vs_reference": confusion["tp"] / expected if expected else None,
+            "confusion_vs_reference": confusion,
+            "cache_hits": run.cache_hits,
+            "model_calls": run.spend.calls,
+            "cost": run.spend.total_cost,
+            "cost_per_call": run.spend.total_cost / run.spend.calls if run.spend.calls else None,
+            "p50_seconds": _percentile(run.latencies, 50),
+            "p95_seconds": _percentile(run.latencies, 95),
+            "limiter": run.limiter.summary(),
+        }
+    matrix = {
+        a.variant.name: {b.variant.name: _agreement(a, b)[0] for b in runs} for a in runs
+    }
+    verdicts = {
+        url: {run.variant.name: run.verdicts.get(url) for run in runs}
+        for url in reference.verdicts
+    }
+    return {
+        "reference": reference.variant.name,
+        "wall_seconds": wall_seconds,
+        "variants": variants,
+        "agreement_matrix": matrix,
+        "verdicts": verdicts,
+    }
+
+
+def _print_report(report: dict) -> None:
+    names = list(report["variants"])
+    print(f"Reference: {report['reference']} ({report['wall_seconds']:.1f}s wall)")
+    print(
+        f"{'variant':<24} {'agree':>6} {'prec':>6} {'recall':>6} {'answered':>8} "
+        f"{'failed':>6} {'hits':>6} {'calls':>6} {'cost $':>9} {'$/call':>9} {'p50 s':>7} {'p95 s':>7}"
+    )
+
+    def pct(value: float | None) -> str:
+        return "n/a" if value is None else f"{value:.0%}"
+
+    for name, v in report["variants"].items():
+        cost_per_call = "n/a" if v["cost_per_call"] is None else f"{v['cost_per_call']:.5f}"
+        p50, p95 = (
+            "n/a" if v[key] is None else f"{v[key]:.2f}" for key in ("p50_seconds", "p95_seconds")
+        )
+        print(
+            f"{name:<24} {pct(v['agreement_with_reference']):>6} {pct(v['precision_vs_reference']):>6} "
+            f"{pct(v['recall_vs_reference']):>6} {v['answered']:>8} {v['failed']:>6} "
+            f"{v['cache_hits']:>6} {v['model_calls']:>6} {v['cost']:>9.4f} {cost_per_call:>9} "
+            f"{p50:>7} {p95:>7}"
+        )
+    print("\nAgreement matrix:")
+    width = max(8, *(len(name) for name in names))
+    print(" " * width + "".join(f" {name[:width]:>{width}}" for name in names))
+    for a in names:
+        row = report["agreement_matrix"][a]
+        print(f"{a:<{width}}" + "".join(f" {pct(row[b]):>{width}}" for b in names))
+
+
+async def run_experiment(
+    variants: list[Variant],
+    issues_file: Path,
+    max_issues: int,
+    cache: AssessmentCache | None,
+    reference: str | None = None,
+) -> dict:
+    """Assesses every variant x issue pair concurrently and returns the report."""
+    issues = [
+        (record, answer_text)
+        for record, answer_text, skip_reason in crawler._load_replay_records(issues_file, max_issues)
+        if answer_text is not None and skip_reason is None
+    ]
+    crawler.log.info(f"Evaluating {len(variants)} variants on {len(issues)} issues from {issues_file}.")
+
+    # Variants on the same model share its concurrency limit
+    limiters: dict[str, AsyncAdaptiveLimiter] = {}
+    runs = []
+    for variant in variants:
+        if variant.model not in limiters:
+            limiters[variant.model] = crawler._create_llm_limiter(variant.model)
+        runs.append(VariantRun(variant, limiters[variant.model]))
+    reference_run = next((run for run in runs if run.variant.name == reference), runs[0])
+
+    crawler.metrics.start()
+    started_at = time.perf_counter()
+    # Interleave variants so every model's limiter is kept busy from the start
+    await asyncio.gather(
+        *(
+            run.assess(record, answer_text, cache)
+            for record, answer_text in issues
+            for run in runs
+        )
+    )
+    return _report(runs, reference_run, time.perf_counter() - started_at)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Evaluate assessment prompt/model variants against each other on a fixed issue set.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("issues", type=Path, help="JSON Lines output of a crawl to take the issues from.")
+    parser.add_argument(
+        "--variants",
+        type=Path,
+        default=None,
+        help="JSON file listing the variants (name, model, optional prompt / system_prompt).",
+    )
+    parser.add_argument(
+        "--models",
+        type=lambda s: [model.strip() for model in s.split(",") if model.strip()],
+        default=[],
+        help="Comma-separated model IDs to compare with the default prompts (in addition to --variants).",
+    )
+    parser.add_argument(
+        "--reference",
+        type=str,
+        default=None,
+        help="Variant whose verdicts the others are scored against (default: the first).",
+    )
+    parser.add_argument("-n", "--max-issues", type=int, default=100, help="Issues to take from the file.")
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=crawler.max_concurrent_assessments,
+        help="Initial concurrent calls per model.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=crawler.max_adaptive_concurrency,
+        help="Cap on concurrent calls per model.",
+    )
+    parser.add_argument(
+        "--assessment-cache",
+        type=Path,
+        default=crawler.DEFAULT_ASSESSMENT_CACHE,
+        help="SQLite file caching assessments, shared with the crawler.",
+    )
+    parser.add_argument(
+        "--no-assessment-cache",
+        action="store_true",
+        help="Always call the models, bypassing the assessment cache.",
+    )
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the full report (with per-issue verdicts) as JSON.")
+    args = parser.parse_args()
+
+    variants = _load_variants(args.variants) if args.variants else []
+    variants += [Variant(name=model, model=model) for model in args.models]
+    if not variants:
+        parser.error("give at least one variant with --variants or --models")
+    names = [variant.name for variant in variants]
+    if len(set(names)) != len(names):
+        parser.error(f"variant names must be unique: {', '.join(names)}")
+    if args.reference is not None and args.reference not in names:
+        parser.error(f"--reference {args.reference} is not one of the variants: {', '.join(names)}")
+
+    # Keep the report readable: no per-request (httpx) or per-issue (crawler) logs
+    logging.getLogger().setLevel(logging.WARNING)
+    crawler.log.setLevel(logging.WARNING)
+    crawler.max_concurrent_assessments = args.concurrency
+    crawler.max_adaptive_concurrency = args.max_concurrency
+    cache = None if args.no_assessment_cache else AssessmentCache(args.assessment_cache)
+
+    report = asyncio.run(
+        run_experiment(variants, args.issues, args.max_issues, cache, args.reference)
+    )
+    _print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.output}.")
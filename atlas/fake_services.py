@@ -0,0 +1,821 @@
+#!/usr/bin/env python3
+"""Local stand-ins for the services crawl_pytorch_issues.py talks to.
+
+Each stand-in is a small HTTP server with configurable latency, rate limiting and
+failure injection. Run one and point the crawler at it instead of the real service:
+
+    python fake_services.py github --port 8088 &   # GITHUB_API_URL=http://127.0.0.1:8088
+    python fake_services.py model --port 8090 &    # OPENAI_BASE_URL=http://127.0.0.1:8090/v1
+    python fake_services.py batch --port 8089 &    # --batch-base-url http://127.0.0.1:8089/v1
+"""
+
+import argparse
+import base64
+import email
+import email.policy
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# --- Helpers ---
+
+# Every stand-in serves its request counters here (as JSON), outside fault injection
+STATS_PATH: str = "/_stats"
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """
+    Request handler with JSON helpers; `self.server.service` is the stand-in. Requests
+    go through the service's fault injection before reaching `handle_get`/`handle_post`.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        # One handler per connection: charge the handshake it stands for
+        super().setup()
+        self._new_connection = True
+        service: _Service = self.server.service  # type: ignore[attr-defined]
+        if service.connect_latency:
+            time.sleep(service.connect_latency)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str = "application/json",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any, headers: dict[str, str] | None = None) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    def do_GET(self) -> None:
+        if self.path == STATS_PATH:
+            service: _Service = self.server.service  # type: ignore[attr-defined]
+            self._send_json(200, service.snapshot())
+            return
+        self._dispatch(self.handle_get, b"")
+
+    def do_POST(self) -> None:
+        self._dispatch(self.handle_post, self._read_body())
+
+    def _dispatch(self, handler: Callable[[bytes], None], body: bytes) -> None:
+        service: _Service = self.server.service  # type: ignore[attr-defined]
+        if self._new_connection:
+            # Counted here so fetching STATS_PATH does not count itself
+            self._new_connection = False
+            with service._slots_lock:
+                service.stats["connections"] += 1
+        with service.request_slot() as rejection:
+            if rejection is not None:
+                status, payload, headers = rejection
+                self._send_json(status, payload, headers)
+                return
+            handler(body)
+
+    def handle_get(self, body: bytes) -> None:
+        self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+    def handle_post(self, body: bytes) -> None:
+        self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep the crawler's output readable
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections when a crawl opens dozens at once
+    request_queue_size = 256
+
+
+class _Service:
+    """
+    Runs a handler class on a local ThreadingHTTPServer in a background thread.
+
+    Every request waits `latency` seconds (plus up to `jitter`), and fails with a 5xx
+    with probability `failure_rate`. Requests beyond `max_in_flight` concurrent ones
+    are rejected by `throttle_response()`. Each new connection first waits
+    `connect_latency` seconds, standing in for the TCP and TLS handshakes of a remote
+    service, so connection reuse shows up in benchmarks.
+    """
+
+    handler: type[_JSONHandler]
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        max_in_flight: int | None = None,
+        connect_latency: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.stats: Counter[str] = Counter()
+        self._rng = random.Random(seed)
+        self._slots_lock = threading.Lock()
+        self._server = _Server((host, port), self.handler)
+        self._server.service = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_Service":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def throttle_response(self) -> tuple[int, Any, dict[str, str]]:
+        return 429, {"error": {"message": "Too many concurrent requests"}}, {"Retry-After": "1"}
+
+    def failure_response(self) -> tuple[int, Any, dict[str, str]]:
+        return 502, {"error": {"message": "Injected failure"}}, {}
+
+    def request_slot(self) -> "_RequestSlot":
+        return _RequestSlot(self)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counters served at STATS_PATH, for callers in another process."""
+        with self._slots_lock:
+            return {"stats": dict(self.stats), "peak_in_flight": self.peak_in_flight}
+
+
+class _RequestSlot:
+    """Context manager applying a service's latency, concurrency limit and failures."""
+
+    def __init__(self, service: _Service):
+        self.service = service
+        self.admitted = False
+
+    def __enter__(self) -> tuple[int, Any, dict[str, str]] | None:
+        service = self.service
+        with service._slots_lock:
+            service.stats["requests"] += 1
+            if service.max_in_flight is not None and service.in_flight >= service.max_in_flight:
+                service.stats["throttled"] += 1
+                return service.throttle_response()
+            service.in_flight += 1
+            service.peak_in_flight = max(service.peak_in_flight, service.in_flight)
+            self.admitted = True
+            failed = service._rng.random() < service.failure_rate
+            delay = service.latency + service._rng.random() * service.jitter
+        time.sleep(delay)
+        if failed:
+            service.stats["failed"] += 1
+            return service.failure_response()
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.admitted:
+            with self.service._slots_lock:
+                self.service.in_flight -= 1
+
+
+def _format_timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    if "T" not in timestamp:
+        timestamp += "T00:00:00Z"
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+# --- GitHub ---
+
+
+class _GitHubHandler(_JSONHandler):
+    def handle_get(self, body: bytes) -> None:
+        service: FakeGitHubServer = self.server.service  # type: ignore[attr-defined]
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        if url.path == "/search/issues":
+            self._send_github(*service.search_rest(params))
+        elif match := re.fullmatch(r"/repos/([^/]+/[^/]+)/issues/(\d+)/comments", url.path):
+            self._send_github(*service.comments(int(match[2]), params))
+        elif match := re.fullmatch(r"/repos/([^/]+/[^/]+)/issues/(\d+)", url.path):
+            self._send_github(*service.issue(int(match[2])))
+        elif match := re.fullmatch(r"/repos/([^/]+/[^/]+)", url.path):
+            self._send_github(200, service.repo(match[1]))
+        else:
+            super().handle_get(body)
+
+    def handle_post(self, body: bytes) -> None:
+        service: FakeGitHubServer = self.server.service  # type: ignore[attr-defined]
+        if self.path == "/graphql":
+            request = json.loads(body)
+            self._send_github(200, service.graphql(request["query"], request.get("variables") or {}))
+        else:
+            super().handle_post(body)
+
+    def _send_github(self, status: int, payload: Any, headers: dict[str, str] | None = None) -> None:
+        service: FakeGitHubServer = self.server.service  # type: ignore[attr-defined]
+        headers = {**service.rate_limit_headers(), **(headers or {})}
+        body = json.dumps(payload).encode("utf-8")
+        if self.command == "GET" and status == 200:
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                service.stats["not_modified"] += 1
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self._send(status, body, headers=headers)
+
+
+class FakeGitHubServer(_Service):
+    """
+    GitHub REST and GraphQL stand-in serving `num_issues` synthetic closed issues of
+    one repository: issue search (with `closed:`/`updated:` qualifiers, sorting, Link
+    pagination and the 1,000-result cap), single issues, issue comments and the two
+    GraphQL queries the crawler sends. Every response carries X-RateLimit headers for
+    a budget of `rate_limit` requests per `rate_window` seconds; once it is spent,
+    requests get GitHub's 403 until the window resets. Concurrent requests beyond
+    `max_in_flight` get a secondary-rate-limit 403 with Retry-After.
+    """
+
+    handler = _GitHubHandler
+    SEARCH_CAP: int = 1000
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        repo: str = "fake/repo",
+        num_issues: int = 500,
+        rate_limit: int = 5000,
+        rate_window: float = 3600.0,
+        **kwargs: Any,
+    ):
+        super().__init__(host, port, **kwargs)
+        self.repo_name = repo
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self._window_started = time.time()
+        self._window_used = 0
+        self.created_at = datetime(2016, 8, 1, tzinfo=timezone.utc)
+        self.issues = [self._make_issue(number) for number in range(1, num_issues + 1)]
+
+    def _make_issue(self, number: int) -> dict[str, Any]:
+        rng = random.Random(number)
+        closed_at = self.created_at + timedelta(seconds=rng.randrange(0, 8 * 365 * 24 * 3600))
+        updated_at = closed_at + timedelta(seconds=rng.randrange(0, 30 * 24 * 3600))
+        comments = []
+        for index in range(rng.choice([0, 1, 2, 2, 3, 5])):
+            if rng.random() < 0.4:
+                body = f"The fix is in `torch/nn/functional.py`:\n```python\nreturn F.relu(x, inplace={index % 2 == 0})\n```\nThis changes how the module handles in-place ops."
+            else:
+                body = rng.choice(["Thanks!", "Closing as stale.", "Can you share a repro?", "Same issue here."])
+            comments.append({"body": body, "author": rng.choice(["alice", "bob", "pytorchbot"])})
+        return {
+            "number": number,
+            "title": f"Synthetic issue {number}",
+            "body": f"Calling the op with shape ({number}, 3) fails.\n```\nTraceback (most recent call last):\n  ...\nRuntimeError: boom\n```",
+            "labels": ["module: nn"] if number % 5 else ["module: ci"],
+            "closed_at": closed_at,
+            "updated_at": updated_at,
+            "comments": comments,
+        }
+
+    # Rate limiting
+
+    def rate_limit_headers(self) -> dict[str, str]:
+        with self._slots_lock:
+            self._roll_window()
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(max(0, self.rate_limit - self._window_used)),
+                "X-RateLimit-Reset": str(int(self._window_started + self.rate_window)),
+            }
+
+    def _roll_window(self) -> None:
+        if time.time() >= self._window_started + self.rate_window:
+            self._window_started = time.time()
+            self._window_used = 0
+
+    def request_slot(self) -> _RequestSlot:
+        return _GitHubRequestSlot(self)
+
+    def throttle_response(self) -> tuple[int, Any, dict[str, str]]:
+        return (
+            403,
+            {"message": "You have exceeded a secondary rate limit."},
+            {"Retry-After": "1", **self.rate_limit_headers()},
+        )
+
+    # REST
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _issue_json(self, issue: dict[str, Any]) -> dict[str, Any]:
+        api_path = f"/repos/{self.repo_name}/issues/{issue['number']}"
+        return {
+            "url": self._url(api_path),
+            "html_url": f"https://github.com/{self.repo_name}/issues/{issue['number']}",
+            "number": issue["number"],
+            "title": issue["title"],
+            "body": issue["body"],
+            "state": "closed",
+            "labels": [{"name": name} for name in issue["labels"]],
+            "comments": len(issue["comments"]),
+            "updated_at": _format_timestamp(issue["updated_at"]),
+            "closed_at": _format_timestamp(issue["closed_at"]),
+            "user": {"login": "reporter"},
+        }
+
+    def _matching(self, query: str) -> list[dict[str, Any]]:
+        issues = self.issues
+        if match := re.search(r"closed:(\S+)\.\.(\S+)", query):
+            start, end = _parse_timestamp(match[1]), _parse_timestamp(match[2])
+            issues = [issue for issue in issues if start <= issue["closed_at"] <= end]
+        if match := re.search(r"updated:>=(\S+)", query):
+            since = _parse_timestamp(match[1])
+            issues = [issue for issue in issues if issue["updated_at"] >= since]
+        descending = "sort:updated-asc" not in query
+        return sorted(issues, key=lambda issue: issue["updated_at"], reverse=descending)
+
+    def search_rest(self, params: dict[str, str]) -> tuple[int, Any, dict[str, str]]:
+        matching = self._matching(params.get("q", ""))
+        if params.get("order") == "asc":
+            matching.reverse()
+        per_page = int(params.get("per_page", 30))
+        page = int(params.get("page", 1))
+        if page * per_page > self.SEARCH_CAP + per_page - 1:
+            return 422, {"message": "Only the first 1000 search results are available"}, {}
+        reachable = matching[: self.SEARCH_CAP]
+        items = reachable[(page - 1) * per_page : page * per_page]
+        headers = {}
+        last_page = max(1, -(-len(reachable) // per_page))
+        links = []
+        if page < last_page:
+            links.append(f'<{self._url("/search/issues?" + urllib.parse.urlencode({**params, "page": page + 1}))}>; rel="next"')
+            links.append(f'<{self._url("/search/issues?" + urllib.parse.urlencode({**params, "page": last_page}))}>; rel="last"')
+        if links:
+            headers["Link"] = ", ".join(links)
+        return (
+            200,
+            {
+                "total_count": len(matching),
+                "incomplete_results": False,
+                "items": [self._issue_json(issue) for issue in items],
+            },
+            headers,
+        )
+
+    def _issue(self, number: int) -> dict[str, Any] | None:
+        return self.issues[number - 1] if 1 <= number <= len(self.issues) else None
+
+    def issue(self, number: int) -> tuple[int, Any]:
+        issue = self._issue(number)
+        if issue is None:
+            return 404, {"message": "Not Found"}
+        return 200, self._issue_json(issue)
+
+    def comments(self, number: int, params: dict[str, str]) -> tuple[int, Any]:
+        issue = self._issue(number)
+        if issue is None:
+            return 404, {"message": "Not Found"}
+        per_page = int(params.get("per_page", 30))
+        page = int(params.get("page", 1))
+        comments = issue["comments"][(page - 1) * per_page : page * per_page]
+        return 200, [
+            {"body": comment["body"], "user": {"login": comment["author"]}} for comment in comments
+        ]
+
+    def repo(self, full_name: str) -> dict[str, Any]:
+        return {
+            "full_name": full_name,
+            "url": self._url(f"/repos/{full_name}"),
+            "created_at": _format_timestamp(self.created_at),
+        }
+
+    # GraphQL
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        matching = self._matching(variables["query"])
+        if "nodes" not in query:
+            return {"data": {"search": {"issueCount": len(matching)}}}
+        offset = int(base64.b64decode(variables["after"])) if variables.get("after") else 0
+        reachable = matching[: self.SEARCH_CAP]
+        page = reachable[offset : offset + variables["first"]]
+        end = offset + len(page)
+        nodes = [
+            {
+                "number": issue["number"],
+                "url": f"https://github.com/{self.repo_name}/issues/{issue['number']}",
+                "title": issue["title"],
+                "body": issue["body"],
+                "updatedAt": _format_timestamp(issue["updated_at"]),
+                "labels": {"nodes": [{"name": name} for name in issue["labels"]]},
+                "comments": {
+                    "nodes": [
+                        {"body": comment["body"], "author": {"login": comment["author"]}}
+                        for comment in issue["comments"][-2:]
+                    ]
+                },
+            }
+            for issue in page
+        ]
+        return {
+            "data": {
+                "search": {
+                    "issueCount": len(matching),
+                    "pageInfo": {
+                        "hasNextPage": end < len(reachable),
+                        "endCursor": base64.b64encode(str(end).encode()).decode(),
+                    },
+                    "nodes": nodes,
+                }
+            }
+        }
+
+
+class _GitHubRequestSlot(_RequestSlot):
+    """Adds GitHub's primary rate limit (403 with X-RateLimit-Remaining: 0) to the slot."""
+
+    def __enter__(self) -> tuple[int, Any, dict[str, str]] | None:
+        service: FakeGitHubServer = self.service  # type: ignore[assignment]
+        with service._slots_lock:
+            service._roll_window()
+            if service._window_used >= service.rate_limit:
+                service.stats["requests"] += 1
+                service.stats["rate_limited"] += 1
+                exhausted = True
+            else:
+                service._window_used += 1
+                exhausted = False
+        if exhausted:
+            return (
+                403,
+                {"message": "API rate limit exceeded"},
+                service.rate_limit_headers(),
+            )
+        return super().__enter__()
+
+
+# --- Model ---
+
+
+def default_assessment(prompt: str, properties: dict[str, Any]) -> dict[str, Any]:
+    """
+    Deterministic stand-in verdict: 'answered' when the comments contain code. Fills
+    either the crawler's Answer schema or the cascade's Screening schema.
+    """
+    comments = prompt.split("--- Potential Answer Comment(s) ---")[-1]
+    answered = "```" in comments
+    if "likely_answered" in properties:
+        return {
+            "likely_answered": answered,
+            "confident": True,
+            "reason": "Stand-in: the comments include code." if answered else "Stand-in: no code in the comments.",
+        }
+    return {
+        "in_what_way_question_is_answered_or_not": (
+            "Stand-in: the comments include code." if answered else "Stand-in: no code in the comments."
+        ),
+        "answer_summary": "Stand-in summary." if answered else None,
+    }
+
+
+def _usage(request: dict[str, Any], content: str, cached_prefixes: set[str] | None = None) -> dict[str, Any]:
+    """
+    Token counts at ~4 characters per token. With `cached_prefixes`, a system prompt
+    seen before is reported as cached, like a provider's prompt cache would.
+    """
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in request["messages"]) // 4
+    completion_tokens = len(content) // 4
+    usage: dict[str, Any] = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    if cached_prefixes is not None:
+        system = "".join(
+            str(m.get("content") or "") for m in request["messages"] if m.get("role") in ("system", "developer")
+        )
+        usage["prompt_tokens_details"] = {"cached_tokens": len(system) // 4 if system in cached_prefixes else 0}
+        cached_prefixes.add(system)
+    return usage
+
+
+def chat_completion(
+    request: dict[str, Any],
+    respond: Callable[[str, dict[str, Any]], dict[str, Any]] = default_assessment,
+    completion_id: str = "chatcmpl-fake",
+    cached_prefixes: set[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Answers an OpenAI chat completion request with `respond`'s verdict, as a tool call
+    when the request offers tools (how pydantic-ai asks for structured output) and as
+    JSON content otherwise (response_format, as in batch requests).
+    """
+    prompt = next(
+        (str(m.get("content")) for m in reversed(request["messages"]) if m.get("role") == "user"), ""
+    )
+    tools = request.get("tools") or []
+    if tools:
+        function = tools[0]["function"]
+        arguments = json.dumps(respond(prompt, function["parameters"].get("properties", {})))
+        message: dict[str, Any] = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{completion_id}",
+                    "type": "function",
+                    "function": {"name": function["name"], "arguments": arguments},
+                }
+            ],
+        }
+        finish_reason, content = "tool_calls", arguments
+    else:
+        schema = ((request.get("response_format") or {}).get("json_schema") or {}).get("schema", {})
+        content = json.dumps(respond(prompt, schema.get("properties", {})))
+        message = {"role": "assistant", "content": content}
+        finish_reason = "stop"
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request["model"],
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": _usage(request, content, cached_prefixes),
+    }
+
+
+class _ModelHandler(_JSONHandler):
+    def handle_post(self, body: bytes) -> None:
+        service: FakeModelServer = self.server.service  # type: ignore[attr-defined]
+        if self.path == "/v1/chat/completions":
+            completion_id = f"chatcmpl-{next(service._ids)}"
+            self._send_json(
+                200,
+                chat_completion(json.loads(body), service.respond, completion_id, service.cached_prefixes),
+            )
+        else:
+            super().handle_post(body)
+
+
+class FakeModelServer(_Service):
+    """
+    OpenAI-compatible chat completions stand-in. Each call takes `latency` (+ `jitter`)
+    seconds; calls beyond `max_in_flight` concurrent ones get a 429 with Retry-After,
+    and `failure_rate` of them a 5xx, so the crawler's adaptive limits and retries can
+    be exercised. Repeated system prompts are reported as cached prompt tokens.
+    """
+
+    handler = _ModelHandler
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        respond: Callable[[str, dict[str, Any]], dict[str, Any]] = default_assessment,
+        **kwargs: Any,
+    ):
+        super().__init__(host, port, **kwargs)
+        self.respond = respond
+        self.cached_prefixes: set[str] = set()
+        self._ids = itertools.count(1)
+
+    def failure_response(self) -> tuple[int, Any, dict[str, str]]:
+        return 500, {"error": {"message": "Injected failure", "type": "server_error"}}, {}
+
+
+# --- Batch API ---
+
+
+class _BatchHandler(_JSONHandler):
+    def handle_post(self, body: bytes) -> None:
+        service: FakeBatchServer = self.server.service  # type: ignore[attr-defined]
+        if self.path == "/v1/files":
+            fields = _parse_multipart(self.headers["Content-Type"], body)
+            self._send_json(200, service.add_file(fields["file"]))
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            if request["input_file_id"] not in service.files:
+                self._send_json(404, {"error": {"message": "No such file"}})
+                return
+            self._send_json(200, service.create_batch(request["input_file_id"]))
+        else:
+            super().handle_post(body)
+
+    def handle_get(self, body: bytes) -> None:
+        service: FakeBatchServer = self.server.service  # type: ignore[attr-defined]
+        if match := re.fullmatch(r"/v1/batches/([\w-]+)", self.path):
+            batch = service.get_batch(match[1])
+            if batch is None:
+                self._send_json(404, {"error": {"message": "No such batch"}})
+            else:
+                self._send_json(200, batch)
+        elif match := re.fullmatch(r"/v1/files/([\w-]+)/content", self.path):
+            content = service.files.get(match[1])
+            if content is None:
+                self._send_json(404, {"error": {"message": "No such file"}})
+            else:
+                self._send(200, content, "application/jsonl")
+        else:
+            super().handle_get(body)
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, bytes]:
+    message = email.message_from_bytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body, policy=email.policy.HTTP
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()  # type: ignore[attr-defined]
+    }
+
+
+class FakeBatchServer(_Service):
+    """
+    Minimal OpenAI-compatible Batch API: file upload, batch creation, status polling and
+    output download. Batches complete `completion_delay` seconds after creation, with
+    every request answered by `respond`; a request for which `respond` raises ends up
+    as an error record.
+    """
+
+    handler = _BatchHandler
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        completion_delay: float = 1.0,
+        respond: Callable[[str, dict[str, Any]], dict[str, Any]] = default_assessment,
+        **kwargs: Any,
+    ):
+        super().__init__(host, port, **kwargs)
+        self.completion_delay = completion_delay
+        self.respond = respond
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_file(self, content: bytes) -> dict[str, Any]:
+        with self._lock:
+            file_id = f"file-{next(self._ids)}"
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "purpose": "batch"}
+
+    def create_batch(self, input_file_id: str) -> dict[str, Any]:
+        with self._lock:
+            batch_id = f"batch_{next(self._ids)}"
+            total = sum(1 for line in self.files[input_file_id].splitlines() if line.strip())
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "status": "in_progress",
+                "input_file_id": input_file_id,
+                "output_file_id": None,
+                "error_file_id": None,
+                "request_counts": {"total": total, "completed": 0, "failed": 0},
+                "_created": time.monotonic(),
+            }
+        return self._public(self.batches[batch_id])
+
+    def get_batch(self, batch_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress" and time.monotonic() - batch["_created"] >= self.completion_delay:
+                self._complete(batch)
+            return self._public(batch)
+
+    def _complete(self, batch: dict[str, Any]) -> None:
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                completion = chat_completion(request["body"], self.respond, f"chatcmpl-{next(self._ids)}")
+            except Exception as e:
+                errors.append(
+                    {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+                )
+                continue
+            outputs.append(
+                {
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": completion},
+                    "error": None,
+                }
+            )
+        for key, records in (("output_file_id", outputs), ("error_file_id", errors)):
+            if records:
+                file_id = f"file-{next(self._ids)}"
+                self.files[file_id] = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+                batch[key] = file_id
+        batch["status"] = "completed"
+        batch["request_counts"].update(completed=len(outputs), failed=len(errors))
+
+    @staticmethod
+    def _public(batch: dict[str, Any]) -> dict[str, Any]:
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for one of the crawler's external services.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("service", choices=["github", "model", "batch"], help="Which service to stand in for.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each request takes.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail with a 5xx.")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="Concurrent requests beyond this are throttled (429, or GitHub's secondary-limit 403).",
+    )
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.0,
+        help="Seconds each new connection takes before its first request (a stand-in for TCP/TLS handshakes).",
+    )
+    parser.add_argument("--num-issues", type=int, default=500, help="github: synthetic closed issues to serve.")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="github: requests per rate-limit window.")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="github: rate-limit window in seconds.")
+    parser.add_argument("--completion-delay", type=float, default=1.0, help="batch: seconds before a batch completes.")
+    args = parser.parse_args()
+
+    fault_options = dict(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        max_in_flight=args.max_in_flight,
+        connect_latency=args.connect_latency,
+    )
+    server: _Service
+    if args.service == "github":
+        server = FakeGitHubServer(
+            args.host,
+            args.port,
+            num_issues=args.num_issues,
+            rate_limit=args.rate_limit,
+            rate_window=args.rate_window,
+            **fault_options,
+        )
+    elif args.service == "model":
+        server = FakeModelServer(args.host, args.port, **fault_options)
+    else:
+        server = FakeBatchServer(args.host, args.port, completion_delay=args.completion_delay, **fault_options)
+    # Flushed so a parent process (e.g. bench_crawl.py) can read the URL, port 0 included
+    print(f"Fake {args.service} service listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass